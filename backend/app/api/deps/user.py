@@ -3,9 +3,11 @@ import logging
 import fastapi
 import fastapi_paseto_auth as paseto_auth
 
+from app.config import auth as auth_config
 from app.config import db
 from app.exceptions.http import user as user_exceptions
 from app.models import user as user_models
+from app.services import base as base_services
 from app.services import user as user_services
 from app.utils import auth, converters
 
@@ -34,12 +36,18 @@ async def get_current_user(
     # generated correctly.
     """
     Authorize.paseto_required()
+    await auth_config.ensure_token_not_revoked(Authorize.get_token_payload())
     user_id = Authorize.get_subject()
     if not user_id:
         log.info("User ID not found in the JWT subject")
         raise user_exceptions.UserNotFoundError()
-    user_filters = user_models.UserFilters(id=converters.to_uuid(str(user_id)))
-    return await user_services.UserService(session).get_user(user_filters)
+    user_service = user_services.UserService(session)
+    user_uuid = converters.to_uuid(str(user_id))
+    if not session.info.get(db.READ_ONLY_KEY):
+        # The other requests may update the user, so it's read from the primary
+        return await user_service.get_cached_user(user_uuid)
+    async with base_services.read_scope(session):
+        return await user_service.get_cached_user(user_uuid)
 
 
 async def get_current_active_user(
@@ -50,6 +58,15 @@ async def get_current_active_user(
     return user
 
 
+async def get_current_admin_user(
+    user: user_models.User = fastapi.Depends(get_current_active_user),
+) -> user_models.User:
+    if not user.is_admin:
+        log.info("User with ID %r is not an admin", user.id)
+        raise user_exceptions.UserForbiddenError()
+    return user
+
+
 async def check_user_requests_own_data(
     user_id: user_models.UserID,
     user: user_models.User = fastapi.Depends(get_current_active_user),
@@ -3,19 +3,38 @@ import typing
 import fastapi
 from fastapi import status
 
-from app.config import db
+from app.api.deps import user as user_deps
 from app.exceptions.http import health as health_exceptions
+from app.models import health as health_models
 from app.services import health as health_services
 
 router = fastapi.APIRouter()
 
 
+@router.get("/live", status_code=status.HTTP_204_NO_CONTENT)
+async def check_liveness() -> typing.Any:
+    pass
+
+
 @router.get(
     "/",
     status_code=status.HTTP_204_NO_CONTENT,
     responses={**health_exceptions.HealthError().doc},
 )
-async def check_health(
-    session: db.AsyncSession = fastapi.Depends(db.get_session),
-) -> typing.Any:
-    await health_services.HealthService(session).check_health()
+@router.get(
+    "/ready",
+    status_code=status.HTTP_204_NO_CONTENT,
+    responses={**health_exceptions.HealthError().doc},
+)
+async def check_health() -> typing.Any:
+    await health_services.HealthService().check_health()
+
+
+@router.get(
+    "/diagnostics",
+    response_model=health_models.Diagnostics,
+    dependencies=[fastapi.Depends(user_deps.get_current_admin_user)],
+    responses=user_deps.ALL_RESPONSES,
+)
+async def get_diagnostics() -> typing.Any:
+    return await health_services.HealthService().diagnose()
@@ -6,15 +6,21 @@ import fastapi_paseto_auth as paseto_auth
 from fastapi import status
 
 from app.api.deps import user as user_deps
-from app.config import db
+from app.config import db, general
+from app.exceptions.http import pagination as pagination_exceptions
 from app.exceptions.http import reset_password as reset_password_exceptions
 from app.exceptions.http import user as user_exceptions
 from app.models import message
+from app.models import pagination as pagination_models
+from app.models import sorting as sorting_models
 from app.models import user as user_models
 from app.services import user as user_services
+from app.utils import responses
 
 router = fastapi.APIRouter()
 
+settings = general.get_settings()
+
 log = logging.getLogger(__name__)
 
 
@@ -31,6 +37,79 @@ async def create_user(
     return await user_services.UserService(session).create_user(user)
 
 
+@router.post(
+    "/import",
+    response_model=user_models.UserImportReport,
+    dependencies=[fastapi.Depends(user_deps.get_current_admin_user)],
+    responses=user_deps.ALL_RESPONSES,
+)
+async def import_users(
+    users: list[dict[str, typing.Any]] = fastapi.Body(
+        max_items=settings.USER_IMPORT_MAX_SIZE
+    ),
+    session: db.AsyncSession = fastapi.Depends(db.get_session),
+) -> typing.Any:
+    # Rows are validated one by one by the service, so a single invalid row is
+    # reported instead of rejecting the whole import
+    return await user_services.UserService(session).import_users(users)
+
+
+@router.get(
+    "/",
+    response_model=user_models.UsersPage,
+    dependencies=[fastapi.Depends(user_deps.get_current_admin_user)],
+    responses={
+        **user_deps.ALL_RESPONSES,
+        **pagination_exceptions.InvalidCursorError().doc,
+    },
+)
+async def get_users(
+    email: user_models.UserEmail | None = None,
+    confirmed_email: user_models.UserConfirmedEmail
+    | None = fastapi.Query(default=None, alias="confirmedEmail"),
+    sort_by: user_models.UserSortingColumn = fastapi.Query(
+        default=user_models.UserSortingColumn.CREATED_AT, alias="sortBy"
+    ),
+    sort_way: sorting_models.SortingWayParam = fastapi.Query(
+        default=sorting_models.SortingWayParam.ASC, alias="sortWay"
+    ),
+    cursor: pagination_models.PaginationCursor | None = None,
+    limit: int = fastapi.Query(default=50, ge=1, le=100),
+    estimate_total: bool = fastapi.Query(default=False, alias="estimateTotal"),
+    session: db.AsyncSession = fastapi.Depends(db.get_session),
+) -> typing.Any:
+    filters_data = {"email": email, "confirmed_email": confirmed_email}
+    filters = user_models.UserFilters(
+        **{key: value for key, value in filters_data.items() if value is not None}
+    )
+    sorting = sorting_models.Sorting(
+        column=getattr(user_models.User, sort_by.value),
+        way=sorting_models.SortingWay[sort_way.name],
+    )
+    pagination = pagination_models.CursorPagination(cursor=cursor, limit=limit)
+    user_service = user_services.UserService(session)
+    page = await user_service.get_users_page(
+        filters,
+        pagination,
+        sorting,
+        pagination_models.CountMode.ESTIMATED
+        if estimate_total
+        else pagination_models.CountMode.EXACT,
+    )
+    # Serialized directly, because validating every row against the response model
+    # would cost more than reading the page from the database
+    return responses.ORJSONResponse(
+        {
+            "items": responses.dump_entries(user_models.UserRead, page.items),
+            "total": page.total,
+            "totalEstimated": page.total_estimated,
+            "nextCursor": user_service.get_next_users_cursor(
+                page.items, sorting, pagination
+            ),
+        }
+    )
+
+
 @router.get(
     "/me",
     response_model=user_models.UserRead,
@@ -101,9 +180,7 @@ async def get_user(
     user_id: user_models.UserID,
     session: db.AsyncSession = fastapi.Depends(db.get_session),
 ) -> typing.Any:
-    return await user_services.UserService(session).get_user(
-        user_models.UserFilters(id=user_id)
-    )
+    return await user_services.UserService(session).get_cached_user(user_id)
 
 
 @router.post(
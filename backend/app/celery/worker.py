@@ -18,3 +18,13 @@ app = celery.Celery(
     result_serializer=settings.CELERY_RESULT_SERIALIZER,
 )
 app.autodiscover_tasks(packages=APPS)
+app.conf.beat_schedule = {
+    "purge-expired-reset-password-tokens": {
+        "task": "app.tasks.purge.purge_expired_reset_password_tokens",
+        "schedule": settings.PURGE_INTERVAL,
+    },
+    "purge-unconfirmed-users": {
+        "task": "app.tasks.purge.purge_unconfirmed_users",
+        "schedule": settings.PURGE_INTERVAL,
+    },
+}
@@ -1,21 +1,182 @@
+import asyncio
+import contextlib
+import datetime
+import logging
+import time
 import typing
 
 import fastapi_paseto_auth as paseto_auth
+from fastapi_paseto_auth import exceptions as paseto_exceptions
+from redis import exceptions as redis_exceptions
 
 from app.config import db, general
+from app.utils import bloom, metrics
+
+if typing.TYPE_CHECKING:
+    from redis import asyncio as redis_asyncio
+
+log = logging.getLogger(__name__)
+
+settings = general.get_settings()
 
 paseto_token_db = db.get_paseto_token_db()
 
+FILTER_SYNC_RETRY_DELAY = 5.0
+
 
 @paseto_auth.AuthPASETO.load_config
 def get_paseto_token_settings() -> general.Settings:
-    return general.get_settings()
+    # The library calls the denylist callback synchronously, so the Redis lookup
+    # would block the event loop. Instead, the denylist is checked asynchronously
+    # by `ensure_token_not_revoked`.
+    return general.get_settings().copy(update={"AUTHPASETO_DENYLIST_ENABLED": False})
+
+
+class RevokedTokenFilter:  # pylint: disable=too-many-instance-attributes
+    """
+    Bloom filter of the revoked token JTIs in front of the Redis denylist.
+
+    The filter is built from the denylist keys and kept in sync through the Redis
+    channel to which every revocation is published. It is rebuilt periodically to
+    drop the expired tokens. The subscription is pinged periodically, and when
+    nothing has arrived through it for longer than max_staleness, it is considered
+    down and every lookup goes to Redis, as it does until the filter is built.
+    So a revocation published while the subscription silently drops is missed
+    by the filter for at most max_staleness.
+    """
+
+    def __init__(
+        self,
+        redis_db: "redis_asyncio.Redis[str]",
+        channel: str,
+        capacity: int,
+        false_positive_rate: float,
+        rebuild_interval: datetime.timedelta,
+        max_staleness: datetime.timedelta,
+    ):
+        self.redis_db = redis_db
+        self.channel = channel
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.rebuild_interval = rebuild_interval.total_seconds()
+        self.max_staleness = max_staleness.total_seconds()
+        self.filter: bloom.BloomFilter | None = None
+        self._synced_at = 0.0
+        self._task: asyncio.Task[None] | None = None
+        self._short_circuits = metrics.counter("denylist_filter_short_circuits")
+        self._redis_lookups = metrics.counter("denylist_filter_redis_lookups")
+        self._false_positives = metrics.counter("denylist_filter_false_positives")
+        self._items = metrics.gauge("denylist_filter_items")
+        self._size = metrics.gauge("denylist_filter_size_bytes")
+
+    def might_contain(self, jti: str) -> bool:
+        if (
+            self.filter is not None
+            and time.monotonic() - self._synced_at <= self.max_staleness
+            and jti not in self.filter
+        ):
+            self._short_circuits.inc()
+            return False
+        self._redis_lookups.inc()
+        return True
+
+    def record_false_positive(self) -> None:
+        if self.filter is not None:
+            self._false_positives.inc()
+
+    def add(self, jti: str) -> None:
+        if self.filter is not None:
+            self.filter.add(jti)
+            self._items.set(self.filter.count)
+
+    async def publish(self, jti: str) -> None:
+        self.add(jti)
+        await self.redis_db.publish(self.channel, jti)
+
+    async def rebuild(self) -> None:
+        new_filter = bloom.BloomFilter(self.capacity, self.false_positive_rate)
+        async for jti in self.redis_db.scan_iter(count=1000):
+            new_filter.add(jti)
+        self.filter = new_filter
+        self._synced_at = time.monotonic()
+        self._items.set(new_filter.count)
+        self._size.set(new_filter.size_bytes)
+        if new_filter.count > self.capacity:
+            log.warning(
+                "Revoked token filter holds %d tokens over its capacity of %d",
+                new_filter.count,
+                self.capacity,
+            )
+
+    async def sync(self) -> None:
+        async with self.redis_db.pubsub(ignore_subscribe_messages=True) as pubsub:
+            # Subscribe before the rebuild, so no revocation published meanwhile
+            # is missed
+            await pubsub.subscribe(self.channel)
+            await self.rebuild()
+            rebuilt_at = pinged_at = time.monotonic()
+            while True:
+                if time.monotonic() - pinged_at >= self.max_staleness / 2:
+                    await pubsub.ping()
+                    pinged_at = time.monotonic()
+                if message := await pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=1.0
+                ):
+                    self._synced_at = time.monotonic()
+                    if message["type"] == "message":
+                        self.add(message["data"])
+                if time.monotonic() - rebuilt_at >= self.rebuild_interval:
+                    await self.rebuild()
+                    rebuilt_at = time.monotonic()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self.sync()
+            except redis_exceptions.RedisError:
+                log.exception("Revoked token filter sync failed")
+                self.filter = None
+                await asyncio.sleep(FILTER_SYNC_RETRY_DELAY)
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        self.filter = None
+
+
+revoked_token_filter = RevokedTokenFilter(
+    paseto_token_db,
+    channel=settings.DENYLIST_FILTER_CHANNEL,
+    capacity=settings.DENYLIST_FILTER_CAPACITY,
+    false_positive_rate=settings.DENYLIST_FILTER_FALSE_POSITIVE_RATE,
+    rebuild_interval=settings.DENYLIST_FILTER_REBUILD_INTERVAL,
+    max_staleness=settings.DENYLIST_FILTER_MAX_STALENESS,
+)
 
 
-def check_if_token_in_denylist(decrypted_token: dict[str, typing.Any]) -> bool:
+async def check_if_token_in_denylist(decrypted_token: dict[str, typing.Any]) -> bool:
     jti = decrypted_token["jti"]
-    is_revoked = paseto_token_db.get(jti)
-    return is_revoked == "true"
+    if not revoked_token_filter.might_contain(jti):
+        return False
+    is_revoked = await paseto_token_db.get(jti) == "true"
+    if not is_revoked:
+        revoked_token_filter.record_false_positive()
+    return is_revoked
 
 
-paseto_auth.AuthPASETO.token_in_denylist_loader(callback=check_if_token_in_denylist)
+async def ensure_token_not_revoked(decrypted_token: dict[str, typing.Any]) -> None:
+    if (
+        not settings.AUTHPASETO_DENYLIST_ENABLED
+        or decrypted_token["type"] not in settings.AUTHPASETO_DENYLIST_TOKEN_CHECKS
+    ):
+        return
+    if await check_if_token_in_denylist(decrypted_token):
+        raise paseto_exceptions.RevokedTokenError(
+            status_code=401, message="Token has been revoked"
+        )
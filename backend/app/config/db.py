@@ -1,33 +1,197 @@
+import contextlib
 import functools
+import random
 import typing
 
-import redis
-from sqlalchemy import orm
+import fastapi
+from redis import asyncio as redis_asyncio
+from sqlalchemy import event, orm, pool
 from sqlalchemy.ext import asyncio
 
 from app.config import general
+from app.utils import db_pool, metrics
 
 AsyncSession: typing.TypeAlias = asyncio.AsyncSession
 
 settings = general.get_settings()
 
-engine = asyncio.create_async_engine(settings.DATABASE_URL)
+READ_ONLY_KEY = "read_only"
+WROTE_KEY = "wrote"
+CONNECTED_KEY = "connected"
+READ_ONLY_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+POOL_OPTIONS = {
+    "pool_size": settings.DATABASE_POOL_SIZE,
+    "max_overflow": settings.DATABASE_MAX_OVERFLOW,
+    "pool_timeout": settings.DATABASE_POOL_TIMEOUT,
+    "pool_recycle": settings.DATABASE_POOL_RECYCLE,
+    "pool_pre_ping": settings.DATABASE_POOL_PRE_PING,
+    "connect_args": db_pool.get_connect_args(settings.DATABASE_PGBOUNCER),
+}
+
+engine = asyncio.create_async_engine(
+    settings.DATABASE_URL, poolclass=db_pool.InstrumentedAsyncQueuePool, **POOL_OPTIONS
+)
+
+# Every transaction on a replica begins as READ ONLY
+replica_engines = [
+    asyncio.create_async_engine(
+        url,
+        poolclass=db_pool.InstrumentedAsyncQueuePool,
+        execution_options={"postgresql_readonly": True},
+        **POOL_OPTIONS,
+    )
+    for url in settings.DATABASE_REPLICA_URLS
+]
+
+
+class RoutingSession(orm.Session):
+    """
+    Session sending the reads to a replica and the writes to the primary.
+
+    The reads go to the replica only within a read-only scope, e.g. a GET request,
+    and only until the session writes something, so the reads following a write
+    see it. The session sticks to one replica, so its reads don't go back in time
+    when the replicas lag behind by different amounts.
+    """
+
+    def __init__(
+        self,
+        *args: typing.Any,
+        replicas: typing.Sequence[asyncio.AsyncEngine] = (),
+        **kwargs: typing.Any,
+    ):
+        super().__init__(*args, **kwargs)
+        self.replica = (
+            random.choice(replicas).sync_engine if replicas else None  # nosec
+        )
+
+    def get_bind(  # type: ignore[override]
+        self,
+        mapper: typing.Any = None,
+        clause: typing.Any = None,
+        **kwargs: typing.Any,
+    ) -> typing.Any:
+        flushing = self._flushing  # type: ignore[attr-defined]
+        if flushing or getattr(clause, "is_dml", False):
+            self.info[WROTE_KEY] = True
+        elif (
+            self.replica
+            and self.info.get(READ_ONLY_KEY)
+            and not self.info.get(WROTE_KEY)
+        ):
+            return self.replica
+        return super().get_bind(mapper, clause, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_begin")
+def _mark_connected(session: orm.Session, *_: typing.Any) -> None:
+    session.info[CONNECTED_KEY] = True
+
+
+request_sessions = metrics.counter("db_request_sessions")
+unconnected_request_sessions = metrics.counter("db_request_sessions_unconnected")
+
 
 # TODO: Change to AsyncSession from the SQLModel when
 # https://github.com/tiangolo/sqlmodel/issues/54 will be resolved.
 # Then replace session.execute with session.exec in the whole codebase.
 session_factory = orm.sessionmaker(
-    engine, class_=asyncio.AsyncSession, expire_on_commit=False
+    engine,
+    class_=asyncio.AsyncSession,
+    sync_session_class=RoutingSession,
+    expire_on_commit=False,
+    replicas=replica_engines,
 )
 
 
-async def get_session() -> typing.AsyncGenerator[
-    AsyncSession, None
-]:  # pragma: no cover
+async def get_session(
+    request: fastapi.Request,
+) -> typing.AsyncGenerator[AsyncSession, None]:
+    """
+    Create the session of a request.
+
+    The session holds a connection only from its first query until the end of the
+    transaction, so the reads end it as soon as they're done, see
+    app.services.base.read_scope.
+    """
     async with session_factory() as session:
-        yield session
+        session.info[READ_ONLY_KEY] = request.method in READ_ONLY_METHODS
+        try:
+            yield session
+        finally:
+            record_session_usage(session)
+
+
+def record_session_usage(session: AsyncSession) -> None:
+    """
+    Count the request sessions and the ones which never checked out a connection.
+
+    The session is lazy, i.e. it checks out a connection only when the first query
+    needs it, so a request answered from the cache or rejected before reaching the
+    database doesn't take a connection from the pool at all.
+    """
+    request_sessions.inc()
+    if not session.info.get(CONNECTED_KEY):
+        unconnected_request_sessions.inc()
+
+
+@contextlib.contextmanager
+def read_only(session: AsyncSession) -> typing.Iterator[None]:
+    """
+    Send the reads within the scope to a replica, as in a read-only request.
+
+    The replicas may lag behind the primary, so use it for the reads which don't
+    have to see the writes made by other requests a moment ago.
+    """
+    previous = session.info.get(READ_ONLY_KEY, False)
+    session.info[READ_ONLY_KEY] = True
+    try:
+        yield
+    finally:
+        session.info[READ_ONLY_KEY] = previous
+
+
+@contextlib.asynccontextmanager
+async def get_task_session() -> typing.AsyncIterator[AsyncSession]:
+    """
+    Create a session for the code running outside the API, e.g. in Celery tasks.
+
+    Every task runs its own event loop, while the pooled connections are bound to
+    the loop that opened them, so the session uses a dedicated unpooled engine.
+    """
+    task_engine = asyncio.create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=pool.NullPool,
+        connect_args=db_pool.get_connect_args(settings.DATABASE_PGBOUNCER),
+    )
+    try:
+        # The replica engines are bound to the loop of the API
+        async with session_factory(bind=task_engine, replicas=()) as session:
+            yield session
+    finally:
+        await task_engine.dispose()
+
+
+def create_redis_client(
+    url: str, decode_responses: bool = False
+) -> redis_asyncio.Redis:  # type: ignore
+    connection_pool = redis_asyncio.BlockingConnectionPool.from_url(
+        url,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        timeout=settings.REDIS_POOL_TIMEOUT,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        socket_connect_timeout=settings.REDIS_SOCKET_CONNECT_TIMEOUT,
+        decode_responses=decode_responses,
+    )
+    return redis_asyncio.Redis(connection_pool=connection_pool)
+
+
+@functools.lru_cache
+def get_paseto_token_db() -> redis_asyncio.Redis:  # type: ignore
+    return create_redis_client(settings.AUTHPASETO_DATABASE_URL, decode_responses=True)
 
 
 @functools.lru_cache
-def get_paseto_token_db() -> redis.Redis:  # type: ignore
-    return redis.Redis.from_url(settings.AUTHPASETO_DATABASE_URL, decode_responses=True)
+def get_cache_db() -> redis_asyncio.Redis:  # type: ignore
+    return create_redis_client(settings.REDIS_URL)
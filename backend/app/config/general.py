@@ -1,37 +1,104 @@
 import datetime
 import functools
+import typing
 
 import pydantic
 
+# The ID of AUTHPASETO_SECRET_KEY among the PASETO keys
+PASETO_PRIMARY_KEY_ID = "primary"
+
 
 class App(pydantic.BaseSettings):
     APP_NAME: str = "Project Starter"
     DEV_MODE: bool = False
     LOCALES: list[str] = ["en"]
     API_URL: str = "/api/v1"
+    # Seconds given to every service checked by the health check
+    HEALTH_CHECK_TIMEOUT: pydantic.PositiveFloat = 2.0
+    HEALTH_CHECK_CACHE_TTL: datetime.timedelta = datetime.timedelta(seconds=5)
+    USER_IMPORT_MAX_SIZE: pydantic.PositiveInt = 1000
+    # Rows inserted by a single statement. Postgres accepts up to 32767 bind
+    # parameters per statement, so keep it below 3600 for the user table.
+    USER_IMPORT_BATCH_SIZE: pydantic.PositiveInt = 500
 
 
 class Security(pydantic.BaseSettings):
     TOKEN_URL: str = "token"
     REFRESH_TOKEN_URL: str = f"{TOKEN_URL}/refresh"
     AUTHPASETO_SECRET_KEY: str
+    # Secrets of the rotated out keys, keyed by the key ID, that are still accepted
+    # when decoding tokens. New tokens are always created with AUTHPASETO_SECRET_KEY.
+    AUTHPASETO_PREVIOUS_SECRET_KEYS: dict[str, str] = {}
     AUTHPASETO_ACCESS_TOKEN_EXPIRES: datetime.timedelta = datetime.timedelta(minutes=30)
     AUTHPASETO_REFRESH_TOKEN_EXPIRES: datetime.timedelta = datetime.timedelta(days=1)
     AUTHPASETO_DENYLIST_ENABLED: bool = True
     AUTHPASETO_DENYLIST_TOKEN_CHECKS: set[str] = {"access", "refresh"}
+    # In-process Bloom filter of the revoked tokens checked before the Redis lookup.
+    # The memory is fixed by the capacity and the false-positive rate.
+    DENYLIST_FILTER_ENABLED: bool = True
+    DENYLIST_FILTER_CAPACITY: pydantic.PositiveInt = 100000
+    DENYLIST_FILTER_FALSE_POSITIVE_RATE: pydantic.confloat(  # type: ignore
+        gt=0, lt=1
+    ) = 0.01
+    DENYLIST_FILTER_REBUILD_INTERVAL: datetime.timedelta = datetime.timedelta(
+        minutes=10
+    )
+    DENYLIST_FILTER_CHANNEL: str = "revoked_tokens"
+    # The revocations reach the filters of the other instances through the channel.
+    # When nothing has arrived through it for this long, the lookups fall back to
+    # Redis, so a revocation lost with a dropped subscription is missed for at most
+    # this long.
+    DENYLIST_FILTER_MAX_STALENESS: datetime.timedelta = datetime.timedelta(seconds=5)
     AUTHPASETO_TOKEN_LOCATION: set[str] = {"headers"}
     AUTHPASETO_DATABASE_URL: pydantic.RedisDsn
     EMAIL_CONFIRMATION_TOKEN_EXPIRES: datetime.timedelta = datetime.timedelta(days=7)
     RESET_PASSWORD_TOKEN_EXPIRES: datetime.timedelta = datetime.timedelta(hours=3)
     USER_PASSWORD_MIN_LENGTH: int = 8
     USER_PASSWORD_MAX_LENGTH: int = 32
+    PASSWORD_HASHING_EXECUTOR: typing.Literal["thread", "process"] = "thread"
+    PASSWORD_HASHING_MAX_WORKERS: pydantic.PositiveInt = 4
     CONFIRM_EMAIL_URL: pydantic.AnyHttpUrl
     RESET_PASSWORD_URL: pydantic.AnyHttpUrl
 
+    @pydantic.validator("AUTHPASETO_PREVIOUS_SECRET_KEYS")
+    @classmethod
+    def check_previous_key_ids(cls, value: dict[str, str]) -> dict[str, str]:
+        # The previous key would replace the current one
+        if PASETO_PRIMARY_KEY_ID in value:
+            raise ValueError(
+                f"the key ID {PASETO_PRIMARY_KEY_ID!r} is reserved for the current key"
+            )
+        return value
+
 
 class Database(pydantic.BaseSettings):
     DATABASE_URL: pydantic.PostgresDsn
+    # The pool belongs to a single process, so every gunicorn worker opens up to
+    # DATABASE_POOL_SIZE + DATABASE_MAX_OVERFLOW connections
+    DATABASE_POOL_SIZE: pydantic.PositiveInt = 5
+    DATABASE_MAX_OVERFLOW: pydantic.NonNegativeInt = 10
+    # Seconds to wait for a free connection when all pool connections are in use
+    DATABASE_POOL_TIMEOUT: pydantic.PositiveFloat = 30.0
+    # Seconds after which a connection is replaced, -1 to keep it forever
+    DATABASE_POOL_RECYCLE: int = 1800
+    DATABASE_POOL_PRE_PING: bool = True
+    # Set when PgBouncer runs in the transaction mode in front of the database,
+    # unless it keeps track of the prepared statements (max_prepared_statements)
+    DATABASE_PGBOUNCER: bool = False
+    # The read-only requests are served by a replica when any are given
+    DATABASE_REPLICA_URLS: list[pydantic.PostgresDsn] = []
     REDIS_URL: pydantic.RedisDsn
+    REDIS_MAX_CONNECTIONS: pydantic.PositiveInt = 50
+    # Seconds to wait for a free connection when all pool connections are in use
+    REDIS_POOL_TIMEOUT: pydantic.PositiveFloat = 2.0
+    REDIS_SOCKET_TIMEOUT: pydantic.PositiveFloat = 2.0
+    REDIS_SOCKET_CONNECT_TIMEOUT: pydantic.PositiveFloat = 2.0
+
+
+class Cache(pydantic.BaseSettings):
+    USER_CACHE_TTL: datetime.timedelta = datetime.timedelta(seconds=30)
+    USER_CACHE_MAX_SIZE: pydantic.PositiveInt = 10000
+    USER_CACHE_REDIS_ENABLED: bool = False
 
 
 class Celery(pydantic.BaseSettings):
@@ -40,6 +107,13 @@ class Celery(pydantic.BaseSettings):
     CELERY_ACCEPT_CONTENT: set[str] = {"application/json"}
     CELERY_TASK_SERIALIZER: str = "json"
     CELERY_RESULT_SERIALIZER: str = "json"
+    PURGE_INTERVAL: datetime.timedelta = datetime.timedelta(hours=1)
+    # Rows deleted by a single statement and the batches deleted by a single run
+    PURGE_BATCH_SIZE: pydantic.PositiveInt = 1000
+    PURGE_MAX_BATCHES: pydantic.PositiveInt = 100
+    # How long the rows are kept after they expire
+    RESET_PASSWORD_TOKEN_RETENTION: datetime.timedelta = datetime.timedelta(days=1)
+    UNCONFIRMED_USER_RETENTION: datetime.timedelta = datetime.timedelta(days=7)
 
 
 class Email(pydantic.BaseSettings):
@@ -47,6 +121,22 @@ class Email(pydantic.BaseSettings):
     SMTP_PORT: int
     SMTP_USER: str
     SMTP_PASSWORD: str
+    SMTP_TIMEOUT: pydantic.PositiveFloat = 10.0
+    # Logged-in connections kept open by every worker process
+    SMTP_POOL_MAX_SIZE: pydantic.PositiveInt = 2
+    SMTP_MAX_MESSAGES_PER_CONNECTION: pydantic.PositiveInt = 100
+    # Idle connections older than this are checked with NOOP before reuse
+    SMTP_KEEPALIVE_INTERVAL: datetime.timedelta = datetime.timedelta(seconds=30)
+    # The async backend sends the batches concurrently over a pool of up to
+    # SMTP_ASYNC_MAX_CONNECTIONS connections per process, reused across the emails
+    EMAIL_BACKEND: typing.Literal["smtp", "async"] = "smtp"
+    SMTP_ASYNC_MAX_CONNECTIONS: pydantic.PositiveInt = 100
+    # Directory of the compiled templates, the system temporary one if not set
+    TEMPLATES_CACHE_DIR: str | None = None
+    # Buffer the emails sent by the API and enqueue them to Celery in batches
+    EMAIL_BATCH_ENABLED: bool = False
+    EMAIL_BATCH_MAX_SIZE: pydantic.PositiveInt = 100
+    EMAIL_BATCH_WINDOW: datetime.timedelta = datetime.timedelta(seconds=1)
     EMAIL_SENDER: pydantic.EmailStr
 
 
@@ -55,7 +145,7 @@ class Integration(pydantic.BaseSettings):
 
 
 class Settings(
-    App, Security, Database, Celery, Email, Integration
+    App, Security, Database, Cache, Celery, Email, Integration
 ):  # pylint: disable=too-many-ancestors
     class Config:
         case_sensitive = True
@@ -0,0 +1,5 @@
+from app.exceptions.app import base
+
+
+class CeleryPingError(base.AppException):
+    pass
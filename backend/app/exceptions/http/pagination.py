@@ -0,0 +1,12 @@
+from fastapi import status
+
+from app.exceptions.http import base
+
+
+class InvalidCursorError(base.HTTPException):
+    def __init__(
+        self, detail: base.Detail = None, context: base.Context = None
+    ) -> None:
+        detail = "Invalid pagination cursor"
+        status_code = status.HTTP_400_BAD_REQUEST
+        super().__init__(status_code, detail, context)
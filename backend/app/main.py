@@ -3,8 +3,10 @@ from logging import config
 import fastapi
 
 from app.api.v1 import api
+from app.config import auth as auth_config
 from app.config import general
 from app.exceptions import handlers
+from app.services import user as user_services
 from app.utils import openapi, responses, sentry
 
 settings = general.get_settings()
@@ -26,3 +28,20 @@ handlers.init_handlers(app)
 app.include_router(api.router, prefix=settings.API_URL)
 
 app.openapi = openapi.generate_openapi_schema(app)  # type: ignore
+
+
+@app.on_event("startup")
+async def start_revoked_token_filter() -> None:
+    if settings.DENYLIST_FILTER_ENABLED:
+        auth_config.revoked_token_filter.start()
+
+
+@app.on_event("shutdown")
+async def stop_revoked_token_filter() -> None:
+    await auth_config.revoked_token_filter.stop()
+
+
+@app.on_event("shutdown")
+async def flush_email_buffers() -> None:
+    user_services.confirm_email_buffer.flush()
+    user_services.reset_password_buffer.flush()
@@ -0,0 +1,24 @@
+from app.models import base
+
+
+class ComponentDiagnostics(base.BaseModel):
+    status: str
+    duration: float
+
+
+class DatabaseDiagnostics(ComponentDiagnostics):
+    pool_size: int | None = None
+    pool_checked_out: int | None = None
+    pool_overflow: int | None = None
+    pool_saturation: float | None = None
+
+
+class CeleryDiagnostics(ComponentDiagnostics):
+    queue_depth: int | None = None
+
+
+class Diagnostics(base.BaseModel):
+    database: DatabaseDiagnostics
+    redis: ComponentDiagnostics
+    celery: CeleryDiagnostics
+    event_loop: ComponentDiagnostics
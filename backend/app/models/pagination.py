@@ -1,3 +1,4 @@
+import enum
 import typing
 
 import pydantic
@@ -7,6 +8,7 @@ from app.models import base
 TotalResults: typing.TypeAlias = int
 
 PaginationOffset: typing.TypeAlias = pydantic.conint(ge=0)  # type: ignore
+PaginationCursor: typing.TypeAlias = str
 
 
 class Pagination(base.BaseModel):
@@ -14,5 +16,30 @@ class Pagination(base.BaseModel):
     limit: pydantic.PositiveInt | None = None
 
 
+class CursorPagination(base.BaseModel):
+    """
+    Keyset pagination continuing after the row encoded in the cursor.
+
+    Unlike the offset, the database doesn't have to read the skipped rows, so deep
+    pages are as fast as the first one. The sorting column has to be non-nullable
+    and should be indexed together with the ID used as the tiebreaker.
+    """
+
+    cursor: PaginationCursor | None = None
+    limit: pydantic.PositiveInt
+
+
 class PaginationResponse(base.BaseModel):
     total: TotalResults
+
+
+class CountMode(enum.Enum):
+    EXACT = enum.auto()
+    # Based on the table statistics, for the tables too large to count them exactly
+    ESTIMATED = enum.auto()
+
+
+class Page(base.BaseModel):
+    items: list[typing.Any]
+    total: TotalResults
+    total_estimated: bool = False
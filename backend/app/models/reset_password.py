@@ -2,6 +2,7 @@ import datetime
 import typing
 import uuid
 
+import sqlalchemy
 import sqlmodel
 
 from app.config import general
@@ -19,10 +20,20 @@ def get_expiration_time() -> datetime.datetime:
 
 
 class ResetPasswordTokenBase(base.BaseModel):
-    user_id: user_models.UserID = sqlmodel.Field(foreign_key="user.id", index=True)
+    # Indexed together with expire_at by ResetPasswordToken
+    user_id: user_models.UserID = sqlmodel.Field(foreign_key="user.id")
 
 
 class ResetPasswordToken(ResetPasswordTokenBase, table=True):
+    # Supports expiring the live tokens of the user
+    __table_args__ = (
+        sqlalchemy.Index(
+            "ix_resetpasswordtoken_user_id_expire_at", "user_id", "expire_at"
+        ),
+    )
+    # Fetch the server-generated columns with RETURNING instead of expiring them
+    __mapper_args__ = {"eager_defaults": True}
+
     id: ResetPasswordTokenID = sqlmodel.Field(
         primary_key=True, default_factory=helpers.get_uuid4
     )
@@ -35,8 +46,7 @@ class ResetPasswordToken(ResetPasswordTokenBase, table=True):
         sa_column_kwargs={"onupdate": helpers.get_utcnow},
     )
     user: user_models.User = sqlmodel.Relationship(
-        back_populates="reset_password_tokens",
-        sa_relationship_kwargs={"lazy": "selectin"},
+        back_populates="reset_password_tokens"
     )
 
     @property
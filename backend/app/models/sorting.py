@@ -9,6 +9,11 @@ class SortingWay(enum.Enum):
     DESC = enum.auto()
 
 
+class SortingWayParam(str, enum.Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
 class Sorting(base.BaseModel):
     column: typing.Any
     way: SortingWay
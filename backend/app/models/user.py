@@ -1,12 +1,14 @@
 import datetime
+import enum
 import typing
 import uuid
 
 import pydantic
+import sqlalchemy
 import sqlmodel
 
 from app.config import general
-from app.models import base, helpers
+from app.models import base, helpers, pagination
 
 if typing.TYPE_CHECKING:
     # For relationships, models with lazy annotations has to be used directly and
@@ -23,6 +25,7 @@ UserCreatedAt: typing.TypeAlias = datetime.datetime
 UserUpdatedAt: typing.TypeAlias = datetime.datetime
 UserLastLogin: typing.TypeAlias = datetime.datetime
 UserIsActive: typing.TypeAlias = bool
+UserIsAdmin: typing.TypeAlias = bool
 
 settings = general.get_settings()
 
@@ -39,6 +42,11 @@ class UserBase(base.BaseModel):
 
 
 class User(UserBase, table=True):
+    # Supports the keyset pagination sorted by the creation date
+    __table_args__ = (sqlalchemy.Index("ix_user_created_at_id", "created_at", "id"),)
+    # Fetch the server-generated columns with RETURNING instead of expiring them
+    __mapper_args__ = {"eager_defaults": True}
+
     id: UserID = sqlmodel.Field(primary_key=True, default_factory=helpers.get_uuid4)
     confirmed_email: UserConfirmedEmail = False
     email_confirmation_token: UserEmailConfirmationToken = sqlmodel.Field(
@@ -52,9 +60,13 @@ class User(UserBase, table=True):
         sa_column_kwargs={"onupdate": helpers.get_utcnow},
     )
     last_login: UserLastLogin | None = None
+    # Granted directly in the database, never through the API
+    is_admin: UserIsAdmin = sqlmodel.Field(
+        default=False, sa_column_kwargs={"server_default": sqlalchemy.false()}
+    )
     reset_password_tokens: list["ResetPasswordToken"] = sqlmodel.Relationship(
         back_populates="user",
-        sa_relationship_kwargs={"lazy": "selectin", "cascade": "all, delete-orphan"},
+        sa_relationship_kwargs={"cascade": "all, delete-orphan"},
     )
 
     @property
@@ -72,9 +84,17 @@ class UserCreate(UserBase):
 class UserFilters(base.BaseModel):
     id: UserID | None = None
     email: UserEmail | None = None
+    confirmed_email: UserConfirmedEmail | None = None
     email_confirmation_token: UserEmailConfirmationToken | None = None
 
 
+class UserSortingColumn(str, enum.Enum):
+    # Only the non-nullable columns, as required by the cursor pagination
+    CREATED_AT = "created_at"
+    EMAIL = "email"
+    NAME = "name"
+
+
 class UserUpdateAPI(base.BaseModel):
     # FIXME: It is possible to pass `null` as the `name` field and thus break app.
     # Use exclude_none when performing update or annotate the field as string and use
@@ -96,6 +116,38 @@ class UserRead(base.BaseModel):
     name: UserName
 
 
+class UserCached(UserRead):
+    # The columns of the authentication path, without the password hash
+    confirmed_email: UserConfirmedEmail
+    is_admin: UserIsAdmin
+
+
+class UsersPage(pagination.PaginationResponse):
+    items: list[UserRead]
+    total_estimated: bool
+    next_cursor: pagination.PaginationCursor | None
+
+
+class UserImportStatus(str, enum.Enum):
+    CREATED = "created"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+
+
+class UserImportResult(base.BaseModel):
+    index: int
+    email: str | None
+    status: UserImportStatus
+    errors: list[str] = []
+
+
+class UserImportReport(base.BaseModel):
+    created: int
+    duplicates: int
+    invalid: int
+    results: list[UserImportResult]
+
+
 class UserChangePassword(base.BaseModel):
     current_password: UserPassword
     new_password: UserPassword = sqlmodel.Field(
@@ -35,7 +35,7 @@ class AuthService:
         except user_exceptions.UserNotFoundError as e:
             log.info("User with the email %r not found", email)
             raise invalid_credentials_exception from e
-        if not auth_utils.verify_password(password, user.password):
+        if not await auth_utils.verify_password(password, user.password):
             log.info("Invalid password for user with the email %r", email)
             raise invalid_credentials_exception
         user_update = user_models.UserUpdate(last_login=datetime.datetime.utcnow())
@@ -58,7 +58,7 @@ class AuthService:
             raise auth_http_exceptions.InvalidTokenError(context=token_context) from e
         if payload["type"] != "refresh":
             raise auth_http_exceptions.RefreshTokenRequiredError(context=token_context)
-        if auth_config.check_if_token_in_denylist(payload):
+        if await auth_config.check_if_token_in_denylist(payload):
             raise auth_http_exceptions.RevokedTokenError(context=token_context)
         user_filters = user_models.UserFilters(id=payload["sub"])
         user = await self.user_service.get_active_user(user_filters)
@@ -75,18 +75,20 @@ class AuthService:
             payload = auth_utils.decode_token_payload(token)
         except auth_app_aceptions.TokenDecodingError as e:
             raise auth_http_exceptions.InvalidTokenError(context=token_context) from e
-        if auth_config.check_if_token_in_denylist(payload):
+        if await auth_config.check_if_token_in_denylist(payload):
             raise auth_http_exceptions.RevokedTokenError(context=token_context)
         user_filters = user_models.UserFilters(id=payload["sub"])
         await self.user_service.get_user(user_filters)
         jti = payload["jti"]
-        if not (expiration := payload.get("exp")):
-            paseto_token_db.set(jti, "true")
+        if expiration := payload.get("exp"):
+            remaining_expiration = _get_remaining_expiration(expiration)
+            await paseto_token_db.setex(jti, remaining_expiration, "true")
+            log.info("Token has been revoked")
+        else:
+            await paseto_token_db.set(jti, "true")
             log.warning("Revoked token without expiration")
-            return
-        remaining_expiration = _get_remaining_expiration(expiration)
-        paseto_token_db.setex(jti, remaining_expiration, "true")
-        log.info("Token has been revoked")
+        if settings.DENYLIST_FILTER_ENABLED:
+            await auth_config.revoked_token_filter.publish(jti)
 
 
 def _get_remaining_expiration(exp: str) -> int:
@@ -1,15 +1,76 @@
+import base64
+import binascii
+import contextlib
 import typing
 
+import orjson
+import pydantic
+import sqlalchemy
 import sqlmodel
+from sqlalchemy import orm
+from sqlalchemy.dialects import postgresql
 from sqlmodel.sql import expression
 
+from app.config import db
+from app.exceptions.app import pagination as pagination_exceptions
 from app.models import base
 from app.models import pagination as pagination_models
 from app.models import sorting as sorting_models
+from app.utils import cache
 
-if typing.TYPE_CHECKING:
+LoadOption: typing.TypeAlias = orm.interfaces.LoaderOption
 
-    from app.config import db
+TRANSACTION_SCOPE_KEY = "transaction_scope"
+
+STATEMENT_CACHE_MAX_SIZE = 512
+
+# The statements take the filter values, the cursor and the pagination as bound
+# parameters, so a cached statement serves every query of the same shape. Its
+# SQLAlchemy cache key is memoized on the object, and its SQL stays the same, so
+# the compiled form and the asyncpg prepared statement are reused as well.
+statement_cache: cache.BuildCache[typing.Any] = cache.BuildCache(
+    "crud_statement", max_size=STATEMENT_CACHE_MAX_SIZE
+)
+
+
+@contextlib.asynccontextmanager
+async def transaction(session: "db.AsyncSession") -> typing.AsyncIterator[None]:
+    """
+    Run the writes of AppCRUD within the scope in a single transaction.
+
+    Inside the scope, the writes are neither committed nor flushed one by one, but
+    flushed and committed together when the scope exits, or rolled back if it
+    raises. Consequently, the errors raised by the database, e.g. the integrity
+    ones, come from the exit of the scope. Nested scopes join the outermost one.
+    """
+    if session.info.get(TRANSACTION_SCOPE_KEY):
+        yield
+        return
+    session.info[TRANSACTION_SCOPE_KEY] = True
+    try:
+        yield
+        await session.commit()
+    except BaseException:
+        await session.rollback()
+        raise
+    finally:
+        del session.info[TRANSACTION_SCOPE_KEY]
+
+
+@contextlib.asynccontextmanager
+async def read_scope(session: "db.AsyncSession") -> typing.AsyncIterator[None]:
+    """
+    Run the reads within the scope on a replica and end their transaction after.
+
+    The connection goes back to the pool once the reads are done, instead of being
+    held until the end of the request. Within a transaction scope, the transaction
+    is left to it.
+    """
+    with db.read_only(session):
+        yield
+    if session.in_transaction() and not session.info.get(TRANSACTION_SCOPE_KEY):
+        # The loaded entries stay valid, as the session doesn't expire on commit
+        await session.commit()
 
 
 class AppCRUD:  # FIXME: Fix typing
@@ -21,29 +82,201 @@ class AppCRUD:  # FIXME: Fix typing
         db_entry = self.model.from_orm(entry)
         return await self._save(db_entry, refresh)
 
+    async def create_with(
+        self, entry: base.BaseModel, ctes: typing.Sequence[typing.Any]
+    ) -> typing.Any:
+        """
+        Create the entry with a single INSERT running the data-modifying CTEs.
+
+        The CTEs, e.g. an UPDATE of the related rows, and the INSERT go to the
+        database in one statement. The entry isn't read back, so use it only for
+        the models without server-side defaults. The rows changed by the CTEs are
+        not synchronized with the entries already loaded into the session.
+        """
+        db_entry = self.model.from_orm(entry)
+        statement: typing.Any = sqlalchemy.insert(self.model).values(db_entry.dict())
+        for cte in ctes:
+            statement = statement.add_cte(cte)
+        await self.session.execute(statement)
+        await self._commit()
+        return await self.attach(db_entry)
+
+    async def create_many(
+        self,
+        entries: typing.Sequence[base.BaseModel],
+        conflict_columns: typing.Sequence[typing.Any],
+    ) -> list[typing.Any]:
+        """
+        Insert the entries with a single statement, skipping conflicting ones.
+
+        Only the conflicts on the unique index of the conflict columns skip the
+        entries, any other constraint violation fails the statement. Returns the
+        rows of the inserted entries only, so the skipped ones can be told by
+        their absence.
+        """
+        if not entries:
+            return []
+        statement = (
+            postgresql.insert(self.model)
+            .values([self.model.from_orm(entry).dict() for entry in entries])
+            .on_conflict_do_nothing(index_elements=conflict_columns)
+            .returning(*self.model.__table__.columns)
+        )
+        rows = (await self.session.execute(statement)).all()
+        await self._commit()
+        return rows
+
     async def read_many(
         self,
         filters: base.BaseModel,
         sorting: sorting_models.Sorting | None = None,
-        pagination: pagination_models.Pagination = pagination_models.Pagination(),
+        pagination: pagination_models.Pagination
+        | pagination_models.CursorPagination = pagination_models.Pagination(),
+        options: typing.Sequence[LoadOption] = (),
     ) -> list[typing.Any]:
-        statement = self._build_where_statement(
-            sqlmodel.select(self.model), filters
-        ).offset(pagination.offset)
-        if sorting:
-            clause = (
-                sqlmodel.col(sorting.column).desc()
-                if sorting.way == sorting_models.SortingWay.DESC
-                else sqlmodel.col(sorting.column).asc()
+        statement = self._get_statement(
+            ("many", *self._get_page_shape(filters, sorting, pagination)),
+            lambda: self._build_page_statement(
+                sqlmodel.select(self.model), filters, sorting, pagination
+            ),
+            options,
+        )
+        params = self._get_page_params(filters, sorting, pagination)
+        return (await self.session.execute(statement, params)).scalars().all()
+
+    async def read_page(
+        self,
+        filters: base.BaseModel,
+        sorting: sorting_models.Sorting | None = None,
+        pagination: pagination_models.Pagination
+        | pagination_models.CursorPagination = pagination_models.Pagination(),
+        count_mode: pagination_models.CountMode = pagination_models.CountMode.EXACT,
+        options: typing.Sequence[LoadOption] = (),
+    ) -> pagination_models.Page:
+        """
+        Read the page of entries together with the total in a single query.
+
+        The total is selected as an uncorrelated subquery, so Postgres evaluates it
+        once per statement. The estimated count is taken from the table statistics
+        and therefore is used only for the unfiltered queries.
+        """
+        estimated = (
+            count_mode == pagination_models.CountMode.ESTIMATED
+            and not filters.dict(exclude_unset=True)
+        )
+        total_statement = (
+            self._get_statement(
+                ("estimated_count",), self._build_estimated_count_statement
             )
-            statement = statement.order_by(clause)
-        if pagination.limit:
-            statement = statement.limit(pagination.limit)
-        return (await self.session.execute(statement)).scalars().all()
+            if estimated
+            else self._get_count_statement(filters)
+        )
+        statement = self._get_statement(
+            (
+                "page",
+                estimated,
+                *self._get_page_shape(filters, sorting, pagination),
+            ),
+            lambda: self._build_page_statement(
+                sqlmodel.select(
+                    self.model, total_statement.scalar_subquery().correlate(None)
+                ),
+                filters,
+                sorting,
+                pagination,
+            ),
+            options,
+        )
+        params = self._get_page_params(filters, sorting, pagination)
+        rows = (await self.session.execute(statement, params)).all()
+        entries = [entry for entry, _ in rows]
+        if rows:
+            total = rows[0][1]
+        else:
+            # The total can't come with the page when the page is empty
+            total = (
+                await self.session.execute(
+                    total_statement, self._get_filter_params(filters)
+                )
+            ).scalar_one()
+        if estimated and total < 0:
+            # The table hasn't been analyzed yet, so there is no estimate
+            estimated = False
+            total = await self.count(filters)
+        if isinstance(pagination, pagination_models.Pagination):
+            # The estimate can't be lower than what has been just read
+            total = max(total, pagination.offset + len(entries))
+        return pagination_models.Page(
+            items=entries, total=total, total_estimated=estimated
+        )
+
+    def get_next_cursor(
+        self,
+        entries: typing.Sequence[typing.Any],
+        sorting: sorting_models.Sorting | None,
+        pagination: pagination_models.CursorPagination,
+    ) -> pagination_models.PaginationCursor | None:
+        """
+        Return the cursor of the page following the entries read with the cursor.
+
+        A full page doesn't tell whether any rows are left, so the last page can be
+        followed by an empty one.
+        """
+        if len(entries) < pagination.limit:
+            return None
+        column, way = self._get_keyset_sorting(sorting)
+        last_entry = entries[-1]
+        data = {
+            "column": column.key,
+            "way": way.name,
+            "values": [
+                getattr(last_entry, key_column.key)
+                for key_column in self._get_keyset_columns(column)
+            ],
+        }
+        return base64.urlsafe_b64encode(orjson.dumps(data)).decode()
+
+    async def read_one(
+        self, filters: base.BaseModel, options: typing.Sequence[LoadOption] = ()
+    ) -> typing.Any:
+        statement = self._get_statement(
+            ("one", self._get_filter_shape(filters)),
+            lambda: self._build_where_statement(sqlmodel.select(self.model), filters),
+            options,
+        )
+        params = self._get_filter_params(filters)
+        return (await self.session.execute(statement, params)).scalar_one()
+
+    async def attach(self, entry: base.BaseModel) -> typing.Any:
+        """
+        Attach the entry restored from outside the database to the session.
+
+        The entry becomes persistent without being loaded again, so it has to
+        contain the current state of the row, e.g. one taken from a cache.
+        """
+        orm.make_transient_to_detached(entry)
+        return await self.session.merge(entry, load=False)
+
+    async def restore(self, data: dict[str, typing.Any]) -> typing.Any:
+        """
+        Attach the entry of the column values taken from outside the database.
+
+        Unlike the model constructor, it doesn't fill the columns missing from the
+        data with the defaults, so they stay unloaded and are read from the
+        database by load_attributes.
+        """
+        entry = orm.class_mapper(self.model).class_manager.new_instance()
+        for key, value in data.items():
+            orm.attributes.set_committed_value(entry, key, value)
+        return await self.attach(entry)
 
-    async def read_one(self, filters: base.BaseModel) -> typing.Any:
-        statement = self._build_where_statement(sqlmodel.select(self.model), filters)
-        return (await self.session.execute(statement)).scalar_one()
+    async def load_attributes(
+        self, entry: base.BaseModel, attribute_names: typing.Sequence[str]
+    ) -> None:
+        """Load the attributes left out of the entry, e.g. the ones not cached."""
+        unloaded = sqlalchemy.inspect(entry).unloaded.intersection(attribute_names)
+        if unloaded:
+            await self.session.refresh(entry, attribute_names=list(unloaded))
 
     async def update(
         self, db_entry: base.BaseModel, entry: base.BaseModel, refresh: bool = False
@@ -55,23 +288,239 @@ class AppCRUD:  # FIXME: Fix typing
 
     async def delete(self, entry: base.BaseModel) -> None:
         await self.session.delete(entry)
-        await self.session.commit()
+        await self._commit()
+
+    async def delete_batch(
+        self,
+        whereclause: typing.Sequence[typing.Any],
+        batch_size: int,
+        dependents: typing.Sequence[typing.Any] = (),
+    ) -> int:
+        """
+        Delete up to batch_size rows matching the clause with a single statement.
+
+        The rows locked by other transactions are skipped instead of waited for, so
+        the batch doesn't block the requests working on them. The dependents are the
+        foreign key columns referencing the model's id, whose rows are deleted
+        together with the batch. The loaded entries are not synchronized.
+        """
+        table_name = self.model.__tablename__
+        batch = (
+            sqlalchemy.select(self.model.id)
+            .where(*whereclause)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+            .cte(f"{table_name}_batch")
+        )
+        statement: typing.Any = sqlalchemy.delete(self.model).where(
+            self.model.id.in_(sqlalchemy.select(batch.c.id))
+        )
+        for column in dependents:
+            statement = statement.add_cte(
+                sqlalchemy.delete(column.table)
+                .where(column.in_(sqlalchemy.select(batch.c.id)))
+                .cte(f"{column.table.name}_deleted")
+            )
+        result: typing.Any = await self.session.execute(statement)
+        await self._commit()
+        return typing.cast(int, result.rowcount)
 
     async def count(self, filters: base.BaseModel) -> pagination_models.TotalResults:
-        select_statament: expression.SelectOfScalar[typing.Any] = sqlmodel.select(
-            [sqlmodel.func.count()]
-        ).select_from(self.model)
-        where_statement = self._build_where_statement(select_statament, filters)
-        return (await self.session.execute(where_statement)).scalar_one()
+        statement = self._get_count_statement(filters)
+        params = self._get_filter_params(filters)
+        return (await self.session.execute(statement, params)).scalar_one()
 
     async def _save(self, entry: base.BaseModel, refresh: bool = False) -> typing.Any:
+        """
+        Save the entry and keep its state loaded.
+
+        The client-side defaults are already set on the entry and the server-side
+        ones come back with RETURNING (mappers use eager defaults), so the entry
+        is current without reading it again. Refresh only to pick up the changes
+        made outside the ORM, e.g. by triggers.
+        """
         self.session.add(entry)
-        await self.session.commit()
-        self.session.expire(entry)
+        await self._commit()
         if refresh:
+            # Within the transaction scope, the entry may not be in the database yet
+            await self.session.flush()
             await self.session.refresh(entry)
         return entry
 
+    async def _commit(self) -> None:
+        if not self.session.info.get(TRANSACTION_SCOPE_KEY):
+            await self.session.commit()
+
+    def _build_page_statement(
+        self,
+        statement: typing.Any,
+        filters: base.BaseModel,
+        sorting: sorting_models.Sorting | None,
+        pagination: pagination_models.Pagination | pagination_models.CursorPagination,
+    ) -> typing.Any:
+        statement = self._build_where_statement(statement, filters)
+        if isinstance(pagination, pagination_models.CursorPagination):
+            return self._build_keyset_statement(statement, sorting, pagination)
+        statement = statement.offset(
+            sqlalchemy.bindparam("offset", type_=sqlalchemy.Integer)
+        )
+        if sorting:
+            statement = statement.order_by(
+                _get_order_clause(sqlmodel.col(sorting.column), sorting.way)
+            )
+        if pagination.limit:
+            statement = statement.limit(
+                sqlalchemy.bindparam("limit", type_=sqlalchemy.Integer)
+            )
+        return statement
+
+    def _get_statement(
+        self,
+        shape: tuple[typing.Hashable, ...],
+        build: typing.Callable[[], typing.Any],
+        options: typing.Sequence[LoadOption] = (),
+    ) -> typing.Any:
+        statement = statement_cache.get_or_build((self.model, *shape), build)
+        return statement.options(*options) if options else statement
+
+    def _get_count_statement(self, filters: base.BaseModel) -> typing.Any:
+        return self._get_statement(
+            ("count", self._get_filter_shape(filters)),
+            lambda: self._build_count_statement(filters),
+        )
+
+    def _get_filter_shape(self, filters: base.BaseModel) -> tuple[typing.Any, ...]:
+        # None is compared with IS NULL rather than a parameter
+        return tuple(
+            (attr, value is None)
+            for attr, value in filters.dict(exclude_unset=True).items()
+        )
+
+    def _get_page_shape(
+        self,
+        filters: base.BaseModel,
+        sorting: sorting_models.Sorting | None,
+        pagination: pagination_models.Pagination | pagination_models.CursorPagination,
+    ) -> tuple[typing.Any, ...]:
+        sorting_shape = (
+            (sqlmodel.col(sorting.column).key, sorting.way) if sorting else None
+        )
+        # The same truth tests as of the statement and the params, e.g. an empty
+        # cursor reads the first page, as no cursor does
+        if isinstance(pagination, pagination_models.CursorPagination):
+            pagination_shape = ("cursor", bool(pagination.cursor))
+        else:
+            pagination_shape = ("offset", bool(pagination.limit))
+        return self._get_filter_shape(filters), sorting_shape, pagination_shape
+
+    def _get_filter_params(self, filters: base.BaseModel) -> dict[str, typing.Any]:
+        return {
+            f"filter_{attr}": value
+            for attr, value in filters.dict(exclude_unset=True).items()
+            if value is not None
+        }
+
+    def _get_page_params(
+        self,
+        filters: base.BaseModel,
+        sorting: sorting_models.Sorting | None,
+        pagination: pagination_models.Pagination | pagination_models.CursorPagination,
+    ) -> dict[str, typing.Any]:
+        params = self._get_filter_params(filters)
+        if pagination.limit:
+            params["limit"] = pagination.limit
+        if isinstance(pagination, pagination_models.Pagination):
+            params["offset"] = pagination.offset
+        elif pagination.cursor:
+            column, way = self._get_keyset_sorting(sorting)
+            values = self._decode_cursor(pagination.cursor, column, way)
+            params.update(
+                {f"cursor_{index}": value for index, value in enumerate(values)}
+            )
+        return params
+
+    def _build_count_statement(
+        self, filters: base.BaseModel
+    ) -> expression.SelectOfScalar[typing.Any]:
+        select_statament: expression.SelectOfScalar[typing.Any] = sqlmodel.select(
+            [sqlmodel.func.count()]
+        ).select_from(self.model)
+        return self._build_where_statement(select_statament, filters)
+
+    def _build_estimated_count_statement(self) -> typing.Any:
+        table_name = f'"{self.model.__tablename__}"'
+        return (
+            sqlalchemy.select(
+                sqlalchemy.cast(sqlalchemy.column("reltuples"), sqlalchemy.BigInteger)
+            )
+            .select_from(sqlalchemy.table("pg_class"))
+            .where(
+                sqlalchemy.column("oid")
+                == sqlalchemy.func.to_regclass(
+                    sqlalchemy.literal(table_name, sqlalchemy.Text)
+                )
+            )
+        )
+
+    def _build_keyset_statement(
+        self,
+        statement: expression.SelectOfScalar[typing.Any],
+        sorting: sorting_models.Sorting | None,
+        pagination: pagination_models.CursorPagination,
+    ) -> expression.SelectOfScalar[typing.Any]:
+        column, way = self._get_keyset_sorting(sorting)
+        columns = self._get_keyset_columns(column)
+        if pagination.cursor:
+            key: typing.Any = sqlalchemy.tuple_(*columns)
+            last_key: typing.Any = sqlalchemy.tuple_(
+                *(
+                    sqlalchemy.bindparam(f"cursor_{index}", type_=key_column.type)
+                    for index, key_column in enumerate(columns)
+                )
+            )
+            statement = statement.where(
+                key < last_key
+                if way == sorting_models.SortingWay.DESC
+                else key > last_key
+            )
+        return statement.order_by(
+            *(_get_order_clause(key_column, way) for key_column in columns)
+        ).limit(sqlalchemy.bindparam("limit", type_=sqlalchemy.Integer))
+
+    def _get_keyset_sorting(
+        self, sorting: sorting_models.Sorting | None
+    ) -> tuple[typing.Any, sorting_models.SortingWay]:
+        if not sorting:
+            return sqlmodel.col(self.model.id), sorting_models.SortingWay.ASC
+        return sqlmodel.col(sorting.column), sorting.way
+
+    def _get_keyset_columns(self, column: typing.Any) -> list[typing.Any]:
+        # The ID breaks ties between the rows with the same value of the column
+        if column.key == "id":
+            return [column]
+        return [column, sqlmodel.col(self.model.id)]
+
+    def _decode_cursor(
+        self,
+        cursor: pagination_models.PaginationCursor,
+        column: typing.Any,
+        way: sorting_models.SortingWay,
+    ) -> list[typing.Any]:
+        try:
+            data = orjson.loads(base64.urlsafe_b64decode(cursor))
+            if data["column"] != column.key or data["way"] != way.name:
+                raise ValueError("Cursor was created for another sorting")
+            return [
+                pydantic.parse_obj_as(
+                    self.model.__fields__[key_column.key].outer_type_, value
+                )
+                for key_column, value in zip(
+                    self._get_keyset_columns(column), data["values"], strict=True
+                )
+            ]
+        except (binascii.Error, ValueError, TypeError, KeyError) as e:
+            raise pagination_exceptions.InvalidCursorError(cursor) from e
+
     def _build_where_statement(
         self,
         statement: expression.SelectOfScalar[typing.Any],
@@ -79,5 +528,14 @@ class AppCRUD:  # FIXME: Fix typing
     ) -> expression.SelectOfScalar[typing.Any]:
         filters_data = filters.dict(exclude_unset=True)
         for attr, value in filters_data.items():
-            statement = statement.where(getattr(self.model, attr) == value)
+            column = getattr(self.model, attr)
+            statement = statement.where(
+                column.is_(None)
+                if value is None
+                else column == sqlalchemy.bindparam(f"filter_{attr}")
+            )
         return statement
+
+
+def _get_order_clause(column: typing.Any, way: sorting_models.SortingWay) -> typing.Any:
+    return column.desc() if way == sorting_models.SortingWay.DESC else column.asc()
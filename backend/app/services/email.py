@@ -1,3 +1,5 @@
+import asyncio
+import collections
 import logging
 import smtplib
 import socket
@@ -5,13 +7,22 @@ import ssl
 import typing
 from email.mime import multipart, text
 
+import aiosmtplib
+
 from app.config import general
-from app.utils import jinja, translation
+from app.utils import jinja, smtp, translation
 
 log = logging.getLogger(__name__)
 
 settings = general.get_settings()
 
+# Errors after which the session is reset and can send the next message
+RECIPIENT_ERRORS = (
+    smtplib.SMTPRecipientsRefused,
+    smtplib.SMTPSenderRefused,
+    smtplib.SMTPDataError,
+)
+
 
 def load_template(template_name: str, **kwargs: typing.Any) -> str:
     template = jinja.env.get_template(template_name)
@@ -34,13 +45,163 @@ def build_message(
 
 
 def send_email(message: str, receiver: str) -> None:
-    context = ssl.create_default_context()
     try:
-        with smtplib.SMTP_SSL(
-            settings.SMTP_HOST, settings.SMTP_PORT, context=context
-        ) as server:
-            server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
-            response = server.sendmail(settings.EMAIL_SENDER, receiver, message)
-            log.debug("Email response: %r", response)
+        try:
+            response = _sendmail(message, receiver)
+        except smtplib.SMTPServerDisconnected:
+            # The server could have dropped the pooled connection in the meantime
+            response = _sendmail(message, receiver)
+        log.debug("Email response: %r", response)
     except (smtplib.SMTPException, socket.gaierror) as e:
         log.warning("Error occurred when sending an email: %s", e)
+
+
+def send_emails(messages: typing.Sequence[tuple[str, str]]) -> dict[str, str]:
+    """
+    Send the (message, receiver) pairs over as few SMTP sessions as possible.
+
+    A session goes on until its connection reaches the message limit of the pool,
+    and the rest is sent over a new one. A failure of one receiver doesn't stop
+    the others, so the errors are returned by the receiver instead of raised. A
+    dropped connection is replaced and the interrupted message is retried once,
+    while the other session errors fail all the messages left.
+    """
+    errors: dict[str, str] = {}
+    pending = collections.deque(messages)
+    retried = False
+    while pending:
+        try:
+            with smtp_pool.session() as connection:
+                while pending and connection.messages < smtp_pool.max_messages:
+                    message, receiver = pending[0]
+                    try:
+                        connection.server.sendmail(
+                            settings.EMAIL_SENDER, receiver, message
+                        )
+                    except RECIPIENT_ERRORS as e:
+                        errors[receiver] = str(e)
+                    connection.messages += 1
+                    pending.popleft()
+                    retried = False
+        except smtplib.SMTPServerDisconnected as e:
+            if retried:
+                errors[pending.popleft()[1]] = str(e)
+            retried = not retried
+        except (smtplib.SMTPException, socket.gaierror) as e:
+            # The server can't be used, so don't try it for every message
+            errors.update((receiver, str(e)) for _, receiver in pending)
+            pending.clear()
+    for receiver, error in errors.items():
+        log.warning("Error occurred when sending an email to %r: %s", receiver, error)
+    return errors
+
+
+async def send_email_async(message: str, receiver: str) -> None:
+    await _send_async(message, receiver)
+
+
+async def send_emails_async(
+    messages: typing.Sequence[tuple[str, str]]
+) -> dict[str, str]:
+    """
+    Send the (message, receiver) pairs concurrently with the asyncio SMTP client.
+
+    The sends in flight are bounded by the size of the async pool. As in
+    send_emails, the errors are returned by the receiver instead of raised.
+    """
+    results = await asyncio.gather(
+        *(_send_async(message, receiver) for message, receiver in messages)
+    )
+    return {
+        receiver: error
+        for (_, receiver), error in zip(messages, results, strict=True)
+        if error is not None
+    }
+
+
+def send_emails_in_new_loop(
+    messages: typing.Sequence[tuple[str, str]]
+) -> dict[str, str]:
+    """Send the messages with the async backend from the synchronous code."""
+
+    async def send() -> dict[str, str]:
+        try:
+            return await send_emails_async(messages)
+        finally:
+            # The connections can't outlive the loop
+            await async_smtp_pool.close()
+
+    return asyncio.run(send())
+
+
+async def _send_async(message: str, receiver: str) -> str | None:
+    try:
+        try:
+            response = await _sendmail_async(message, receiver)
+        except aiosmtplib.SMTPServerDisconnected:
+            # The server could have dropped the pooled connection in the meantime
+            response = await _sendmail_async(message, receiver)
+    except (aiosmtplib.SMTPException, OSError) as e:
+        log.warning("Error occurred when sending an email to %r: %s", receiver, e)
+        return str(e)
+    log.debug("Email response: %r", response)
+    return None
+
+
+async def _sendmail_async(
+    message: str, receiver: str
+) -> tuple[dict[str, aiosmtplib.SMTPResponse], str]:
+    async with async_smtp_pool.connection() as server:
+        return await server.sendmail(settings.EMAIL_SENDER, receiver, message)
+
+
+def _sendmail(message: str, receiver: str) -> dict[str, tuple[int, bytes]]:
+    with smtp_pool.connection() as server:
+        return server.sendmail(settings.EMAIL_SENDER, receiver, message)
+
+
+def _connect() -> smtplib.SMTP:
+    server = smtplib.SMTP_SSL(
+        settings.SMTP_HOST,
+        settings.SMTP_PORT,
+        timeout=settings.SMTP_TIMEOUT,
+        context=ssl.create_default_context(),
+    )
+    try:
+        server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    except BaseException:
+        server.close()
+        raise
+    return server
+
+
+async def _connect_async() -> aiosmtplib.SMTP:
+    server = aiosmtplib.SMTP(
+        hostname=settings.SMTP_HOST,
+        port=settings.SMTP_PORT,
+        timeout=settings.SMTP_TIMEOUT,
+        use_tls=True,
+        tls_context=ssl.create_default_context(),
+    )
+    await server.connect()
+    try:
+        await server.login(settings.SMTP_USER, settings.SMTP_PASSWORD)
+    except BaseException:
+        server.close()
+        raise
+    return server
+
+
+smtp_pool = smtp.SMTPConnectionPool(
+    connection_factory=_connect,
+    max_size=settings.SMTP_POOL_MAX_SIZE,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    keepalive_interval=settings.SMTP_KEEPALIVE_INTERVAL.total_seconds(),
+)
+
+async_smtp_pool = smtp.AsyncSMTPConnectionPool(
+    connection_factory=_connect_async,
+    max_size=settings.SMTP_ASYNC_MAX_CONNECTIONS,
+    max_messages=settings.SMTP_MAX_MESSAGES_PER_CONNECTION,
+    keepalive_interval=settings.SMTP_KEEPALIVE_INTERVAL.total_seconds(),
+)
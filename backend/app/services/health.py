@@ -1,58 +1,162 @@
+import asyncio
 import socket
+import time
 import typing
 
-import redis
-import sqlmodel
+import sqlalchemy
 from kombu import exceptions as kombu_exceptions
 from redis import exceptions as redis_exceptions
-from sqlalchemy import exc
+from sqlalchemy import exc, pool
 
-from app.config import general
+from app.celery import worker
+from app.config import db, general
+from app.exceptions.app import health as health_app_exceptions
 from app.exceptions.http import health as health_exceptions
-from app.models import user as user_models
-from app.tasks import health as health_tasks
-
-if typing.TYPE_CHECKING:
-    from app.config import db
+from app.models import health as health_models
+from app.utils import cache
 
 settings = general.get_settings()
 
+T = typing.TypeVar("T")
+
+CHECK_ERRORS = (
+    exc.InterfaceError,
+    socket.gaierror,
+    redis_exceptions.RedisError,
+    kombu_exceptions.OperationalError,
+    health_app_exceptions.CeleryPingError,
+)
+
+HEALTH_CACHE_KEY = "health"
+
+health_cache = cache.LRUCache(max_size=1, ttl=settings.HEALTH_CHECK_CACHE_TTL)
+
 
 class HealthService:
     OK_FLAG = "OK"
 
-    def __init__(self, session: "db.AsyncSession"):
-        self.session = session
-
     async def check_health(self) -> None:
-        healths = {
-            "database": await self._check_database(),
-            "redis": self._check_redis(),
-            "celery": self._check_celery(),
-        }
+        """
+        Check the services concurrently, each within the timeout.
+
+        The result is cached for a short time, so frequent probes don't reach the
+        services on every request.
+        """
+        if (healths := health_cache.get(HEALTH_CACHE_KEY)) is None:
+            database, redis, celery = await asyncio.gather(
+                self._run_check(self._execute_test_clause()),
+                self._run_check(self._check_redis()),
+                self._run_check(self._check_celery()),
+            )
+            healths = {"database": database, "redis": redis, "celery": celery}
+            health_cache.set(HEALTH_CACHE_KEY, healths)
         if any(health != self.OK_FLAG for health in healths.values()):
             raise health_exceptions.HealthError(context=healths)
 
-    async def _check_database(self) -> str:
+    async def diagnose(self) -> health_models.Diagnostics:
+        """
+        Inspect the services concurrently, bypassing the cached result.
+
+        The duration of every component is the time of its check in milliseconds,
+        i.e. the round trip to the database and Redis, and the event loop lag.
+        """
+        database, redis, celery, event_loop = await asyncio.gather(
+            self._diagnose_database(),
+            self._diagnose_redis(),
+            self._diagnose_celery(),
+            self._diagnose_event_loop(),
+        )
+        return health_models.Diagnostics(
+            database=database, redis=redis, celery=celery, event_loop=event_loop
+        )
+
+    async def _run_check(self, check: typing.Awaitable[None]) -> str:
+        _, health, _ = await self._measure(check)
+        return health
+
+    async def _measure(self, check: typing.Awaitable[T]) -> tuple[T | None, str, float]:
+        result = None
+        health = self.OK_FLAG
+        started = time.perf_counter()
         try:
-            await self._execute_test_clause()
-        except (exc.InterfaceError, socket.gaierror) as e:
-            return str(e)
-        return self.OK_FLAG
+            result = await asyncio.wait_for(
+                check, timeout=settings.HEALTH_CHECK_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            health = f"Timed out after {settings.HEALTH_CHECK_TIMEOUT} seconds"
+        except CHECK_ERRORS as e:
+            health = str(e)
+        return result, health, (time.perf_counter() - started) * 1000
 
     async def _execute_test_clause(self) -> None:
-        (await self.session.execute(sqlmodel.select(user_models.User).limit(1))).all()
+        # A connection of its own, as the timeout cancels the query mid-flight,
+        # which would leave a shared session unusable
+        async with db.engine.connect() as connection:
+            await connection.execute(sqlalchemy.text("SELECT 1"))
+
+    async def _check_redis(self) -> None:
+        await db.get_cache_db().ping()
+
+    async def _check_celery(self) -> None:
+        # The ping is broadcast to the workers without enqueuing a task. It waits
+        # for the first reply up to half of the timeout, so a missing worker isn't
+        # reported as a timeout.
+        replies = await asyncio.to_thread(
+            worker.app.control.ping, timeout=settings.HEALTH_CHECK_TIMEOUT / 2, limit=1
+        )
+        if not replies:
+            raise health_app_exceptions.CeleryPingError(
+                "No Celery worker replied to the ping"
+            )
+
+    async def _diagnose_database(self) -> health_models.DatabaseDiagnostics:
+        # Read the pool before the check, which checks out a connection itself
+        connection_pool = db.engine.sync_engine.pool
+        pool_size = pool_checked_out = pool_overflow = None
+        if isinstance(connection_pool, pool.QueuePool):
+            pool_size = connection_pool.size()  # type: ignore[no-untyped-call]
+            pool_checked_out = (
+                connection_pool.checkedout()  # type: ignore[no-untyped-call]
+            )
+            pool_overflow = max(
+                connection_pool.overflow(), 0  # type: ignore[no-untyped-call]
+            )
+        _, health, duration = await self._measure(self._execute_test_clause())
+        return health_models.DatabaseDiagnostics(
+            status=health,
+            duration=duration,
+            pool_size=pool_size,
+            pool_checked_out=pool_checked_out,
+            pool_overflow=pool_overflow,
+            pool_saturation=pool_checked_out / pool_size if pool_size else None,
+        )
+
+    async def _diagnose_redis(self) -> health_models.ComponentDiagnostics:
+        _, health, duration = await self._measure(self._check_redis())
+        return health_models.ComponentDiagnostics(status=health, duration=duration)
+
+    async def _diagnose_celery(self) -> health_models.CeleryDiagnostics:
+        queue_depth, health, duration = await self._measure(
+            asyncio.to_thread(_get_queue_depth)
+        )
+        return health_models.CeleryDiagnostics(
+            status=health, duration=duration, queue_depth=queue_depth
+        )
+
+    async def _diagnose_event_loop(self) -> health_models.ComponentDiagnostics:
+        # The time the loop takes to come back to a task that yields
+        _, health, duration = await self._measure(asyncio.sleep(0))
+        return health_models.ComponentDiagnostics(status=health, duration=duration)
 
-    def _check_redis(self) -> str:
-        try:
-            redis.Redis.from_url(settings.REDIS_URL).ping()
-        except redis_exceptions.ConnectionError as e:
-            return str(e)
-        return self.OK_FLAG
 
-    def _check_celery(self) -> str:
+def _get_queue_depth() -> int:
+    # Passive, so the diagnostics don't create the queue
+    with worker.app.connection_for_read() as connection:
         try:
-            health_tasks.check_health.delay()
-        except kombu_exceptions.OperationalError as e:
-            return str(e)
-        return self.OK_FLAG
+            queue = connection.default_channel.queue_declare(
+                queue=worker.app.conf.task_default_queue, passive=True
+            )
+        except kombu_exceptions.ChannelError:
+            # The Redis broker drops the key of the queue once it's empty
+            return 0
+    return typing.cast(int, queue.message_count)
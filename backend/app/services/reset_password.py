@@ -1,11 +1,12 @@
 import datetime
 import typing
 
-from sqlalchemy import exc
+import sqlalchemy
+from sqlalchemy import exc, orm
 
 from app.exceptions.http import reset_password as reset_password_exceptions
+from app.models import helpers
 from app.models import reset_password as reset_password_models
-from app.models import sorting as sorting_models
 from app.services import base
 
 if typing.TYPE_CHECKING:
@@ -19,23 +20,26 @@ class ResetPasswordService:
     async def create_token(
         self, token: reset_password_models.ResetPasswordTokenCreate
     ) -> reset_password_models.ResetPasswordToken:
-        sorting = sorting_models.Sorting(
-            column=reset_password_models.ResetPasswordToken.expire_at,
-            way=sorting_models.SortingWay.DESC,
+        """Expire all the live tokens of the user and create a new one at once."""
+        now = helpers.get_utcnow()
+        model = reset_password_models.ResetPasswordToken
+        expire_live_tokens = (
+            sqlalchemy.update(model)
+            .where(model.user_id == token.user_id, model.expire_at > now)
+            # Set explicitly, because the onupdate default would conflict with the
+            # parameter of the same name in the INSERT
+            .values(expire_at=now, updated_at=now)
+            .cte("expired_tokens")
         )
-        sorted_tokens = await self.crud.read_many(
-            reset_password_models.ResetPasswordTokenFilters(user_id=token.user_id),
-            sorting=sorting,
-        )
-        if sorted_tokens:
-            await self.force_to_expire(sorted_tokens[0])
-        return await self.crud.create(token, refresh=True)
+        return await self.crud.create_with(token, ctes=[expire_live_tokens])
 
     async def get_token(
-        self, filters: reset_password_models.ResetPasswordTokenFilters
+        self,
+        filters: reset_password_models.ResetPasswordTokenFilters,
+        options: typing.Sequence[base.LoadOption] = (),
     ) -> reset_password_models.ResetPasswordToken:
         try:
-            return await self.crud.read_one(filters)
+            return await self.crud.read_one(filters, options)
         except exc.NoResultFound as e:
             filters_data = filters.dict(exclude_unset=True)
             raise reset_password_exceptions.ResetPasswordTokenNotFoundError(
@@ -45,7 +49,11 @@ class ResetPasswordService:
     async def get_valid_token(
         self, filters: reset_password_models.ResetPasswordTokenFilters
     ) -> reset_password_models.ResetPasswordToken:
-        token = await self.get_token(filters)
+        """Get the valid token along with its user, loaded in the same query."""
+        token = await self.get_token(
+            filters,
+            options=[orm.joinedload(reset_password_models.ResetPasswordToken.user)],
+        )
         if token.is_expired:
             raise reset_password_exceptions.ResetPasswordTokenExpiredError(
                 context={"id": token.id}
@@ -63,3 +71,11 @@ class ResetPasswordService:
                 expire_at=datetime.datetime.utcnow()
             ),
         )
+
+    async def purge_expired_tokens(
+        self, expired_before: datetime.datetime, batch_size: int
+    ) -> int:
+        model = reset_password_models.ResetPasswordToken
+        return await self.crud.delete_batch(
+            [model.expire_at < expired_before], batch_size
+        )
@@ -1,26 +1,55 @@
+import asyncio
+import collections
 import datetime
 import logging
 import typing
 
+import pydantic
+import sqlalchemy
 from sqlalchemy import exc
 
-from app.config import general
+from app.config import db, general
+from app.exceptions.app import pagination as pagination_app_exceptions
+from app.exceptions.http import pagination as pagination_http_exceptions
 from app.exceptions.http import user as user_exceptions
 from app.models import pagination as pagination_models
 from app.models import reset_password as reset_password_models
+from app.models import sorting as sorting_models
 from app.models import user as user_models
 from app.services import base
 from app.services import reset_password as reset_password_services
 from app.tasks import user as user_tasks
-from app.utils import auth
-
-if typing.TYPE_CHECKING:
-    from app.config import db
+from app.utils import auth, batching, cache
 
 log = logging.getLogger(__name__)
 
 settings = general.get_settings()
 
+# Without the password hash, as the cache may be shared with other services
+# through Redis
+CACHED_USER_FIELDS = set(user_models.UserCached.__fields__)
+
+user_cache = cache.TieredCache(
+    namespace="user",
+    local=cache.LRUCache(
+        max_size=settings.USER_CACHE_MAX_SIZE, ttl=settings.USER_CACHE_TTL
+    ),
+    redis_db=db.get_cache_db() if settings.USER_CACHE_REDIS_ENABLED else None,
+)
+
+confirm_email_buffer = batching.TaskBuffer(
+    name="confirm_email",
+    task=user_tasks.send_emails_to_confirm_email,
+    max_size=settings.EMAIL_BATCH_MAX_SIZE,
+    window=settings.EMAIL_BATCH_WINDOW.total_seconds(),
+)
+reset_password_buffer = batching.TaskBuffer(
+    name="reset_password",
+    task=user_tasks.send_emails_to_reset_password,
+    max_size=settings.EMAIL_BATCH_MAX_SIZE,
+    window=settings.EMAIL_BATCH_WINDOW.total_seconds(),
+)
+
 
 class UserService:
     def __init__(self, session: "db.AsyncSession"):
@@ -30,33 +59,166 @@ class UserService:
         )
 
     async def create_user(self, user: user_models.UserCreate) -> user_models.User:
-        user.password = auth.hash_password(user.password)
+        user.password = await auth.hash_password(user.password)
         try:
-            user_db = await self.crud.create(user, refresh=True)
+            user_db = await self.crud.create(user)
         except exc.IntegrityError as e:
             raise user_exceptions.UserAlreadyExistsError(
                 context={"email": user.email}
             ) from e
-        user_tasks.send_email_to_confirm_email.delay(
-            user_db.email, user_db.email_confirmation_token
-        )
+        if settings.EMAIL_BATCH_ENABLED:
+            confirm_email_buffer.add(
+                (user_db.email, str(user_db.email_confirmation_token))
+            )
+        else:
+            user_tasks.send_email_to_confirm_email.delay(
+                user_db.email, user_db.email_confirmation_token
+            )
         log.info("The task to send email to confirm email has been invoked")
         return user_db
 
+    async def import_users(
+        self, users: typing.Sequence[dict[str, typing.Any]]
+    ) -> user_models.UserImportReport:
+        """
+        Create many users at once, reporting the outcome for every row.
+
+        Invalid rows and duplicates, both of the existing users and within the
+        import itself, are skipped without failing the rest of the import.
+        """
+        results: dict[int, user_models.UserImportResult] = {}
+        users_to_create: dict[
+            user_models.UserEmail, tuple[int, user_models.UserCreate]
+        ] = {}
+        for index, user_data in enumerate(users):
+            try:
+                user = user_models.UserCreate.parse_obj(user_data)
+            except pydantic.ValidationError as e:
+                results[index] = user_models.UserImportResult(
+                    index=index,
+                    email=email
+                    if isinstance(email := user_data.get("email"), str)
+                    else None,
+                    status=user_models.UserImportStatus.INVALID,
+                    errors=[error["msg"] for error in e.errors()],
+                )
+                continue
+            if user.email in users_to_create:
+                results[index] = _get_duplicate_result(index, user.email)
+                continue
+            users_to_create[user.email] = (index, user)
+        batch_size = settings.USER_IMPORT_BATCH_SIZE
+        batches = list(users_to_create.values())
+        for start in range(0, len(batches), batch_size):
+            batch = batches[start : start + batch_size]
+            results.update(await self._create_users_batch(batch))
+        ordered_results = [results[index] for index in sorted(results)]
+        statuses = collections.Counter(result.status for result in ordered_results)
+        return user_models.UserImportReport(
+            created=statuses[user_models.UserImportStatus.CREATED],
+            duplicates=statuses[user_models.UserImportStatus.DUPLICATE],
+            invalid=statuses[user_models.UserImportStatus.INVALID],
+            results=ordered_results,
+        )
+
+    async def _create_users_batch(
+        self, batch: list[tuple[int, user_models.UserCreate]]
+    ) -> dict[int, user_models.UserImportResult]:
+        # The hashes are computed concurrently by the password hashing workers
+        hashed_passwords = await asyncio.gather(
+            *(auth.hash_password(user.password) for _, user in batch)
+        )
+        for (_, user), hashed_password in zip(batch, hashed_passwords, strict=True):
+            user.password = hashed_password
+        created_users = await self.crud.create_many(
+            [user for _, user in batch], conflict_columns=[user_models.User.email]
+        )
+        if created_users:
+            user_tasks.send_emails_to_confirm_email.delay(
+                [
+                    (user.email, str(user.email_confirmation_token))
+                    for user in created_users
+                ]
+            )
+            log.info("The task to send emails to confirm email has been invoked")
+        created_emails = {user.email for user in created_users}
+        return {
+            index: user_models.UserImportResult(
+                index=index,
+                email=user.email,
+                status=user_models.UserImportStatus.CREATED,
+            )
+            if user.email in created_emails
+            else _get_duplicate_result(index, user.email)
+            for index, user in batch
+        }
+
     async def get_users(
         self,
         filters: user_models.UserFilters,
-        pagination: pagination_models.Pagination = pagination_models.Pagination(),
+        pagination: pagination_models.Pagination
+        | pagination_models.CursorPagination = pagination_models.Pagination(),
+        sorting: sorting_models.Sorting | None = None,
     ) -> list[user_models.User]:
-        return await self.crud.read_many(filters, pagination=pagination)
+        try:
+            async with base.read_scope(self.crud.session):
+                return await self.crud.read_many(filters, sorting, pagination)
+        except pagination_app_exceptions.InvalidCursorError as e:
+            raise pagination_http_exceptions.InvalidCursorError(
+                context={"cursor": str(e)}
+            ) from e
+
+    async def get_users_page(
+        self,
+        filters: user_models.UserFilters,
+        pagination: pagination_models.Pagination
+        | pagination_models.CursorPagination = pagination_models.Pagination(),
+        sorting: sorting_models.Sorting | None = None,
+        count_mode: pagination_models.CountMode = pagination_models.CountMode.EXACT,
+    ) -> pagination_models.Page:
+        try:
+            async with base.read_scope(self.crud.session):
+                return await self.crud.read_page(
+                    filters, sorting, pagination, count_mode
+                )
+        except pagination_app_exceptions.InvalidCursorError as e:
+            raise pagination_http_exceptions.InvalidCursorError(
+                context={"cursor": str(e)}
+            ) from e
+
+    def get_next_users_cursor(
+        self,
+        users: list[user_models.User],
+        sorting: sorting_models.Sorting | None,
+        pagination: pagination_models.CursorPagination,
+    ) -> pagination_models.PaginationCursor | None:
+        return self.crud.get_next_cursor(users, sorting, pagination)
 
     async def get_user(self, filters: user_models.UserFilters) -> user_models.User:
+        # Read from the primary, as the user is read to be authenticated or updated
         try:
             return await self.crud.read_one(filters)
         except exc.NoResultFound as e:
             filters_data = filters.dict(exclude_unset=True)
             raise user_exceptions.UserNotFoundError(context=filters_data) from e
 
+    async def get_cached_user(self, user_id: user_models.UserID) -> user_models.User:
+        """
+        Get user by ID, served from the user cache when possible.
+
+        The cache is meant for the hot authentication path, so don't use it when
+        the user is going to be checked against the current state in the database.
+        The cached user has only CACHED_USER_FIELDS loaded, so load the other ones
+        before using them.
+        """
+        if cached_user := await user_cache.get(str(user_id)):
+            return await self.crud.restore(
+                user_models.UserCached.parse_obj(cached_user).dict()
+            )
+        user = await self.get_user(user_models.UserFilters(id=user_id))
+        await user_cache.set(str(user.id), user.dict(include=CACHED_USER_FIELDS))
+        return user
+
     async def get_active_user(
         self, filters: user_models.UserFilters
     ) -> user_models.User:
@@ -69,16 +231,21 @@ class UserService:
         self, user_db: user_models.User, user_update: user_models.UserUpdate
     ) -> user_models.User:
         if user_update.password:
-            user_update.password = auth.hash_password(user_update.password)
-        return await self.crud.update(user_db, user_update, refresh=True)
+            user_update.password = await auth.hash_password(user_update.password)
+        updated_user = await self.crud.update(user_db, user_update)
+        await user_cache.delete(str(updated_user.id))
+        return updated_user
 
     async def delete_user(self, user: user_models.User) -> None:
+        user_id = user.id
         await self.crud.delete(user)
+        await user_cache.delete(str(user_id))
 
     async def count_users(
         self, filters: user_models.UserFilters
     ) -> pagination_models.TotalResults:
-        return await self.crud.count(filters)
+        async with base.read_scope(self.crud.session):
+            return await self.crud.count(filters)
 
     async def change_password(
         self,
@@ -86,10 +253,15 @@ class UserService:
         current_password: user_models.UserPassword,
         new_password: user_models.UserPassword,
     ) -> None:
-        if not auth.verify_password(current_password, user.password):
+        await self.crud.load_attributes(user, ["password"])
+        if not await auth.verify_password(current_password, user.password):
             raise user_exceptions.InvalidPasswordError()
-        user_update = user_models.UserUpdate(password=auth.hash_password(new_password))
+        user_id = user.id
+        user_update = user_models.UserUpdate(
+            password=await auth.hash_password(new_password)
+        )
         await self.crud.update(user, user_update)
+        await user_cache.delete(str(user_id))
 
     async def confirm_email(self, user: user_models.User) -> None:
         context = {"id": user.email_confirmation_token}
@@ -97,14 +269,19 @@ class UserService:
             raise user_exceptions.EmailAlreadyConfirmedError(context=context)
         if _token_expired(user):
             raise user_exceptions.EmailConfirmationTokenExpiredError(context=context)
+        user_id = user.id
         user_update = user_models.UserUpdate(confirmed_email=True)
         await self.crud.update(user, user_update)
+        await user_cache.delete(str(user_id))
 
     async def reset_password(self, user: user_models.User) -> None:
         token = await self.reset_password_service.create_token(
             reset_password_models.ResetPasswordTokenCreate(user_id=user.id)
         )
-        user_tasks.send_email_to_reset_password.delay(user.email, token.id)
+        if settings.EMAIL_BATCH_ENABLED:
+            reset_password_buffer.add((user.email, str(token.id)))
+        else:
+            user_tasks.send_email_to_reset_password.delay(user.email, token.id)
         log.info("The task to send email to reset password has been invoked")
 
     async def set_password(
@@ -117,11 +294,41 @@ class UserService:
         user = token_db.user
         if not user.is_active:
             raise user_exceptions.InactiveUserError(context={"id": user.id})
-        user_update = user_models.UserUpdate(password=auth.hash_password(password))
-        await self.crud.update(user, user_update)
-        await self.reset_password_service.force_to_expire(token_db)
+        user_update = user_models.UserUpdate(
+            password=await auth.hash_password(password)
+        )
+        async with base.transaction(self.crud.session):
+            await self.crud.update(user, user_update)
+            await self.reset_password_service.force_to_expire(token_db)
+        await user_cache.delete(str(token_db.user_id))
+
+    async def purge_unconfirmed_users(
+        self, created_before: datetime.datetime, batch_size: int
+    ) -> int:
+        """
+        Delete a batch of the users who didn't confirm email before created_before.
+
+        The reset password tokens of the users are deleted along with them.
+        """
+        model = user_models.User
+        return await self.crud.delete_batch(
+            [
+                sqlalchemy.not_(model.confirmed_email),
+                model.created_at < created_before,
+            ],
+            batch_size,
+            dependents=[reset_password_models.ResetPasswordToken.user_id],
+        )
 
 
 def _token_expired(user: user_models.User) -> bool:
     expiration_date = user.created_at + settings.EMAIL_CONFIRMATION_TOKEN_EXPIRES
     return expiration_date < datetime.datetime.utcnow()
+
+
+def _get_duplicate_result(
+    index: int, email: user_models.UserEmail
+) -> user_models.UserImportResult:
+    return user_models.UserImportResult(
+        index=index, email=email, status=user_models.UserImportStatus.DUPLICATE
+    )
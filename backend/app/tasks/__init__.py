@@ -1,8 +1,16 @@
-from .health import check_health
-from .user import send_email_to_confirm_email, send_email_to_reset_password
+from .purge import purge_expired_reset_password_tokens, purge_unconfirmed_users
+from .user import (
+    send_email_to_confirm_email,
+    send_email_to_reset_password,
+    send_emails_to_confirm_email,
+    send_emails_to_reset_password,
+)
 
 __all__ = [
-    "check_health",
+    "purge_expired_reset_password_tokens",
+    "purge_unconfirmed_users",
     "send_email_to_confirm_email",
     "send_email_to_reset_password",
+    "send_emails_to_confirm_email",
+    "send_emails_to_reset_password",
 ]
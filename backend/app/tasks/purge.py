@@ -0,0 +1,65 @@
+import asyncio
+import logging
+import typing
+
+import celery
+
+from app.config import db, general
+from app.models import helpers
+from app.services import reset_password as reset_password_services
+from app.services import user as user_services
+from app.utils import metrics
+
+log = logging.getLogger(__name__)
+
+settings = general.get_settings()
+
+PurgeBatch: typing.TypeAlias = typing.Callable[
+    ["db.AsyncSession"], typing.Awaitable[int]
+]
+
+
+@celery.shared_task
+def purge_expired_reset_password_tokens() -> int:
+    expired_before = helpers.get_utcnow() - settings.RESET_PASSWORD_TOKEN_RETENTION
+
+    async def purge_batch(session: "db.AsyncSession") -> int:
+        return await reset_password_services.ResetPasswordService(
+            session
+        ).purge_expired_tokens(expired_before, settings.PURGE_BATCH_SIZE)
+
+    return asyncio.run(_purge("reset_password_tokens", purge_batch))
+
+
+@celery.shared_task
+def purge_unconfirmed_users() -> int:
+    created_before = helpers.get_utcnow() - (
+        settings.EMAIL_CONFIRMATION_TOKEN_EXPIRES + settings.UNCONFIRMED_USER_RETENTION
+    )
+
+    async def purge_batch(session: "db.AsyncSession") -> int:
+        return await user_services.UserService(session).purge_unconfirmed_users(
+            created_before, settings.PURGE_BATCH_SIZE
+        )
+
+    return asyncio.run(_purge("unconfirmed_users", purge_batch))
+
+
+async def _purge(name: str, purge_batch: PurgeBatch) -> int:
+    """
+    Delete the rows batch by batch, each committed separately.
+
+    The run stops at the first partial batch or after PURGE_MAX_BATCHES, so a large
+    backlog is spread over the next runs instead of holding the worker.
+    """
+    purged = 0
+    async with db.get_task_session() as session:
+        for _ in range(settings.PURGE_MAX_BATCHES):
+            batch_purged = await purge_batch(session)
+            purged += batch_purged
+            if batch_purged < settings.PURGE_BATCH_SIZE:
+                break
+    metrics.counter(f"purged_{name}").inc(purged)
+    metrics.gauge(f"purged_{name}_last_run").set(purged)
+    log.info("Purged %d %s", purged, name.replace("_", " "))
+    return purged
@@ -2,9 +2,11 @@ import logging
 import typing
 
 import celery
+from celery import signals
 
 from app.config import general
 from app.services import email as email_services
+from app.utils import jinja
 from app.utils.translation import gettext_lazy as _
 
 if typing.TYPE_CHECKING:
@@ -16,41 +18,106 @@ log = logging.getLogger(__name__)
 settings = general.get_settings()
 
 
+@signals.worker_init.connect
+def precompile_email_templates(**_kwargs: typing.Any) -> None:
+    # The worker processes forked from the main one inherit the compiled templates
+    jinja.precompile_templates()
+
+
+@signals.worker_process_shutdown.connect
+def close_smtp_pool(**_kwargs: typing.Any) -> None:
+    email_services.smtp_pool.close()
+
+
 @celery.shared_task
 def send_email_to_confirm_email(
     email: "user.UserEmail", token: "user.UserEmailConfirmationToken"
 ) -> None:
+    message = _build_message_to_confirm_email(email, token)
+    email_services.send_email(message, email)
+    log.info("Email to confirm email has been sent to %r", email)
+
+
+@celery.shared_task
+def send_emails_to_confirm_email(
+    recipients: list[tuple["user.UserEmail", "user.UserEmailConfirmationToken"]]
+) -> dict[str, str]:
+    errors = _send_emails(
+        [
+            (_build_message_to_confirm_email(email, token), email)
+            for email, token in recipients
+        ]
+    )
+    log.info(
+        "Emails to confirm email have been sent to %d of %d recipients",
+        len(recipients) - len(errors),
+        len(recipients),
+    )
+    return errors
+
+
+@celery.shared_task
+def send_email_to_reset_password(
+    email: "user.UserEmail", token: "reset_password.ResetPasswordTokenID"
+) -> None:
+    message = _build_message_to_reset_password(email, token)
+    email_services.send_email(message, email)
+    log.info("Email to reset password has been sent to %r", email)
+
+
+@celery.shared_task
+def send_emails_to_reset_password(
+    recipients: list[tuple["user.UserEmail", "reset_password.ResetPasswordTokenID"]]
+) -> dict[str, str]:
+    errors = _send_emails(
+        [
+            (_build_message_to_reset_password(email, token), email)
+            for email, token in recipients
+        ]
+    )
+    log.info(
+        "Emails to reset password have been sent to %d of %d recipients",
+        len(recipients) - len(errors),
+        len(recipients),
+    )
+    return errors
+
+
+def _send_emails(messages: list[tuple[str, str]]) -> dict[str, str]:
+    if settings.EMAIL_BACKEND == "async":
+        return email_services.send_emails_in_new_loop(messages)
+    return email_services.send_emails(messages)
+
+
+def _build_message_to_confirm_email(
+    email: "user.UserEmail", token: "user.UserEmailConfirmationToken"
+) -> str:
     link = settings.CONFIRM_EMAIL_URL.format(token=token)
     subject = _("Confirm email")
     message_text = _("Click the link to confirm your email: %(link)s") % {"link": link}
     message_html = email_services.load_template(
         template_name="confirm_email.html.jinja", link=link
     )
-    message = email_services.build_message(
+    return email_services.build_message(
         message_html=message_html,
         message_text=message_text,
         subject=subject,
         receiver=email,
     )
-    email_services.send_email(message, email)
-    log.info("Email to confirm email has been sent to %r", email)
 
 
-@celery.shared_task
-def send_email_to_reset_password(
-    email: "user.UserEmail", token: "reset_password.ResetPasswordToken"
-) -> None:
+def _build_message_to_reset_password(
+    email: "user.UserEmail", token: "reset_password.ResetPasswordTokenID"
+) -> str:
     link = settings.RESET_PASSWORD_URL.format(token=token)
     subject = _("Reset password")
     message_text = _("Click the link to reset your password: %(link)s") % {"link": link}
     message_html = email_services.load_template(
         template_name="reset_password_email.html.jinja", link=link
     )
-    message = email_services.build_message(
+    return email_services.build_message(
         message_html=message_html,
         message_text=message_text,
         subject=subject,
         receiver=email,
     )
-    email_services.send_email(message, email)
-    log.info("Email to reset password has been sent to %r", email)
@@ -1,4 +1,5 @@
 import typing
+from unittest import mock
 
 import fastapi
 import fastapi_paseto_auth as paseto_auth
@@ -7,6 +8,7 @@ from fastapi_paseto_auth import exceptions
 from starlette import datastructures
 
 from app.api.deps import user as user_deps
+from app.config import db
 from app.exceptions.http import user as user_exceptions
 from app.tests.helpers import user as user_helpers
 from app.utils import converters
@@ -33,6 +35,61 @@ async def test_get_current_user(session: "conftest.AsyncSession") -> None:
     assert current_user == user
 
 
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value=None,
+)
+@mock.patch("app.services.user.UserService.get_cached_user")
+@pytest.mark.parametrize("read_only_request", [True, False])
+async def test_get_current_user_reads_from_replica_in_read_only_request(
+    mock_get_cached_user: mock.AsyncMock, _: mock.AsyncMock, read_only_request: bool
+) -> None:
+    session = db.AsyncSession()
+    session.sync_session.info[db.READ_ONLY_KEY] = read_only_request
+    token = paseto_auth.AuthPASETO().create_access_token(
+        "1dd53909-fcda-4c72-afcd-1bf4886389f8"
+    )
+    request = fastapi.Request(
+        scope={
+            "type": "http",
+            "headers": datastructures.Headers({"Authorization": f"Bearer {token}"}).raw,
+        }
+    )
+    mock_get_cached_user.side_effect = lambda _: session.sync_session.info[
+        db.READ_ONLY_KEY
+    ]
+
+    read_only = await user_deps.get_current_user(
+        session, paseto_auth.AuthPASETO(request)
+    )
+
+    assert read_only == read_only_request
+
+
+@pytest.mark.anyio
+async def test_get_current_user_revoked_token(
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_user(session=session)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    request = fastapi.Request(
+        scope={
+            "type": "http",
+            "headers": datastructures.Headers({"Authorization": f"Bearer {token}"}).raw,
+        }
+    )
+
+    with mock.patch(
+        "app.config.auth.paseto_token_db.get",
+        new_callable=mock.AsyncMock,
+        return_value="true",
+    ):
+        with pytest.raises(exceptions.RevokedTokenError):
+            await user_deps.get_current_user(session, paseto_auth.AuthPASETO(request))
+
+
 @pytest.mark.anyio
 async def test_get_current_user_without_token(session: "conftest.AsyncSession") -> None:
     request = fastapi.Request(
@@ -82,6 +139,25 @@ async def test_get_current_active_user_inactive(
     assert exc_info.value.context == {"id": user.id}
 
 
+@pytest.mark.anyio
+async def test_get_current_admin_user(session: "conftest.AsyncSession") -> None:
+    user = await user_helpers.create_active_user(session=session, is_admin=True)
+
+    current_user = await user_deps.get_current_admin_user(user)
+
+    assert current_user == user
+
+
+@pytest.mark.anyio
+async def test_get_current_admin_user_not_admin(
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_active_user(session=session)
+
+    with pytest.raises(user_exceptions.UserForbiddenError):
+        await user_deps.get_current_admin_user(user)
+
+
 @pytest.mark.anyio
 async def test_check_user_requests_own_data(session: "conftest.AsyncSession") -> None:
     user = await user_helpers.create_active_user(session=session)
@@ -1,9 +1,13 @@
 import typing
 from unittest import mock
 
+import fastapi_paseto_auth as paseto_auth
 import pytest
 from fastapi import status
 
+from app.models import health as health_models
+from app.tests.helpers import user as user_helpers
+
 if typing.TYPE_CHECKING:
     from app.tests import conftest
 
@@ -19,3 +23,87 @@ async def test_check_health(
 
     assert response.status_code == status.HTTP_204_NO_CONTENT
     assert not response.content
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health.HealthService.check_health", return_value=None)
+async def test_check_readiness(
+    mock_check_health: mock.AsyncMock, async_client: "conftest.TestClient"
+) -> None:
+    response = await async_client.get(f"{API_URL}/health/ready")
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    mock_check_health.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health.HealthService.check_health")
+async def test_check_liveness(
+    mock_check_health: mock.AsyncMock, async_client: "conftest.TestClient"
+) -> None:
+    response = await async_client.get(f"{API_URL}/health/live")
+
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+    assert not response.content
+    mock_check_health.assert_not_called()
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health.HealthService.diagnose")
+async def test_get_diagnostics(
+    mock_diagnose: mock.AsyncMock,
+    async_client: "conftest.TestClient",
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_active_user(session=session, is_admin=True)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+    mock_diagnose.return_value = health_models.Diagnostics(
+        database=health_models.DatabaseDiagnostics(
+            status="OK",
+            duration=1.5,
+            pool_size=5,
+            pool_checked_out=1,
+            pool_overflow=0,
+            pool_saturation=0.2,
+        ),
+        redis=health_models.ComponentDiagnostics(status="OK", duration=0.5),
+        celery=health_models.CeleryDiagnostics(
+            status="OK", duration=2.0, queue_depth=3
+        ),
+        event_loop=health_models.ComponentDiagnostics(status="OK", duration=0.1),
+    )
+
+    response = await async_client.get(f"{API_URL}/health/diagnostics", headers=headers)
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "database": {
+            "status": "OK",
+            "duration": 1.5,
+            "poolSize": 5,
+            "poolCheckedOut": 1,
+            "poolOverflow": 0,
+            "poolSaturation": 0.2,
+        },
+        "redis": {"status": "OK", "duration": 0.5},
+        "celery": {"status": "OK", "duration": 2.0, "queueDepth": 3},
+        "eventLoop": {"status": "OK", "duration": 0.1},
+    }
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health.HealthService.diagnose")
+async def test_get_diagnostics_not_admin(
+    mock_diagnose: mock.AsyncMock,
+    async_client: "conftest.TestClient",
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_active_user(session=session)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get(f"{API_URL}/health/diagnostics", headers=headers)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+    mock_diagnose.assert_not_called()
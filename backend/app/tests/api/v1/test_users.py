@@ -2,16 +2,21 @@ import typing
 from unittest import mock
 
 import fastapi_paseto_auth as paseto_auth
+import freezegun
 import pytest
 from fastapi import status
 
+from app.config import general
 from app.exceptions.http import user as user_exceptions
+from app.models import user as user_models
 from app.tests.helpers import response as response_helpers
 from app.tests.helpers import user as user_helpers
 
 if typing.TYPE_CHECKING:
     from app.tests import conftest
 
+settings = general.get_settings()
+
 API_URL = "/api/v1"
 
 
@@ -239,6 +244,192 @@ async def test_get_user(
     )
 
 
+@pytest.mark.anyio
+@mock.patch("app.services.user.UserService.import_users")
+async def test_import_users(
+    mock_import_users: mock.AsyncMock,
+    async_client: "conftest.TestClient",
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_active_user(session=session, is_admin=True)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+    users = [{"email": "test@email.com", "password": "plain_password", "name": "Test"}]
+    mock_import_users.return_value = user_models.UserImportReport(
+        created=1,
+        duplicates=0,
+        invalid=0,
+        results=[
+            user_models.UserImportResult(
+                index=0,
+                email="test@email.com",
+                status=user_models.UserImportStatus.CREATED,
+            )
+        ],
+    )
+
+    response = await async_client.post(
+        f"{API_URL}/users/import", json=users, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_200_OK
+    assert response.json() == {
+        "created": 1,
+        "duplicates": 0,
+        "invalid": 0,
+        "results": [
+            {"index": 0, "email": "test@email.com", "status": "created", "errors": []}
+        ],
+    }
+    mock_import_users.assert_called_once_with(users)
+
+
+@pytest.mark.anyio
+async def test_import_users_too_many(
+    async_client: "conftest.TestClient", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_active_user(session=session, is_admin=True)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+    users = [{"email": "test@email.com"}] * (settings.USER_IMPORT_MAX_SIZE + 1)
+
+    response = await async_client.post(
+        f"{API_URL}/users/import", json=users, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_422_UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.anyio
+async def test_import_users_not_admin(
+    async_client: "conftest.TestClient", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_active_user(session=session)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+    users = [{"email": "test@email.com", "password": "plain_password", "name": "Test"}]
+
+    response = await async_client.post(
+        f"{API_URL}/users/import", json=users, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.anyio
+async def test_get_users(
+    async_client: "conftest.TestClient", session: "conftest.AsyncSession"
+) -> None:
+    with freezegun.freeze_time("2022-02-05 13:30:00"):
+        user_1 = await user_helpers.create_active_user(session=session, is_admin=True)
+    with freezegun.freeze_time("2022-02-05 13:30:01"):
+        user_2 = await user_helpers.create_user(session=session)
+    with freezegun.freeze_time("2022-02-05 13:30:02"):
+        user_3 = await user_helpers.create_active_user(session=session)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user_1.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get(
+        f"{API_URL}/users/",
+        params={"sortBy": "created_at", "sortWay": "desc", "limit": 2},
+        headers=headers,
+    )
+    first_page = response.json()
+    response = await async_client.get(
+        f"{API_URL}/users/",
+        params={
+            "sortBy": "created_at",
+            "sortWay": "desc",
+            "limit": 2,
+            "cursor": first_page["nextCursor"],
+        },
+        headers=headers,
+    )
+    second_page = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert first_page["items"] == response_helpers.format_response(
+        [
+            {"id": user.id, "email": user.email, "name": user.name}
+            for user in [user_3, user_2]
+        ]
+    )
+    assert first_page["total"] == 3
+    assert not first_page["totalEstimated"]
+    assert second_page == response_helpers.format_response(
+        {
+            "items": [{"id": user_1.id, "email": user_1.email, "name": user_1.name}],
+            "total": 3,
+            "totalEstimated": False,
+            "nextCursor": None,
+        }
+    )
+
+
+@pytest.mark.anyio
+async def test_get_users_filters(
+    async_client: "conftest.TestClient", session: "conftest.AsyncSession"
+) -> None:
+    admin = await user_helpers.create_active_user(session=session, is_admin=True)
+    user = await user_helpers.create_user(session=session)
+    token = paseto_auth.AuthPASETO().create_access_token(str(admin.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get(
+        f"{API_URL}/users/",
+        params={"confirmedEmail": False, "estimateTotal": True},
+        headers=headers,
+    )
+    users_page = response.json()
+
+    assert response.status_code == status.HTTP_200_OK
+    assert users_page["items"] == response_helpers.format_response(
+        [{"id": user.id, "email": user.email, "name": user.name}]
+    )
+    assert users_page["total"] == 1
+
+
+@pytest.mark.anyio
+async def test_get_users_invalid_cursor(
+    async_client: "conftest.TestClient", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_active_user(session=session, is_admin=True)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get(
+        f"{API_URL}/users/", params={"cursor": "invalid"}, headers=headers
+    )
+
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.anyio
+async def test_get_users_inactive_user(
+    async_client: "conftest.TestClient", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_user(session=session)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get(f"{API_URL}/users/", headers=headers)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.anyio
+async def test_get_users_not_admin(
+    async_client: "conftest.TestClient", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_active_user(session=session)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    response = await async_client.get(f"{API_URL}/users/", headers=headers)
+
+    assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
 @pytest.mark.anyio
 async def test_get_user_inactive_user(
     async_client: "conftest.TestClient", session: "conftest.AsyncSession"
@@ -0,0 +1,304 @@
+import asyncio
+import datetime
+import time
+import typing
+from unittest import mock
+
+import pytest
+from fastapi_paseto_auth import exceptions
+from redis import exceptions as redis_exceptions
+
+from app.config import auth
+from app.utils import metrics
+
+PAYLOAD = {"jti": "1dd53909-fcda-4c72-afcd-1bf4886389f8", "type": "access"}
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value="true",
+)
+async def test_check_if_token_in_denylist(mock_get: mock.AsyncMock) -> None:
+    assert await auth.check_if_token_in_denylist(PAYLOAD)
+    mock_get.assert_called_once_with(PAYLOAD["jti"])
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value=None,
+)
+async def test_check_if_token_in_denylist_not_revoked(_: mock.AsyncMock) -> None:
+    assert not await auth.check_if_token_in_denylist(PAYLOAD)
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value=None,
+)
+async def test_ensure_token_not_revoked(_: mock.AsyncMock) -> None:
+    await auth.ensure_token_not_revoked(PAYLOAD)
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value="true",
+)
+async def test_ensure_token_not_revoked_revoked(_: mock.AsyncMock) -> None:
+    with pytest.raises(exceptions.RevokedTokenError):
+        await auth.ensure_token_not_revoked(PAYLOAD)
+
+
+@pytest.mark.anyio
+@mock.patch("app.config.auth.settings.AUTHPASETO_DENYLIST_ENABLED", new=False)
+@mock.patch("app.config.auth.paseto_token_db.get", new_callable=mock.AsyncMock)
+async def test_ensure_token_not_revoked_denylist_disabled(
+    mock_get: mock.AsyncMock,
+) -> None:
+    await auth.ensure_token_not_revoked(PAYLOAD)
+
+    mock_get.assert_not_called()
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.settings.AUTHPASETO_DENYLIST_TOKEN_CHECKS", new={"refresh"}
+)
+@mock.patch("app.config.auth.paseto_token_db.get", new_callable=mock.AsyncMock)
+async def test_ensure_token_not_revoked_type_not_checked(
+    mock_get: mock.AsyncMock,
+) -> None:
+    await auth.ensure_token_not_revoked(PAYLOAD)
+
+    mock_get.assert_not_called()
+
+
+async def _scan_iter(
+    *keys: str,
+) -> typing.AsyncGenerator[str, None]:
+    for key in keys:
+        yield key
+
+
+def _create_filter(
+    redis_db: mock.MagicMock, capacity: int = 100
+) -> auth.RevokedTokenFilter:
+    return auth.RevokedTokenFilter(
+        redis_db,
+        channel="revoked_tokens",
+        capacity=capacity,
+        false_positive_rate=0.01,
+        rebuild_interval=datetime.timedelta(minutes=10),
+        max_staleness=datetime.timedelta(seconds=5),
+    )
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value=None,
+)
+async def test_check_if_token_in_denylist_filter_short_circuits(
+    mock_get: mock.AsyncMock,
+) -> None:
+    redis_db = mock.MagicMock(scan_iter=lambda **_: _scan_iter())
+    token_filter = _create_filter(redis_db)
+    await token_filter.rebuild()
+
+    with mock.patch("app.config.auth.revoked_token_filter", token_filter):
+        assert not await auth.check_if_token_in_denylist(PAYLOAD)
+
+    mock_get.assert_not_called()
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.config.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value=None,
+)
+async def test_check_if_token_in_denylist_filter_false_positive(
+    _: mock.AsyncMock,
+) -> None:
+    redis_db = mock.MagicMock(scan_iter=lambda **_: _scan_iter(PAYLOAD["jti"]))
+    token_filter = _create_filter(redis_db)
+    await token_filter.rebuild()
+    false_positives = metrics.counter("denylist_filter_false_positives").value
+
+    with mock.patch("app.config.auth.revoked_token_filter", token_filter):
+        assert not await auth.check_if_token_in_denylist(PAYLOAD)
+
+    assert (
+        metrics.counter("denylist_filter_false_positives").value == false_positives + 1
+    )
+
+
+def test_revoked_token_filter_might_contain_not_built() -> None:
+    token_filter = _create_filter(mock.MagicMock())
+    redis_lookups = metrics.counter("denylist_filter_redis_lookups").value
+
+    assert token_filter.might_contain("jti")
+    assert metrics.counter("denylist_filter_redis_lookups").value == redis_lookups + 1
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_rebuild() -> None:
+    redis_db = mock.MagicMock(scan_iter=lambda **_: _scan_iter("jti_1", "jti_2"))
+    token_filter = _create_filter(redis_db)
+    short_circuits = metrics.counter("denylist_filter_short_circuits").value
+
+    await token_filter.rebuild()
+
+    assert token_filter.might_contain("jti_1")
+    assert token_filter.might_contain("jti_2")
+    assert not token_filter.might_contain("jti_3")
+    assert metrics.counter("denylist_filter_short_circuits").value == short_circuits + 1
+    assert metrics.gauge("denylist_filter_items").value == 2
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_rebuild_over_capacity(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    redis_db = mock.MagicMock(scan_iter=lambda **_: _scan_iter("jti_1", "jti_2"))
+    token_filter = _create_filter(redis_db, capacity=1)
+
+    await token_filter.rebuild()
+
+    assert "over its capacity" in caplog.text
+
+
+def test_revoked_token_filter_add_not_built() -> None:
+    token_filter = _create_filter(mock.MagicMock())
+
+    token_filter.add("jti")
+
+    assert token_filter.filter is None
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_publish() -> None:
+    redis_db = mock.MagicMock(
+        scan_iter=lambda **_: _scan_iter(), publish=mock.AsyncMock()
+    )
+    token_filter = _create_filter(redis_db)
+    await token_filter.rebuild()
+
+    await token_filter.publish("jti")
+
+    assert token_filter.might_contain("jti")
+    redis_db.publish.assert_called_once_with("revoked_tokens", "jti")
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_sync() -> None:
+    pubsub = mock.AsyncMock()
+    pubsub.__aenter__.return_value = pubsub
+    pubsub.get_message.side_effect = [
+        {"type": "message", "data": "jti_1"},
+        {"type": "pong", "data": ""},
+        None,
+        redis_exceptions.ConnectionError(),
+    ]
+    redis_db = mock.MagicMock(
+        scan_iter=lambda **_: _scan_iter(), pubsub=mock.Mock(return_value=pubsub)
+    )
+    token_filter = _create_filter(redis_db)
+
+    with pytest.raises(redis_exceptions.ConnectionError):
+        await token_filter.sync()
+
+    pubsub.subscribe.assert_called_once_with("revoked_tokens")
+    assert token_filter.might_contain("jti_1")
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_sync_pings() -> None:
+    pubsub = mock.AsyncMock()
+    pubsub.__aenter__.return_value = pubsub
+    pubsub.get_message.side_effect = [None, redis_exceptions.ConnectionError()]
+    redis_db = mock.MagicMock(
+        scan_iter=lambda **_: _scan_iter(), pubsub=mock.Mock(return_value=pubsub)
+    )
+    token_filter = _create_filter(redis_db)
+    token_filter.max_staleness = 0
+
+    with pytest.raises(redis_exceptions.ConnectionError):
+        await token_filter.sync()
+
+    assert pubsub.ping.call_count == 2
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_stale() -> None:
+    redis_db = mock.MagicMock(scan_iter=lambda **_: _scan_iter())
+    token_filter = _create_filter(redis_db)
+    await token_filter.rebuild()
+
+    # Nothing has arrived through the subscription since the rebuild
+    with mock.patch("time.monotonic", return_value=time.monotonic() + 6):
+        assert token_filter.might_contain("jti")
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_sync_rebuilds_periodically() -> None:
+    pubsub = mock.AsyncMock()
+    pubsub.__aenter__.return_value = pubsub
+    pubsub.get_message.side_effect = [None, redis_exceptions.ConnectionError()]
+    redis_db = mock.MagicMock(pubsub=mock.Mock(return_value=pubsub))
+    token_filter = _create_filter(redis_db)
+    token_filter.rebuild_interval = 0
+
+    with mock.patch.object(
+        token_filter, "rebuild", new_callable=mock.AsyncMock
+    ) as mock_rebuild:
+        with pytest.raises(redis_exceptions.ConnectionError):
+            await token_filter.sync()
+
+    assert mock_rebuild.call_count == 2
+
+
+@pytest.mark.anyio
+@mock.patch("asyncio.sleep", side_effect=asyncio.CancelledError)
+async def test_revoked_token_filter_run_failure(_: mock.AsyncMock) -> None:
+    redis_db = mock.MagicMock(scan_iter=lambda **_: _scan_iter())
+    token_filter = _create_filter(redis_db)
+    await token_filter.rebuild()
+
+    with mock.patch.object(
+        token_filter, "sync", side_effect=redis_exceptions.ConnectionError()
+    ):
+        with pytest.raises(asyncio.CancelledError):
+            await token_filter.run()
+
+    assert token_filter.filter is None
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_start_stop() -> None:
+    redis_db = mock.MagicMock(scan_iter=lambda **_: _scan_iter())
+    token_filter = _create_filter(redis_db)
+    await token_filter.rebuild()
+
+    with mock.patch.object(token_filter, "run", new_callable=mock.AsyncMock):
+        token_filter.start()
+        await token_filter.stop()
+
+    assert token_filter.filter is None
+
+
+@pytest.mark.anyio
+async def test_revoked_token_filter_stop_not_started() -> None:
+    token_filter = _create_filter(mock.MagicMock())
+
+    await token_filter.stop()
+
+    assert token_filter.filter is None
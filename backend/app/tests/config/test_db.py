@@ -0,0 +1,219 @@
+import asyncio
+import os
+import typing
+
+import fastapi
+import pytest
+import sqlalchemy
+from sqlalchemy.ext import asyncio as sqlalchemy_asyncio
+
+from app.config import db
+from app.utils import db_pool
+
+primary_engine = sqlalchemy_asyncio.create_async_engine(db.settings.DATABASE_URL)
+# A single instance poses as the replica, like a local setup without replication
+replica_engine = sqlalchemy_asyncio.create_async_engine(
+    db.settings.DATABASE_URL, execution_options={"postgresql_readonly": True}
+)
+
+
+# Points to PgBouncer in the transaction mode, e.g. the one of the compose setup
+PGBOUNCER_DATABASE_URL = os.environ.get("PGBOUNCER_DATABASE_URL")
+
+requires_pgbouncer = pytest.mark.skipif(
+    not PGBOUNCER_DATABASE_URL, reason="PGBOUNCER_DATABASE_URL is not set"
+)
+
+
+def create_session(
+    replicas: typing.Sequence[sqlalchemy_asyncio.AsyncEngine] = (replica_engine,),
+) -> db.RoutingSession:
+    return db.RoutingSession(bind=primary_engine.sync_engine, replicas=replicas)
+
+
+@pytest.mark.anyio
+async def test_get_task_session() -> None:
+    async with db.get_task_session() as session:
+        result = await session.execute(sqlalchemy.select(1))
+
+    assert result.scalar_one() == 1
+
+
+def test_routing_session_reads_from_replica_when_read_only() -> None:
+    session = create_session()
+    session.info[db.READ_ONLY_KEY] = True
+
+    bind = session.get_bind(clause=sqlalchemy.select(1))
+
+    assert bind is replica_engine.sync_engine
+
+
+def test_routing_session_reads_from_primary_when_not_read_only() -> None:
+    session = create_session()
+
+    bind = session.get_bind(clause=sqlalchemy.select(1))
+
+    assert bind is primary_engine.sync_engine
+
+
+def test_routing_session_reads_from_primary_without_replicas() -> None:
+    session = create_session(replicas=())
+    session.info[db.READ_ONLY_KEY] = True
+
+    bind = session.get_bind(clause=sqlalchemy.select(1))
+
+    assert bind is primary_engine.sync_engine
+
+
+@pytest.mark.parametrize(
+    "clause",
+    [
+        sqlalchemy.insert(sqlalchemy.table("user")),
+        sqlalchemy.update(sqlalchemy.table("user")),
+        sqlalchemy.delete(sqlalchemy.table("user")),
+    ],
+)
+def test_routing_session_writes_to_primary(clause: typing.Any) -> None:
+    session = create_session()
+    session.info[db.READ_ONLY_KEY] = True
+
+    bind = session.get_bind(clause=clause)
+
+    assert bind is primary_engine.sync_engine
+
+
+def test_routing_session_flushes_to_primary() -> None:
+    session = create_session()
+    session.info[db.READ_ONLY_KEY] = True
+    # pylint: disable-next=protected-access
+    session._flushing = True  # type: ignore[attr-defined]
+
+    bind = session.get_bind()
+
+    assert bind is primary_engine.sync_engine
+
+
+def test_routing_session_reads_own_writes() -> None:
+    session = create_session()
+    session.info[db.READ_ONLY_KEY] = True
+
+    session.get_bind(clause=sqlalchemy.delete(sqlalchemy.table("user")))
+    bind = session.get_bind(clause=sqlalchemy.select(1))
+
+    assert bind is primary_engine.sync_engine
+
+
+@pytest.mark.anyio
+async def test_read_only() -> None:
+    session = db.AsyncSession()
+
+    with db.read_only(session):
+        assert session.sync_session.info[db.READ_ONLY_KEY]
+    assert not session.sync_session.info[db.READ_ONLY_KEY]
+
+
+@pytest.mark.anyio
+async def test_routing_session_replica_transaction_is_read_only() -> None:
+    session = db.AsyncSession(
+        bind=primary_engine,
+        sync_session_class=db.RoutingSession,
+        replicas=[replica_engine],
+    )
+    async with session:
+        with db.read_only(session):
+            result = await session.execute(
+                sqlalchemy.text("SHOW transaction_read_only")
+            )
+        read_only = result.scalar_one()
+    await primary_engine.dispose()
+    await replica_engine.dispose()
+
+    assert read_only == "on"
+
+
+@requires_pgbouncer
+@pytest.mark.anyio
+async def test_pgbouncer_mode_shares_server_connections() -> None:
+    # More clients than the server connections, so the clients take turns on them
+    pgbouncer_engine = sqlalchemy_asyncio.create_async_engine(
+        PGBOUNCER_DATABASE_URL,
+        pool_size=20,
+        connect_args=db_pool.get_connect_args(pgbouncer=True),
+    )
+
+    async def run_transaction(value: int) -> list[int]:
+        async with pgbouncer_engine.begin() as connection:
+            statement = sqlalchemy.select(sqlalchemy.literal(value))
+            return [
+                (await connection.execute(statement)).scalar_one() for _ in range(3)
+            ]
+
+    try:
+        results = await asyncio.gather(
+            *(run_transaction(value) for value in range(100))
+        )
+    finally:
+        await pgbouncer_engine.dispose()
+
+    assert results == [[value] * 3 for value in range(100)]
+
+
+@requires_pgbouncer
+@pytest.mark.anyio
+async def test_pgbouncer_mode_keeps_replica_transactions_read_only() -> None:
+    pgbouncer_engine = sqlalchemy_asyncio.create_async_engine(
+        PGBOUNCER_DATABASE_URL,
+        execution_options={"postgresql_readonly": True},
+        connect_args=db_pool.get_connect_args(pgbouncer=True),
+    )
+
+    try:
+        async with pgbouncer_engine.begin() as connection:
+            result = await connection.execute(
+                sqlalchemy.text("SHOW transaction_read_only")
+            )
+            read_only = result.scalar_one()
+    finally:
+        await pgbouncer_engine.dispose()
+
+    assert read_only == "on"
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("method, read_only", [("GET", True), ("POST", False)])
+async def test_get_session(method: str, read_only: bool) -> None:
+    sessions = db.request_sessions.value
+    request = fastapi.Request(scope={"type": "http", "method": method})
+    session_generator = db.get_session(request)
+
+    session = await anext(session_generator)
+    assert session.sync_session.info[db.READ_ONLY_KEY] is read_only
+    with pytest.raises(StopAsyncIteration):
+        await anext(session_generator)
+
+    assert db.request_sessions.value == sessions + 1
+
+
+@pytest.mark.anyio
+async def test_record_session_usage_unconnected() -> None:
+    sessions = db.request_sessions.value
+    unconnected_sessions = db.unconnected_request_sessions.value
+
+    async with db.session_factory() as session:
+        db.record_session_usage(session)
+
+    assert db.request_sessions.value == sessions + 1
+    assert db.unconnected_request_sessions.value == unconnected_sessions + 1
+
+
+@pytest.mark.anyio
+async def test_record_session_usage_connected() -> None:
+    sessions = db.request_sessions.value
+    unconnected_sessions = db.unconnected_request_sessions.value
+
+    async with db.session_factory(bind=primary_engine, replicas=()) as session:
+        await session.execute(sqlalchemy.text("SELECT 1"))
+        db.record_session_usage(session)
+
+    assert db.request_sessions.value == sessions + 1
+    assert db.unconnected_request_sessions.value == unconnected_sessions
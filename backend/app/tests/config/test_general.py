@@ -0,0 +1,15 @@
+import pydantic
+import pytest
+
+from app.config import general
+
+
+def test_security_previous_secret_keys() -> None:
+    settings = general.Security(AUTHPASETO_PREVIOUS_SECRET_KEYS={"2022": "secret"})
+
+    assert settings.AUTHPASETO_PREVIOUS_SECRET_KEYS == {"2022": "secret"}
+
+
+def test_security_previous_secret_keys_primary_key_id() -> None:
+    with pytest.raises(pydantic.ValidationError):
+        general.Security(AUTHPASETO_PREVIOUS_SECRET_KEYS={"primary": "secret"})
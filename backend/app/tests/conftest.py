@@ -10,6 +10,8 @@ from sqlalchemy.ext import asyncio
 from app import main
 from app.celery import worker
 from app.config import db, general
+from app.services import email as email_services
+from app.services import user as user_services
 from app.tests.mocks import email as email_mocks
 
 if typing.TYPE_CHECKING:
@@ -77,6 +79,9 @@ async def session_fixture(  # pylint: disable=unused-argument
     )
     async with session_factory() as session:
         yield session
+    # Redis connections are bound to the event loop of the test that opened them
+    await db.get_paseto_token_db().connection_pool.disconnect()
+    await db.get_cache_db().connection_pool.disconnect()
 
 
 @pytest.fixture(name="async_client")
@@ -93,3 +98,15 @@ async def async_client_fixture(
 def mock_common_fixture(monkeypatch: "pytest_monkeypatch.MonkeyPatch") -> None:
     monkeypatch.setattr("smtplib.SMTP", email_mocks.MockSMTP)
     monkeypatch.setattr("smtplib.SMTP_SSL", email_mocks.MockSMTP_SSL)
+
+
+@pytest.fixture(name="clear_user_cache", autouse=True)
+def clear_user_cache_fixture() -> typing.Generator[None, None, None]:
+    yield
+    user_services.user_cache.local.clear()
+
+
+@pytest.fixture(name="close_smtp_pool", autouse=True)
+def close_smtp_pool_fixture() -> typing.Generator[None, None, None]:
+    yield
+    email_services.smtp_pool.close()
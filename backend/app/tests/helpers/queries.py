@@ -0,0 +1,40 @@
+import contextlib
+import typing
+
+from sqlalchemy import event
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.ext import asyncio
+
+
+@contextlib.contextmanager
+def count_queries(
+    engine: "asyncio.AsyncEngine",
+) -> typing.Generator[list[str], None, None]:
+    statements: list[str] = []
+
+    def on_execute(*args: typing.Any) -> None:
+        # The statement is the third positional argument of the event
+        statements.append(args[2])
+
+    event.listen(engine.sync_engine, "before_cursor_execute", on_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", on_execute)
+
+
+@contextlib.contextmanager
+def count_commits(
+    engine: "asyncio.AsyncEngine",
+) -> typing.Generator[list[None], None, None]:
+    commits: list[None] = []
+
+    def on_commit(*_: typing.Any) -> None:
+        commits.append(None)
+
+    event.listen(engine.sync_engine, "commit", on_commit)
+    try:
+        yield commits
+    finally:
+        event.remove(engine.sync_engine, "commit", on_commit)
@@ -0,0 +1,199 @@
+import typing
+from unittest import mock
+
+import fastapi_paseto_auth as paseto_auth
+import pytest
+
+from app.models import pagination
+from app.models import reset_password as reset_password_models
+from app.models import user as user_models
+from app.services import auth as auth_services
+from app.services import reset_password as reset_password_services
+from app.services import user as user_services
+from app.tests.helpers import queries
+from app.tests.helpers import reset_password as reset_password_helpers
+from app.tests.helpers import user as user_helpers
+from app.utils import auth as auth_utils
+
+if typing.TYPE_CHECKING:
+    from sqlalchemy.ext import asyncio
+
+    from app.tests import conftest
+
+API_URL = "/api/v1"
+
+
+@pytest.mark.anyio
+async def test_get_user_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_user(session)
+    await reset_password_helpers.create_reset_password_token(session, user_id=user.id)
+
+    with queries.count_queries(engine) as statements:
+        await user_services.UserService(session).get_user(
+            user_models.UserFilters(id=user.id)
+        )
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+async def test_get_users_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    for _ in range(3):
+        user = await user_helpers.create_user(session)
+        await reset_password_helpers.create_reset_password_token(
+            session, user_id=user.id
+        )
+
+    with queries.count_queries(engine) as statements:
+        await user_services.UserService(session).get_users(user_models.UserFilters())
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+async def test_get_users_page_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    for _ in range(3):
+        await user_helpers.create_user(session)
+
+    with queries.count_queries(engine) as statements:
+        await user_services.UserService(session).get_users_page(
+            user_models.UserFilters(), pagination.Pagination(limit=2)
+        )
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.user.user_tasks.send_email_to_confirm_email.delay")
+async def test_create_user_queries(
+    _: mock.MagicMock,
+    engine: "asyncio.AsyncEngine",
+    session: "conftest.AsyncSession",
+) -> None:
+    user_create = user_models.UserCreate(
+        email="test@email.com", password="plain_password", name="Test User"
+    )
+
+    with queries.count_queries(engine) as statements:
+        await user_services.UserService(session).create_user(user_create)
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+async def test_update_user_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_user(session)
+    user_update = user_models.UserUpdate(name="Updated Name")
+
+    with queries.count_queries(engine) as statements:
+        updated_user = await user_services.UserService(session).update_user(
+            user, user_update
+        )
+        assert updated_user.name == "Updated Name"
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+async def test_obtain_tokens_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    password = "plain_password"
+    user = await user_helpers.create_active_user(
+        session, password=await auth_utils.hash_password(password)
+    )
+
+    with queries.count_queries(engine) as statements:
+        await auth_services.AuthService(session).obtain_tokens(user.email, password)
+
+    # Read the user and update the last login
+    assert len(statements) == 2
+
+
+@pytest.mark.anyio
+async def test_get_cached_user_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_user(session)
+    user_service = user_services.UserService(session)
+    await user_service.get_cached_user(user.id)
+
+    with queries.count_queries(engine) as statements:
+        await user_service.get_cached_user(user.id)
+
+    assert not statements
+
+
+@pytest.mark.anyio
+async def test_get_valid_token_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    token = await reset_password_helpers.create_reset_password_token(session)
+    token_id = token.id
+    session.expunge_all()
+
+    with queries.count_queries(engine) as statements:
+        token_db = await reset_password_services.ResetPasswordService(
+            session
+        ).get_valid_token(reset_password_models.ResetPasswordTokenFilters(id=token_id))
+        assert token_db.user.id == token_db.user_id
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+async def test_get_me_queries(
+    engine: "asyncio.AsyncEngine",
+    async_client: "conftest.TestClient",
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_active_user(session)
+    await reset_password_helpers.create_reset_password_token(session, user_id=user.id)
+    token = paseto_auth.AuthPASETO().create_access_token(str(user.id))
+    headers = {"Authorization": f"Bearer {token}"}
+
+    with queries.count_queries(engine) as statements:
+        await async_client.get(f"{API_URL}/users/me", headers=headers)
+        await async_client.get(f"{API_URL}/users/me", headers=headers)
+
+    assert len(statements) == 1
+
+
+@pytest.mark.anyio
+async def test_create_reset_password_token_commits(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_user(session)
+    await reset_password_helpers.create_reset_password_token(session, user_id=user.id)
+
+    with queries.count_commits(engine) as commits:
+        await reset_password_services.ResetPasswordService(session).create_token(
+            reset_password_models.ResetPasswordTokenCreate(user_id=user.id)
+        )
+
+    assert len(commits) == 1
+
+
+@pytest.mark.anyio
+async def test_set_password_commits(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_active_user(session)
+    token = await reset_password_helpers.create_reset_password_token(
+        session, user_id=user.id
+    )
+
+    with queries.count_commits(engine) as commits:
+        await user_services.UserService(session).set_password(
+            token.id, "new_plain_password"
+        )
+
+    assert len(commits) == 1
@@ -31,8 +31,9 @@ async def test_user_model(session: "conftest.AsyncSession") -> None:
     assert user.created_at == datetime.datetime(2022, 1, 16, 22, 0, 0)
     assert user.updated_at == datetime.datetime(2022, 1, 16, 22, 0, 0)
     assert user.last_login is None
+    assert user.is_admin is False
     assert user.is_active is False
-    assert not user.reset_password_tokens
+    assert not await session.run_sync(lambda _: user.reset_password_tokens)
 
 
 @pytest.mark.anyio
@@ -131,9 +131,13 @@ async def test_auth_service_refresh_no_refresh_type(
 
 
 @pytest.mark.anyio
-@mock.patch("app.services.auth.paseto_token_db.get", return_value="true")
+@mock.patch(
+    "app.services.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value="true",
+)
 async def test_auth_service_refresh_revoked_token(
-    _: mock.MagicMock, session: "conftest.AsyncSession"
+    _: mock.AsyncMock, session: "conftest.AsyncSession"
 ) -> None:
     user_id = "1dd53909-fcda-4c72-afcd-1bf4886389f8"
     token = paseto_auth.AuthPASETO().create_refresh_token(user_id)
@@ -146,9 +150,9 @@ async def test_auth_service_refresh_revoked_token(
 @pytest.mark.anyio
 @freezegun.freeze_time("2022-02-06 12:30:00")
 @mock.patch("app.services.user.UserService.get_user")
-@mock.patch("app.services.auth.paseto_token_db.setex")
+@mock.patch("app.services.auth.paseto_token_db.setex", new_callable=mock.AsyncMock)
 async def test_auth_service_revoke_access_token(
-    mock_redis_setex: mock.MagicMock,
+    mock_redis_setex: mock.AsyncMock,
     _: mock.AsyncMock,
     session: "conftest.AsyncSession",
 ) -> None:
@@ -167,9 +171,9 @@ async def test_auth_service_revoke_access_token(
 @pytest.mark.anyio
 @freezegun.freeze_time("2022-02-06 12:30:00")
 @mock.patch("app.services.user.UserService.get_user")
-@mock.patch("app.services.auth.paseto_token_db.setex")
+@mock.patch("app.services.auth.paseto_token_db.setex", new_callable=mock.AsyncMock)
 async def test_auth_service_revoke_refresh_token(
-    mock_redis_setex: mock.MagicMock,
+    mock_redis_setex: mock.AsyncMock,
     _: mock.AsyncMock,
     session: "conftest.AsyncSession",
 ) -> None:
@@ -211,9 +215,13 @@ async def test_auth_service_revoke_token_already_expired(
 
 
 @pytest.mark.anyio
-@mock.patch("app.services.auth.paseto_token_db.get", return_value="true")
+@mock.patch(
+    "app.services.auth.paseto_token_db.get",
+    new_callable=mock.AsyncMock,
+    return_value="true",
+)
 async def test_auth_service_revoke_already_revoked_token(
-    _: mock.MagicMock, session: "conftest.AsyncSession"
+    _: mock.AsyncMock, session: "conftest.AsyncSession"
 ) -> None:
     user_id = "1dd53909-fcda-4c72-afcd-1bf4886389f8"
     token = paseto_auth.AuthPASETO().create_access_token(user_id)
@@ -225,9 +233,9 @@ async def test_auth_service_revoke_already_revoked_token(
 
 @pytest.mark.anyio
 @mock.patch("app.services.user.UserService.get_user")
-@mock.patch("app.services.auth.paseto_token_db.set")
+@mock.patch("app.services.auth.paseto_token_db.set", new_callable=mock.AsyncMock)
 async def test_auth_service_revoke_token_missing_expiration(
-    mock_redis_set: mock.MagicMock, _: mock.AsyncMock, session: "conftest.AsyncSession"
+    mock_redis_set: mock.AsyncMock, _: mock.AsyncMock, session: "conftest.AsyncSession"
 ) -> None:
     user_id = "1dd53909-fcda-4c72-afcd-1bf4886389f8"
     token = paseto_auth.AuthPASETO().create_access_token(user_id, expires_time=False)
@@ -236,3 +244,39 @@ async def test_auth_service_revoke_token_missing_expiration(
 
     jti = auth_utils.decode_token_payload(token)["jti"]
     mock_redis_set.assert_called_with(jti, "true")
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.user.UserService.get_user")
+@mock.patch(
+    "app.services.auth.auth_config.revoked_token_filter.publish",
+    new_callable=mock.AsyncMock,
+)
+async def test_auth_service_revoke_token_publishes_to_filter(
+    mock_publish: mock.AsyncMock, _: mock.AsyncMock, session: "conftest.AsyncSession"
+) -> None:
+    user_id = "1dd53909-fcda-4c72-afcd-1bf4886389f8"
+    token = paseto_auth.AuthPASETO().create_access_token(user_id)
+
+    await auth_services.AuthService(session).revoke_token(token=token)
+
+    jti = auth_utils.decode_token_payload(token)["jti"]
+    mock_publish.assert_called_once_with(jti)
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.user.UserService.get_user")
+@mock.patch("app.services.auth.settings.DENYLIST_FILTER_ENABLED", new=False)
+@mock.patch(
+    "app.services.auth.auth_config.revoked_token_filter.publish",
+    new_callable=mock.AsyncMock,
+)
+async def test_auth_service_revoke_token_filter_disabled(
+    mock_publish: mock.AsyncMock, _: mock.AsyncMock, session: "conftest.AsyncSession"
+) -> None:
+    user_id = "1dd53909-fcda-4c72-afcd-1bf4886389f8"
+    token = paseto_auth.AuthPASETO().create_access_token(user_id)
+
+    await auth_services.AuthService(session).revoke_token(token=token)
+
+    mock_publish.assert_not_called()
@@ -2,15 +2,21 @@ import typing
 import uuid
 
 import pytest
+import sqlalchemy
 import sqlmodel
 from sqlalchemy import exc
 
+from app.config import db as db_config
+from app.exceptions.app import pagination as pagination_exceptions
 from app.models import base as base_models
 from app.models import helpers, pagination, sorting
 from app.services import base as base_services
-from app.tests.helpers import db
+from app.tests.helpers import db, queries
+from app.utils import metrics
 
 if typing.TYPE_CHECKING:
+    from sqlalchemy.ext import asyncio
+
     from app.tests import conftest
 
 
@@ -47,11 +53,27 @@ async def test_app_crud_create(session: "conftest.AsyncSession") -> None:
         model_create
     )
 
-    assert created_entry._sa_instance_state.expired  # pylint: disable=protected-access
+    assert (
+        not created_entry._sa_instance_state.expired  # pylint: disable=protected-access
+    )
+    assert created_entry.name == model_create.name
+    assert created_entry.age == model_create.age
     statement = sqlmodel.select(DummyModel).where(DummyModel.name == model_create.name)
     assert (await session.execute(statement)).scalar_one()
 
 
+@pytest.mark.anyio
+async def test_app_crud_create_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    model_create = DummyModel(name="Test Entry", age=25)
+
+    with queries.count_queries(engine) as statements:
+        await base_services.AppCRUD(DummyModel, session).create(model_create)
+
+    assert len(statements) == 1
+
+
 @pytest.mark.anyio
 async def test_app_crud_create_refresh(session: "conftest.AsyncSession") -> None:
     model_create = DummyModel(name="Test Entry", age=25)
@@ -68,6 +90,64 @@ async def test_app_crud_create_refresh(session: "conftest.AsyncSession") -> None
     assert (await session.execute(statement)).scalar_one()
 
 
+@pytest.mark.anyio
+async def test_app_crud_create_many(session: "conftest.AsyncSession") -> None:
+    existing_entry = await create_entry(session, name="Test Entry 1", age=25)
+    entries = [
+        DummyModel(id=existing_entry.id, name="Test Entry 1", age=25),
+        DummyModel(name="Test Entry 2", age=26),
+    ]
+
+    rows = await base_services.AppCRUD(DummyModel, session).create_many(
+        entries, conflict_columns=[DummyModel.id]
+    )
+
+    assert [(row.name, row.age) for row in rows] == [("Test Entry 2", 26)]
+    assert (
+        await base_services.AppCRUD(DummyModel, session).count(DummyModelFilters()) == 2
+    )
+
+
+@pytest.mark.anyio
+async def test_app_crud_create_many_no_entries(
+    session: "conftest.AsyncSession",
+) -> None:
+    rows = await base_services.AppCRUD(DummyModel, session).create_many(
+        [], conflict_columns=[DummyModel.id]
+    )
+
+    assert not rows
+
+
+@pytest.mark.anyio
+async def test_app_crud_create_with(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    existing_entry = await create_entry(session, name="Test Entry 1", age=25)
+    existing_entry_id = existing_entry.id
+    model_create = DummyModel(name="Test Entry 2", age=26)
+    renamed_entries = (
+        sqlalchemy.update(DummyModel)
+        .where(DummyModel.id == existing_entry_id)
+        .values(city="Boston")
+        .cte("renamed_entries")
+    )
+
+    with queries.count_queries(engine) as statements:
+        created_entry = await base_services.AppCRUD(DummyModel, session).create_with(
+            model_create, ctes=[renamed_entries]
+        )
+
+    assert len(statements) == 1
+    assert created_entry.name == model_create.name
+    assert created_entry.age == model_create.age
+    session.expunge_all()
+    crud = base_services.AppCRUD(DummyModel, session)
+    entry_db = await crud.read_one(DummyModelFilters(name="Test Entry 1"))
+    assert entry_db.city == "Boston"
+    assert await crud.read_one(DummyModelFilters(name="Test Entry 2"))
+
+
 @pytest.mark.anyio
 async def test_app_crud_read_many(session: "conftest.AsyncSession") -> None:
     entry_1 = await create_entry(session, name="Test Entry 1", age=25)
@@ -132,6 +212,245 @@ async def test_app_crud_read_many_pagination(session: "conftest.AsyncSession") -
     assert retrieved_entries == [entry_2, entry_3]
 
 
+@pytest.mark.anyio
+async def test_app_crud_read_many_cursor_pagination(
+    session: "conftest.AsyncSession",
+) -> None:
+    entry_1 = await create_entry(session, name="Test Entry 1", age=25)
+    entry_2 = await create_entry(session, name="Test Entry 2", age=27)
+    entry_3 = await create_entry(session, name="Test Entry 3", age=26)
+    entry_4 = await create_entry(session, name="Test Entry 4", age=25)
+    filters = DummyModelFilters()
+    age_sorting = sorting.Sorting(column=DummyModel.age, way=sorting.SortingWay.ASC)
+    crud = base_services.AppCRUD(DummyModel, session)
+    first_page_pagination = pagination.CursorPagination(limit=2)
+
+    first_page = await crud.read_many(
+        filters, sorting=age_sorting, pagination=first_page_pagination
+    )
+    cursor = crud.get_next_cursor(first_page, age_sorting, first_page_pagination)
+    second_page = await crud.read_many(
+        filters,
+        sorting=age_sorting,
+        pagination=pagination.CursorPagination(cursor=cursor, limit=2),
+    )
+
+    assert first_page == sorted([entry_1, entry_4], key=lambda entry: entry.id)
+    assert second_page == [entry_3, entry_2]
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_many_empty_cursor_then_cursor(
+    session: "conftest.AsyncSession",
+) -> None:
+    entry_1 = await create_entry(session, name="Test Entry 1", age=25)
+    entry_2 = await create_entry(session, name="Test Entry 2", age=26)
+    age_sorting = sorting.Sorting(column=DummyModel.age, way=sorting.SortingWay.ASC)
+    crud = base_services.AppCRUD(DummyModel, session)
+    base_services.statement_cache.clear()
+    first_page_pagination = pagination.CursorPagination(cursor="", limit=1)
+
+    first_page = await crud.read_many(
+        DummyModelFilters(), sorting=age_sorting, pagination=first_page_pagination
+    )
+    cursor = crud.get_next_cursor(first_page, age_sorting, first_page_pagination)
+    second_page = await crud.read_many(
+        DummyModelFilters(),
+        sorting=age_sorting,
+        pagination=pagination.CursorPagination(cursor=cursor, limit=1),
+    )
+
+    assert first_page == [entry_1]
+    assert second_page == [entry_2]
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_many_cursor_pagination_desc(
+    session: "conftest.AsyncSession",
+) -> None:
+    entry_1 = await create_entry(session, name="Test Entry 1", age=25)
+    entry_2 = await create_entry(session, name="Test Entry 2", age=27)
+    entry_3 = await create_entry(session, name="Test Entry 3", age=26)
+    filters = DummyModelFilters()
+    age_sorting = sorting.Sorting(column=DummyModel.age, way=sorting.SortingWay.DESC)
+    crud = base_services.AppCRUD(DummyModel, session)
+    first_page_pagination = pagination.CursorPagination(limit=1)
+
+    first_page = await crud.read_many(
+        filters, sorting=age_sorting, pagination=first_page_pagination
+    )
+    cursor = crud.get_next_cursor(first_page, age_sorting, first_page_pagination)
+    second_page = await crud.read_many(
+        filters,
+        sorting=age_sorting,
+        pagination=pagination.CursorPagination(cursor=cursor, limit=2),
+    )
+
+    assert first_page == [entry_2]
+    assert second_page == [entry_3, entry_1]
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_many_cursor_pagination_without_sorting(
+    session: "conftest.AsyncSession",
+) -> None:
+    entries = [
+        await create_entry(session, name=f"Test Entry {i}", age=25) for i in range(3)
+    ]
+    filters = DummyModelFilters()
+    crud = base_services.AppCRUD(DummyModel, session)
+    first_page_pagination = pagination.CursorPagination(limit=2)
+
+    first_page = await crud.read_many(filters, pagination=first_page_pagination)
+    cursor = crud.get_next_cursor(first_page, None, first_page_pagination)
+    second_page = await crud.read_many(
+        filters, pagination=pagination.CursorPagination(cursor=cursor, limit=2)
+    )
+
+    assert first_page + second_page == sorted(entries, key=lambda entry: entry.id)
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_many_cursor_pagination_last_page(
+    session: "conftest.AsyncSession",
+) -> None:
+    await create_entry(session, name="Test Entry", age=25)
+    crud = base_services.AppCRUD(DummyModel, session)
+    cursor_pagination = pagination.CursorPagination(limit=2)
+
+    entries = await crud.read_many(DummyModelFilters(), pagination=cursor_pagination)
+
+    assert crud.get_next_cursor(entries, None, cursor_pagination) is None
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "invalid",
+        "WzFd",  # [1]
+        # {"column": "age", "way": "ASC", "values": [25, "..."]} for another sorting
+        "eyJjb2x1bW4iOiJhZ2UiLCJ3YXkiOiJBU0MiLCJ2YWx1ZXMiOlsyNSwiMWRkNTM5MDktZmNkYS00"
+        "YzcyLWFmY2QtMWJmNDg4NjM4OWY4Il19",
+    ],
+)
+async def test_app_crud_read_many_invalid_cursor(
+    cursor: str, session: "conftest.AsyncSession"
+) -> None:
+    with pytest.raises(pagination_exceptions.InvalidCursorError):
+        await base_services.AppCRUD(DummyModel, session).read_many(
+            DummyModelFilters(),
+            pagination=pagination.CursorPagination(cursor=cursor, limit=2),
+        )
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_page(session: "conftest.AsyncSession") -> None:
+    await create_entry(session, name="Test Entry 1", age=25)
+    entry_2 = await create_entry(session, name="Test Entry 2", age=25)
+    await create_entry(session, name="Test Entry 3", age=25)
+    await create_entry(session, name="Test Entry 4", age=26)
+    filters = DummyModelFilters(age=25)
+
+    page = await base_services.AppCRUD(DummyModel, session).read_page(
+        filters,
+        sorting=sorting.Sorting(column=DummyModel.name, way=sorting.SortingWay.ASC),
+        pagination=pagination.Pagination(offset=1, limit=1),
+    )
+
+    assert page.items == [entry_2]
+    assert page.total == 3
+    assert not page.total_estimated
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_page_empty(session: "conftest.AsyncSession") -> None:
+    await create_entry(session, name="Test Entry 1", age=25)
+    await create_entry(session, name="Test Entry 2", age=25)
+
+    page = await base_services.AppCRUD(DummyModel, session).read_page(
+        DummyModelFilters(), pagination=pagination.Pagination(offset=5, limit=2)
+    )
+
+    assert page.items == []
+    assert page.total == 2
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_page_cursor_pagination(
+    session: "conftest.AsyncSession",
+) -> None:
+    entries = [
+        await create_entry(session, name=f"Test Entry {i}", age=25) for i in range(3)
+    ]
+    crud = base_services.AppCRUD(DummyModel, session)
+    first_page_pagination = pagination.CursorPagination(limit=2)
+    first_page = await crud.read_page(
+        DummyModelFilters(), pagination=first_page_pagination
+    )
+    cursor = crud.get_next_cursor(first_page.items, None, first_page_pagination)
+
+    page = await crud.read_page(
+        DummyModelFilters(),
+        pagination=pagination.CursorPagination(cursor=cursor, limit=2),
+    )
+
+    assert page.items == [max(entries, key=lambda entry: entry.id)]
+    assert page.total == 3
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_page_estimated_count(
+    session: "conftest.AsyncSession",
+) -> None:
+    for i in range(4):
+        await create_entry(session, name=f"Test Entry {i}", age=25)
+    await session.execute(sqlalchemy.text("ANALYZE dummymodel"))
+
+    page = await base_services.AppCRUD(DummyModel, session).read_page(
+        DummyModelFilters(),
+        pagination=pagination.Pagination(limit=2),
+        count_mode=pagination.CountMode.ESTIMATED,
+    )
+
+    assert len(page.items) == 2
+    assert page.total == 4
+    assert page.total_estimated
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_page_estimated_count_not_analyzed(
+    session: "conftest.AsyncSession",
+) -> None:
+    for i in range(3):
+        await create_entry(session, name=f"Test Entry {i}", age=25)
+
+    page = await base_services.AppCRUD(DummyModel, session).read_page(
+        DummyModelFilters(),
+        pagination=pagination.Pagination(limit=2),
+        count_mode=pagination.CountMode.ESTIMATED,
+    )
+
+    assert page.total == 3
+    assert not page.total_estimated
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_page_estimated_count_with_filters(
+    session: "conftest.AsyncSession",
+) -> None:
+    await create_entry(session, name="Test Entry 1", age=25)
+    await create_entry(session, name="Test Entry 2", age=26)
+    await session.execute(sqlalchemy.text("ANALYZE dummymodel"))
+
+    page = await base_services.AppCRUD(DummyModel, session).read_page(
+        DummyModelFilters(age=25), count_mode=pagination.CountMode.ESTIMATED
+    )
+
+    assert page.total == 1
+    assert not page.total_estimated
+
+
 @pytest.mark.anyio
 async def test_app_crud_read_one(session: "conftest.AsyncSession") -> None:
     await create_entry(session, name="Test Entry 1", age=25)
@@ -146,6 +465,38 @@ async def test_app_crud_read_one(session: "conftest.AsyncSession") -> None:
     assert retrieved_entry == entry
 
 
+@pytest.mark.anyio
+async def test_app_crud_read_one_reuses_statement(
+    session: "conftest.AsyncSession",
+) -> None:
+    entry_1 = await create_entry(session, name="Test Entry 1", age=25)
+    entry_2 = await create_entry(session, name="Test Entry 2", age=27)
+    crud = base_services.AppCRUD(DummyModel, session)
+    base_services.statement_cache.clear()
+    hits = metrics.counter("crud_statement_cache_hits").value
+
+    retrieved_entry_1 = await crud.read_one(DummyModelFilters(name="Test Entry 1"))
+    retrieved_entry_2 = await crud.read_one(DummyModelFilters(name="Test Entry 2"))
+
+    assert retrieved_entry_1 == entry_1
+    assert retrieved_entry_2 == entry_2
+    assert metrics.counter("crud_statement_cache_hits").value == hits + 1
+
+
+@pytest.mark.anyio
+async def test_app_crud_read_one_filter_by_none(
+    session: "conftest.AsyncSession",
+) -> None:
+    entry = await create_entry(session, name="Test Entry", age=25)
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    retrieved_entry = await crud.read_one(DummyModelFilters(name="Test Entry"))
+    with pytest.raises(exc.NoResultFound):
+        await crud.read_one(DummyModelFilters(name="Test Entry", city=None))
+
+    assert retrieved_entry == entry
+
+
 @pytest.mark.anyio
 async def test_app_crud_update(session: "conftest.AsyncSession") -> None:
     await create_entry(session, name="Test Entry 1", age=25)
@@ -156,7 +507,11 @@ async def test_app_crud_update(session: "conftest.AsyncSession") -> None:
         entry, entry_update
     )
 
-    assert updated_entry._sa_instance_state.expired  # pylint: disable=protected-access
+    assert (
+        not updated_entry._sa_instance_state.expired  # pylint: disable=protected-access
+    )
+    assert updated_entry.name == entry_update.name
+    assert updated_entry.age == entry_update.age
     statement = sqlmodel.select(DummyModel).where(
         DummyModel.name == entry_update.name,
         DummyModel.age == entry_update.age,
@@ -164,6 +519,19 @@ async def test_app_crud_update(session: "conftest.AsyncSession") -> None:
     assert (await session.execute(statement)).scalar_one()
 
 
+@pytest.mark.anyio
+async def test_app_crud_update_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    entry = await create_entry(session, name="Test Entry", age=25)
+    entry_update = DummyModelUpdate(name="Updated Entry")
+
+    with queries.count_queries(engine) as statements:
+        await base_services.AppCRUD(DummyModel, session).update(entry, entry_update)
+
+    assert len(statements) == 1
+
+
 @pytest.mark.anyio
 async def test_app_crud_update_refresh(session: "conftest.AsyncSession") -> None:
     await create_entry(session, name="Test Entry 1", age=25)
@@ -197,6 +565,33 @@ async def test_app_crud_delete(session: "conftest.AsyncSession") -> None:
         (await session.execute(statement)).scalar_one()
 
 
+@pytest.mark.anyio
+async def test_app_crud_delete_batch(session: "conftest.AsyncSession") -> None:
+    for index in range(3):
+        await create_entry(session, name=f"Test Entry {index}", age=25)
+    await create_entry(session, name="Test Entry 3", age=30)
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    deleted = await crud.delete_batch([DummyModel.age == 25], batch_size=2)
+
+    assert deleted == 2
+    assert await crud.count(DummyModelFilters(age=25)) == 1
+    assert await crud.count(DummyModelFilters(age=30)) == 1
+
+
+@pytest.mark.anyio
+async def test_app_crud_delete_batch_no_entries(
+    session: "conftest.AsyncSession",
+) -> None:
+    await create_entry(session, name="Test Entry", age=30)
+
+    deleted = await base_services.AppCRUD(DummyModel, session).delete_batch(
+        [DummyModel.age == 25], batch_size=2
+    )
+
+    assert deleted == 0
+
+
 @pytest.mark.anyio
 async def test_app_crud_count(
     session: "conftest.AsyncSession",
@@ -209,3 +604,112 @@ async def test_app_crud_count(
     num_users = await base_services.AppCRUD(DummyModel, session).count(entry_filters)
 
     assert num_users == 3
+
+
+@pytest.mark.anyio
+async def test_transaction(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    entry = await create_entry(session, name="Test Entry 1", age=25)
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    with queries.count_commits(engine) as commits:
+        async with base_services.transaction(session):
+            await crud.create(DummyModel(name="Test Entry 2", age=26))
+            await crud.create_many(
+                [DummyModel(name="Test Entry 3", age=27)],
+                conflict_columns=[DummyModel.id],
+            )
+            await crud.delete(entry)
+
+    assert len(commits) == 1
+    assert await crud.count(DummyModelFilters()) == 2
+
+
+@pytest.mark.anyio
+async def test_app_crud_restore(session: "conftest.AsyncSession") -> None:
+    entry = await create_entry(session, name="Test Entry", age=25)
+    entry_id = entry.id
+    session.expunge(entry)
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    restored_entry = await crud.restore({"id": entry_id, "name": "Test Entry"})
+
+    assert restored_entry in session
+    assert sqlalchemy.inspect(restored_entry).unloaded == {"age", "city"}
+    await crud.load_attributes(restored_entry, ["age"])
+    assert restored_entry.age == 25
+
+
+@pytest.mark.anyio
+async def test_read_scope(session: "conftest.AsyncSession") -> None:
+    entry = await create_entry(session, name="Test Entry 1", age=25)
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    async with base_services.read_scope(session):
+        assert session.sync_session.info[db_config.READ_ONLY_KEY]
+        retrieved_entry = await crud.read_one(DummyModelFilters(name="Test Entry 1"))
+
+    assert retrieved_entry == entry
+    assert retrieved_entry.name == "Test Entry 1"
+    assert not session.in_transaction()
+    assert not session.sync_session.info[db_config.READ_ONLY_KEY]
+
+
+@pytest.mark.anyio
+async def test_read_scope_within_transaction(
+    session: "conftest.AsyncSession",
+) -> None:
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    async with base_services.transaction(session):
+        await crud.create(DummyModel(name="Test Entry 1", age=25))
+        async with base_services.read_scope(session):
+            await crud.count(DummyModelFilters())
+        assert session.in_transaction()
+
+    assert await crud.count(DummyModelFilters()) == 1
+
+
+@pytest.mark.anyio
+async def test_transaction_rollback(session: "conftest.AsyncSession") -> None:
+    entry = await create_entry(session, name="Test Entry 1", age=25)
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    with pytest.raises(RuntimeError):
+        async with base_services.transaction(session):
+            await crud.create(DummyModel(name="Test Entry 2", age=26))
+            await crud.update(entry, DummyModelUpdate(age=30))
+            raise RuntimeError()
+
+    assert await crud.read_many(DummyModelFilters()) == [entry]
+    assert entry.age == 25
+
+
+@pytest.mark.anyio
+async def test_transaction_nested(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    with queries.count_commits(engine) as commits:
+        async with base_services.transaction(session):
+            async with base_services.transaction(session):
+                await crud.create(DummyModel(name="Test Entry 1", age=25))
+            await crud.create(DummyModel(name="Test Entry 2", age=26))
+
+    assert len(commits) == 1
+    assert await crud.count(DummyModelFilters()) == 2
+
+
+@pytest.mark.anyio
+async def test_transaction_refresh(session: "conftest.AsyncSession") -> None:
+    crud = base_services.AppCRUD(DummyModel, session)
+
+    async with base_services.transaction(session):
+        created_entry = await crud.create(
+            DummyModel(name="Test Entry", age=25), refresh=True
+        )
+
+        state = created_entry._sa_instance_state  # pylint: disable=protected-access
+        assert not state.expired
@@ -2,7 +2,9 @@ import smtplib
 import socket
 from unittest import mock
 
+import aiosmtplib
 import jinja2
+import pytest
 
 from app.services import email as email_services
 
@@ -102,3 +104,226 @@ def test_send_email_gai_error(*_: mock.MagicMock) -> None:
 @mock.patch("smtplib.SMTP.sendmail", side_effect=smtplib.SMTPException)
 def test_send_email_smtp_error(*_: mock.MagicMock) -> None:
     email_services.send_email(BUILT_MESSAGE, "receiver@email.com")
+
+
+@mock.patch("app.services.email._sendmail")
+def test_send_email_disconnected(mock_sendmail: mock.MagicMock) -> None:
+    mock_sendmail.side_effect = [smtplib.SMTPServerDisconnected(), {}]
+
+    email_services.send_email(BUILT_MESSAGE, "receiver@email.com")
+
+    assert mock_sendmail.call_count == 2
+
+
+@mock.patch("smtplib.SMTP.connect", return_value=(220, b"dummy response"))
+@mock.patch("smtplib.SMTP.login", side_effect=smtplib.SMTPAuthenticationError(535, b""))
+@mock.patch("smtplib.SMTP.close")
+def test_send_email_login_error(mock_close: mock.MagicMock, *_: mock.MagicMock) -> None:
+    email_services.send_email(BUILT_MESSAGE, "receiver@email.com")
+
+    mock_close.assert_called_once()
+
+
+@mock.patch("app.services.email.settings.EMAIL_SENDER", new="test@email.com")
+def test_send_emails() -> None:
+    server = mock.MagicMock()
+    server.sendmail.side_effect = [
+        {},
+        smtplib.SMTPRecipientsRefused({"receiver_2@email.com": (550, b"Error")}),
+        {},
+    ]
+    messages = [
+        ("Message 1", "receiver_1@email.com"),
+        ("Message 2", "receiver_2@email.com"),
+        ("Message 3", "receiver_3@email.com"),
+    ]
+
+    with mock.patch(
+        "app.services.email.smtp_pool.connection_factory", return_value=server
+    ) as connect:
+        errors = email_services.send_emails(messages)
+
+    assert list(errors) == ["receiver_2@email.com"]
+    connect.assert_called_once()
+    assert server.sendmail.call_args_list == [
+        mock.call("test@email.com", receiver, message) for message, receiver in messages
+    ]
+
+
+@mock.patch("app.services.email.smtp_pool.max_messages", new=2)
+def test_send_emails_max_messages() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    messages = [
+        ("Message 1", "receiver_1@email.com"),
+        ("Message 2", "receiver_2@email.com"),
+        ("Message 3", "receiver_3@email.com"),
+    ]
+
+    with mock.patch(
+        "app.services.email.smtp_pool.connection_factory", side_effect=servers
+    ) as connect:
+        errors = email_services.send_emails(messages)
+
+    assert not errors
+    assert connect.call_count == 2
+    assert servers[0].sendmail.call_count == 2
+    servers[0].quit.assert_called_once()
+    servers[1].sendmail.assert_called_once()
+
+
+def test_send_emails_disconnected() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    servers[0].sendmail.side_effect = smtplib.SMTPServerDisconnected()
+    messages = [("Message 1", "receiver_1@email.com")]
+
+    with mock.patch(
+        "app.services.email.smtp_pool.connection_factory", side_effect=servers
+    ):
+        errors = email_services.send_emails(messages)
+
+    assert not errors
+    servers[1].sendmail.assert_called_once()
+
+
+def test_send_emails_disconnected_twice() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock(), mock.MagicMock()]
+    for server in servers[:2]:
+        server.sendmail.side_effect = smtplib.SMTPServerDisconnected("Error")
+    messages = [
+        ("Message 1", "receiver_1@email.com"),
+        ("Message 2", "receiver_2@email.com"),
+    ]
+
+    with mock.patch(
+        "app.services.email.smtp_pool.connection_factory", side_effect=servers
+    ):
+        errors = email_services.send_emails(messages)
+
+    assert errors == {"receiver_1@email.com": "Error"}
+    servers[2].sendmail.assert_called_once()
+
+
+def test_send_emails_connection_error() -> None:
+    messages = [
+        ("Message 1", "receiver_1@email.com"),
+        ("Message 2", "receiver_2@email.com"),
+    ]
+
+    with mock.patch(
+        "app.services.email.smtp_pool.connection_factory",
+        side_effect=socket.gaierror("Error"),
+    ) as connect:
+        errors = email_services.send_emails(messages)
+
+    assert errors == {"receiver_1@email.com": "Error", "receiver_2@email.com": "Error"}
+    connect.assert_called_once()
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.email.settings.EMAIL_SENDER", new="test@email.com")
+async def test_send_email_async() -> None:
+    server = mock.AsyncMock()
+
+    with mock.patch(
+        "app.services.email.async_smtp_pool.connection_factory", return_value=server
+    ):
+        await email_services.send_email_async(BUILT_MESSAGE, "receiver@email.com")
+
+    server.sendmail.assert_awaited_once_with(
+        "test@email.com", "receiver@email.com", BUILT_MESSAGE
+    )
+
+
+@pytest.mark.anyio
+async def test_send_emails_async() -> None:
+    server = mock.AsyncMock()
+
+    async def sendmail(_: str, receiver: str, __: str) -> None:
+        if receiver == "receiver_2@email.com":
+            raise aiosmtplib.SMTPRecipientsRefused([])
+
+    server.sendmail.side_effect = sendmail
+    messages = [
+        ("Message 1", "receiver_1@email.com"),
+        ("Message 2", "receiver_2@email.com"),
+    ]
+
+    with mock.patch(
+        "app.services.email.async_smtp_pool.connection_factory", return_value=server
+    ):
+        errors = await email_services.send_emails_async(messages)
+
+    assert list(errors) == ["receiver_2@email.com"]
+
+
+@pytest.mark.anyio
+async def test_send_emails_async_disconnected() -> None:
+    servers = [mock.AsyncMock(), mock.AsyncMock()]
+    servers[0].sendmail.side_effect = aiosmtplib.SMTPServerDisconnected("Error")
+    messages = [("Message 1", "receiver_1@email.com")]
+
+    with mock.patch(
+        "app.services.email.async_smtp_pool.connection_factory", side_effect=servers
+    ):
+        errors = await email_services.send_emails_async(messages)
+
+    assert not errors
+    servers[1].sendmail.assert_awaited_once()
+
+
+@pytest.mark.anyio
+async def test_send_emails_async_connection_error() -> None:
+    messages = [("Message 1", "receiver_1@email.com")]
+
+    with mock.patch(
+        "app.services.email.async_smtp_pool.connection_factory",
+        side_effect=socket.gaierror("Error"),
+    ):
+        errors = await email_services.send_emails_async(messages)
+
+    assert errors == {"receiver_1@email.com": "Error"}
+
+
+@mock.patch(
+    "app.services.email.send_emails_async",
+    new_callable=mock.AsyncMock,
+    return_value={},
+)
+@mock.patch("app.services.email.async_smtp_pool.close", new_callable=mock.AsyncMock)
+def test_send_emails_in_new_loop(
+    mock_close: mock.AsyncMock, mock_send_emails_async: mock.AsyncMock
+) -> None:
+    messages = [("Message 1", "receiver_1@email.com")]
+
+    errors = email_services.send_emails_in_new_loop(messages)
+
+    assert not errors
+    mock_send_emails_async.assert_awaited_once_with(messages)
+    mock_close.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@mock.patch("aiosmtplib.SMTP.connect", new_callable=mock.AsyncMock)
+@mock.patch("aiosmtplib.SMTP.login", new_callable=mock.AsyncMock)
+async def test_connect_async(mock_login: mock.AsyncMock, _: mock.AsyncMock) -> None:
+    server = await email_services._connect_async()  # pylint: disable=protected-access
+
+    assert isinstance(server, aiosmtplib.SMTP)
+    mock_login.assert_awaited_once()
+
+
+@pytest.mark.anyio
+@mock.patch("aiosmtplib.SMTP.connect", new_callable=mock.AsyncMock)
+@mock.patch(
+    "aiosmtplib.SMTP.login",
+    new_callable=mock.AsyncMock,
+    side_effect=aiosmtplib.SMTPAuthenticationError(535, "Error"),
+)
+@mock.patch("aiosmtplib.SMTP.close")
+async def test_connect_async_login_error(
+    mock_close: mock.MagicMock, *_: mock.AsyncMock
+) -> None:
+    with pytest.raises(aiosmtplib.SMTPAuthenticationError):
+        await email_services._connect_async()  # pylint: disable=protected-access
+
+    mock_close.assert_called_once()
@@ -1,3 +1,4 @@
+import asyncio
 import socket
 import typing
 from unittest import mock
@@ -13,16 +14,50 @@ from app.services import health as health_services
 if typing.TYPE_CHECKING:
     from app.tests import conftest
 
+OK_FLAG = health_services.HealthService.OK_FLAG
+
+
+@pytest.fixture(name="clear_health_cache", autouse=True)
+def clear_health_cache_fixture() -> typing.Generator[None, None, None]:
+    yield
+    health_services.health_cache.clear()
+
+
+@pytest.mark.anyio
+@mock.patch("app.celery.worker.app.control.ping", return_value=[{"worker": "pong"}])
+async def test_health_service_check_health(
+    mock_ping: mock.MagicMock,
+    session: "conftest.AsyncSession",  # pylint: disable=unused-argument
+) -> None:
+    await health_services.HealthService().check_health()
+
+    mock_ping.assert_called_once()
+
 
 @pytest.mark.anyio
-async def test_health_service_check_health(session: "conftest.AsyncSession") -> None:
-    await health_services.HealthService(session).check_health()
+@mock.patch("app.services.health.HealthService._execute_test_clause")
+@mock.patch("app.services.health.db.get_cache_db")
+@mock.patch("app.celery.worker.app.control.ping", return_value=[{"worker": "pong"}])
+async def test_health_service_check_health_cached(
+    mock_ping: mock.MagicMock,
+    mock_get_cache_db: mock.MagicMock,
+    mock_execute_test_clause: mock.AsyncMock,
+) -> None:
+    mock_get_cache_db.return_value.ping = mock.AsyncMock()
+    health_service = health_services.HealthService()
+
+    await health_service.check_health()
+    await health_service.check_health()
+
+    mock_execute_test_clause.assert_awaited_once()
+    mock_get_cache_db.return_value.ping.assert_awaited_once()
+    mock_ping.assert_called_once()
 
 
 @pytest.mark.anyio
 @mock.patch("app.services.health.HealthService._execute_test_clause")
-@mock.patch("redis.Redis.ping")
-@mock.patch("app.services.health.health_tasks.check_health.delay")
+@mock.patch("app.services.health.db.get_cache_db")
+@mock.patch("app.celery.worker.app.control.ping", return_value=[{"worker": "pong"}])
 @pytest.mark.parametrize(
     "error",
     [
@@ -33,64 +68,190 @@ async def test_health_service_check_health(session: "conftest.AsyncSession") ->
     ],
 )
 async def test_health_service_check_health_database_error(
-    mock_check_health_task: mock.MagicMock,  # pylint: disable=unused-argument
-    mock_redis: mock.MagicMock,  # pylint: disable=unused-argument
+    mock_ping: mock.MagicMock,  # pylint: disable=unused-argument
+    mock_get_cache_db: mock.MagicMock,
     mock_execute_test_clause: mock.AsyncMock,
     error: Exception,
-    session: "conftest.AsyncSession",
 ) -> None:
+    mock_get_cache_db.return_value.ping = mock.AsyncMock()
     mock_execute_test_clause.side_effect = error
 
     with pytest.raises(health_exceptions.HealthError) as exc_info:
-        await health_services.HealthService(session).check_health()
+        await health_services.HealthService().check_health()
     assert exc_info.value.context == {
         "database": str(error),
-        "redis": health_services.HealthService.OK_FLAG,
-        "celery": health_services.HealthService.OK_FLAG,
+        "redis": OK_FLAG,
+        "celery": OK_FLAG,
     }
 
 
 @pytest.mark.anyio
 @mock.patch("app.services.health.HealthService._execute_test_clause")
-@mock.patch("redis.Redis.ping")
-@mock.patch("app.services.health.health_tasks.check_health.delay")
+@mock.patch("app.services.health.db.get_cache_db")
+@mock.patch("app.celery.worker.app.control.ping", return_value=[{"worker": "pong"}])
 async def test_health_service_check_health_redis_error(
-    mock_check_health_task: mock.MagicMock,  # pylint: disable=unused-argument
-    mock_redis: mock.MagicMock,
+    mock_ping: mock.MagicMock,  # pylint: disable=unused-argument
+    mock_get_cache_db: mock.MagicMock,
     mock_execute_test_clause: mock.AsyncMock,  # pylint: disable=unused-argument
-    session: "conftest.AsyncSession",
 ) -> None:
     error_message = "Redis error"
-    mock_redis.side_effect = redis_exceptions.ConnectionError(error_message)
+    mock_get_cache_db.return_value.ping = mock.AsyncMock(
+        side_effect=redis_exceptions.ConnectionError(error_message)
+    )
 
     with pytest.raises(health_exceptions.HealthError) as exc_info:
-        await health_services.HealthService(session).check_health()
+        await health_services.HealthService().check_health()
     assert exc_info.value.context == {
-        "database": health_services.HealthService.OK_FLAG,
+        "database": OK_FLAG,
         "redis": error_message,
-        "celery": health_services.HealthService.OK_FLAG,
+        "celery": OK_FLAG,
     }
 
 
 @pytest.mark.anyio
 @mock.patch("app.services.health.HealthService._execute_test_clause")
-@mock.patch("redis.Redis.ping")
-@mock.patch("app.services.health.health_tasks.check_health.delay")
+@mock.patch("app.services.health.db.get_cache_db")
+@mock.patch("app.celery.worker.app.control.ping")
+@pytest.mark.parametrize(
+    "ping_result, error_message",
+    [
+        ([], "No Celery worker replied to the ping"),
+        (kombu_exceptions.OperationalError("Celery error"), "Celery error"),
+    ],
+)
 async def test_health_service_check_health_celery_error(
-    mock_check_health_task: mock.MagicMock,
-    mock_redis: mock.MagicMock,  # pylint: disable=unused-argument
+    mock_ping: mock.MagicMock,
+    mock_get_cache_db: mock.MagicMock,
     mock_execute_test_clause: mock.AsyncMock,  # pylint: disable=unused-argument
-    session: "conftest.AsyncSession",
+    ping_result: typing.Any,
+    error_message: str,
 ) -> None:
-    error_message = "Celery error"
-    mock_check_health_task.side_effect = kombu_exceptions.OperationalError(
-        error_message
-    )
+    mock_get_cache_db.return_value.ping = mock.AsyncMock()
+    if isinstance(ping_result, Exception):
+        mock_ping.side_effect = ping_result
+    else:
+        mock_ping.return_value = ping_result
 
     with pytest.raises(health_exceptions.HealthError) as exc_info:
-        await health_services.HealthService(session).check_health()
+        await health_services.HealthService().check_health()
     assert exc_info.value.context == {
-        "database": health_services.HealthService.OK_FLAG,
-        "redis": health_services.HealthService.OK_FLAG,
+        "database": OK_FLAG,
+        "redis": OK_FLAG,
         "celery": error_message,
     }
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health.settings.HEALTH_CHECK_TIMEOUT", new=0.01)
+@mock.patch("app.services.health.HealthService._execute_test_clause")
+@mock.patch("app.services.health.db.get_cache_db")
+@mock.patch("app.celery.worker.app.control.ping", return_value=[{"worker": "pong"}])
+async def test_health_service_check_health_timeout(
+    mock_ping: mock.MagicMock,  # pylint: disable=unused-argument
+    mock_get_cache_db: mock.MagicMock,
+    mock_execute_test_clause: mock.AsyncMock,
+) -> None:
+    async def execute_test_clause() -> None:
+        await asyncio.sleep(1)
+
+    mock_get_cache_db.return_value.ping = mock.AsyncMock()
+    mock_execute_test_clause.side_effect = execute_test_clause
+
+    with pytest.raises(health_exceptions.HealthError) as exc_info:
+        await health_services.HealthService().check_health()
+    assert exc_info.value.context == {
+        "database": "Timed out after 0.01 seconds",
+        "redis": OK_FLAG,
+        "celery": OK_FLAG,
+    }
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health._get_queue_depth", return_value=3)
+@mock.patch("app.services.health.HealthService._execute_test_clause")
+@mock.patch("app.services.health.db.get_cache_db")
+async def test_health_service_diagnose(
+    mock_get_cache_db: mock.MagicMock,
+    mock_execute_test_clause: mock.AsyncMock,  # pylint: disable=unused-argument
+    mock_get_queue_depth: mock.MagicMock,  # pylint: disable=unused-argument
+) -> None:
+    mock_get_cache_db.return_value.ping = mock.AsyncMock(
+        side_effect=redis_exceptions.ConnectionError("Redis error")
+    )
+
+    diagnostics = await health_services.HealthService().diagnose()
+
+    assert diagnostics.database.status == OK_FLAG
+    assert diagnostics.database.pool_size == 5
+    assert diagnostics.database.pool_checked_out == 0
+    assert diagnostics.database.pool_overflow == 0
+    assert diagnostics.database.pool_saturation == 0
+    assert diagnostics.redis.status == "Redis error"
+    assert diagnostics.celery.status == OK_FLAG
+    assert diagnostics.celery.queue_depth == 3
+    assert diagnostics.event_loop.status == OK_FLAG
+    assert all(
+        component.duration >= 0
+        for component in (
+            diagnostics.database,
+            diagnostics.redis,
+            diagnostics.celery,
+            diagnostics.event_loop,
+        )
+    )
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health._get_queue_depth", return_value=0)
+@mock.patch("app.services.health.db.engine")
+@mock.patch("app.services.health.HealthService._execute_test_clause")
+@mock.patch("app.services.health.db.get_cache_db")
+async def test_health_service_diagnose_without_queue_pool(
+    mock_get_cache_db: mock.MagicMock,
+    mock_execute_test_clause: mock.AsyncMock,  # pylint: disable=unused-argument
+    mock_engine: mock.MagicMock,  # pylint: disable=unused-argument
+    mock_get_queue_depth: mock.MagicMock,  # pylint: disable=unused-argument
+) -> None:
+    mock_get_cache_db.return_value.ping = mock.AsyncMock()
+
+    diagnostics = await health_services.HealthService().diagnose()
+
+    assert diagnostics.database.status == OK_FLAG
+    assert diagnostics.database.pool_size is None
+    assert diagnostics.database.pool_saturation is None
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.health.db.engine")
+async def test_health_service_execute_test_clause(mock_engine: mock.MagicMock) -> None:
+    connection = mock_engine.connect.return_value.__aenter__.return_value
+
+    # pylint: disable-next=protected-access
+    await health_services.HealthService()._execute_test_clause()
+
+    connection.execute.assert_awaited_once()
+
+
+@mock.patch("app.celery.worker.app.connection_for_read")
+def test_get_queue_depth(mock_connection_for_read: mock.MagicMock) -> None:
+    connection = mock_connection_for_read.return_value.__enter__.return_value
+    connection.default_channel.queue_declare.return_value.message_count = 3
+
+    queue_depth = health_services._get_queue_depth()  # pylint: disable=protected-access
+
+    assert queue_depth == 3
+    connection.default_channel.queue_declare.assert_called_once_with(
+        queue="celery", passive=True
+    )
+
+
+@mock.patch("app.celery.worker.app.connection_for_read")
+def test_get_queue_depth_no_queue(mock_connection_for_read: mock.MagicMock) -> None:
+    connection = mock_connection_for_read.return_value.__enter__.return_value
+    connection.default_channel.queue_declare.side_effect = (
+        kombu_exceptions.ChannelError("NOT_FOUND")
+    )
+
+    queue_depth = health_services._get_queue_depth()  # pylint: disable=protected-access
+
+    assert queue_depth == 0
@@ -7,11 +7,14 @@ import pytest
 from app.exceptions.http import reset_password as reset_password_exceptions
 from app.models import reset_password as reset_password_models
 from app.services import reset_password as reset_password_services
+from app.tests.helpers import queries
 from app.tests.helpers import reset_password as reset_password_helpers
 from app.tests.helpers import user as user_helpers
 from app.utils import converters
 
 if typing.TYPE_CHECKING:
+    from sqlalchemy.ext import asyncio
+
     from app.tests import conftest
 
 
@@ -46,12 +49,72 @@ async def test_reset_password_service_create_token_already_exists(
     created_token = await reset_password_service.create_token(token_create)
 
     assert created_token.user_id == user.id
+    # The tokens are expired in the database, without syncing the loaded entries
+    session.expunge_all()
     token_db = await reset_password_service.get_token(
         reset_password_models.ResetPasswordTokenFilters(id=token_id)
     )
     assert token_db.expire_at == datetime.datetime(2023, 7, 15, 13, 00, 0)
 
 
+@pytest.mark.anyio
+@freezegun.freeze_time("2023-07-15 13:00:00")
+async def test_reset_password_service_create_token_expires_all_live_tokens(
+    session: "conftest.AsyncSession",
+) -> None:
+    reset_password_service = reset_password_services.ResetPasswordService(session)
+    user = await user_helpers.create_active_user(session)
+    other_user = await user_helpers.create_active_user(session)
+    expired_at = datetime.datetime(2023, 7, 15, 12, 0, 0)
+    live_tokens = [
+        await reset_password_helpers.create_reset_password_token(
+            session, user_id=user.id
+        )
+        for _ in range(2)
+    ]
+    expired_token = await reset_password_helpers.create_reset_password_token(
+        session, user_id=user.id, expire_at=expired_at
+    )
+    other_user_token = await reset_password_helpers.create_reset_password_token(
+        session, user_id=other_user.id
+    )
+    token_ids = [token.id for token in [*live_tokens, expired_token, other_user_token]]
+    token_create = reset_password_models.ResetPasswordTokenCreate(user_id=user.id)
+
+    created_token = await reset_password_service.create_token(token_create)
+
+    session.expunge_all()
+    tokens_db = [
+        await reset_password_service.get_token(
+            reset_password_models.ResetPasswordTokenFilters(id=token_id)
+        )
+        for token_id in token_ids
+    ]
+    assert [token.expire_at for token in tokens_db[:3]] == [
+        datetime.datetime(2023, 7, 15, 13, 0, 0),
+        datetime.datetime(2023, 7, 15, 13, 0, 0),
+        expired_at,
+    ]
+    assert not tokens_db[3].is_expired
+    assert not created_token.is_expired
+
+
+@pytest.mark.anyio
+async def test_reset_password_service_create_token_queries(
+    engine: "asyncio.AsyncEngine", session: "conftest.AsyncSession"
+) -> None:
+    user = await user_helpers.create_active_user(session)
+    await reset_password_helpers.create_reset_password_token(session, user_id=user.id)
+    token_create = reset_password_models.ResetPasswordTokenCreate(user_id=user.id)
+
+    with queries.count_queries(engine) as statements:
+        await reset_password_services.ResetPasswordService(session).create_token(
+            token_create
+        )
+
+    assert len(statements) == 1
+
+
 @pytest.mark.anyio
 async def test_reset_password_service_get_token(
     session: "conftest.AsyncSession",
@@ -150,3 +213,37 @@ async def test_reset_password_service_force_to_expire_already_expired(
         reset_password_models.ResetPasswordTokenFilters(id=token_id)
     )
     assert token_db.expire_at == expired_datetime
+
+
+@pytest.mark.anyio
+async def test_reset_password_service_purge_expired_tokens(
+    session: "conftest.AsyncSession",
+) -> None:
+    reset_password_service = reset_password_services.ResetPasswordService(session)
+    for expire_at in [
+        datetime.datetime(2023, 7, 15, 10, 0, 0),
+        datetime.datetime(2023, 7, 15, 11, 0, 0),
+        datetime.datetime(2023, 7, 15, 12, 0, 0),
+    ]:
+        await reset_password_helpers.create_reset_password_token(
+            session, expire_at=expire_at
+        )
+    kept_token = await reset_password_helpers.create_reset_password_token(
+        session, expire_at=datetime.datetime(2023, 7, 15, 14, 0, 0)
+    )
+    kept_token_id = kept_token.id
+
+    purged = await reset_password_service.purge_expired_tokens(
+        datetime.datetime(2023, 7, 15, 13, 0, 0), batch_size=2
+    )
+
+    assert purged == 2
+    assert (
+        await reset_password_service.crud.count(
+            reset_password_models.ResetPasswordTokenFilters()
+        )
+        == 2
+    )
+    assert await reset_password_service.get_token(
+        reset_password_models.ResetPasswordTokenFilters(id=kept_token_id)
+    )
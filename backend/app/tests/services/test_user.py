@@ -4,14 +4,18 @@ from unittest import mock
 
 import freezegun
 import pytest
+import sqlalchemy
 
+from app.exceptions.http import pagination as pagination_exceptions
 from app.exceptions.http import user as user_exceptions
 from app.models import pagination
+from app.models import reset_password as reset_password_models
+from app.models import sorting
 from app.models import user as user_models
 from app.services import user as user_services
 from app.tests.helpers import reset_password as reset_password_helpers
 from app.tests.helpers import user as user_helpers
-from app.utils import converters
+from app.utils import auth, converters
 
 if typing.TYPE_CHECKING:
     from app.tests import conftest
@@ -39,6 +43,25 @@ async def test_user_service_create_user(
     )
 
 
+@pytest.mark.anyio
+@mock.patch("app.services.user.settings.EMAIL_BATCH_ENABLED", new=True)
+@mock.patch("app.services.user.confirm_email_buffer.add")
+async def test_user_service_create_user_batched_email(
+    mock_add: mock.MagicMock, session: "conftest.AsyncSession"
+) -> None:
+    user_create = user_models.UserCreate(
+        email=converters.to_pydantic_email("test@email.com"),
+        password="plain_password",
+        name="Test User",
+    )
+
+    created_user = await user_services.UserService(session).create_user(user_create)
+
+    mock_add.assert_called_once_with(
+        (created_user.email, str(created_user.email_confirmation_token))
+    )
+
+
 @pytest.mark.anyio
 @mock.patch("app.services.user.user_tasks.send_email_to_confirm_email.delay")
 async def test_user_service_create_user_already_exists(
@@ -58,6 +81,63 @@ async def test_user_service_create_user_already_exists(
     mock_send_email.assert_not_called()
 
 
+@pytest.mark.anyio
+@mock.patch("app.services.user.settings.USER_IMPORT_BATCH_SIZE", new=2)
+@mock.patch("app.services.user.user_tasks.send_emails_to_confirm_email.delay")
+async def test_user_service_import_users(
+    mock_send_emails: mock.MagicMock, session: "conftest.AsyncSession"
+) -> None:
+    await user_helpers.create_user(session=session, email="existing@email.com")
+    users = [
+        {"email": "test_1@email.com", "password": "plain_password", "name": "Test"},
+        {"email": "existing@email.com", "password": "plain_password", "name": "Test"},
+        {"email": "invalid", "password": "plain_password", "name": "Test"},
+        {"email": "test_1@email.com", "password": "plain_password", "name": "Test"},
+        {"email": "test_2@email.com", "password": "plain_password", "name": "Test"},
+    ]
+
+    report = await user_services.UserService(session).import_users(users)
+
+    assert report.created == 2
+    assert report.duplicates == 2
+    assert report.invalid == 1
+    assert [(result.email, result.status) for result in report.results] == [
+        ("test_1@email.com", user_models.UserImportStatus.CREATED),
+        ("existing@email.com", user_models.UserImportStatus.DUPLICATE),
+        ("invalid", user_models.UserImportStatus.INVALID),
+        ("test_1@email.com", user_models.UserImportStatus.DUPLICATE),
+        ("test_2@email.com", user_models.UserImportStatus.CREATED),
+    ]
+    assert report.results[2].errors == ["value is not a valid email address"]
+    created_users = await user_services.UserService(session).get_users(
+        user_models.UserFilters(email="test_2@email.com")
+    )
+    assert created_users[0].password != "plain_password"
+    assert await auth.verify_password("plain_password", created_users[0].password)
+    assert mock_send_emails.call_count == 2
+    mock_send_emails.assert_called_with(
+        [("test_2@email.com", str(created_users[0].email_confirmation_token))]
+    )
+
+
+@pytest.mark.anyio
+@mock.patch("app.services.user.user_tasks.send_emails_to_confirm_email.delay")
+async def test_user_service_import_users_nothing_created(
+    mock_send_emails: mock.MagicMock, session: "conftest.AsyncSession"
+) -> None:
+    await user_helpers.create_user(session=session, email="existing@email.com")
+    users: list[dict[str, typing.Any]] = [
+        {"email": "existing@email.com", "password": "plain_password", "name": "Test"},
+        {"email": ["invalid"], "password": "plain_password", "name": "Test"},
+    ]
+
+    report = await user_services.UserService(session).import_users(users)
+
+    assert report.created == 0
+    assert report.results[1].email is None
+    mock_send_emails.assert_not_called()
+
+
 @pytest.mark.anyio
 async def test_user_service_get_users(session: "conftest.AsyncSession") -> None:
     await user_helpers.create_user(session=session)
@@ -73,6 +153,81 @@ async def test_user_service_get_users(session: "conftest.AsyncSession") -> None:
     assert retrieved_users == [user_2, user_3]
 
 
+@pytest.mark.anyio
+async def test_user_service_get_users_cursor_pagination(
+    session: "conftest.AsyncSession",
+) -> None:
+    with freezegun.freeze_time("2022-02-05 13:30:00"):
+        user_1 = await user_helpers.create_user(session=session)
+    with freezegun.freeze_time("2022-02-05 13:30:01"):
+        user_2 = await user_helpers.create_user(session=session)
+    with freezegun.freeze_time("2022-02-05 13:30:02"):
+        user_3 = await user_helpers.create_user(session=session)
+    user_filters = user_models.UserFilters()
+    created_at_sorting = sorting.Sorting(
+        column=user_models.User.created_at, way=sorting.SortingWay.DESC
+    )
+    first_page_pagination = pagination.CursorPagination(limit=2)
+    user_service = user_services.UserService(session)
+
+    first_page = await user_service.get_users(
+        user_filters, first_page_pagination, created_at_sorting
+    )
+    cursor = user_service.get_next_users_cursor(
+        first_page, created_at_sorting, first_page_pagination
+    )
+    second_page = await user_service.get_users(
+        user_filters,
+        pagination.CursorPagination(cursor=cursor, limit=2),
+        created_at_sorting,
+    )
+
+    assert first_page == [user_3, user_2]
+    assert second_page == [user_1]
+    assert not user_service.get_next_users_cursor(
+        second_page, created_at_sorting, first_page_pagination
+    )
+
+
+@pytest.mark.anyio
+async def test_user_service_get_users_page(session: "conftest.AsyncSession") -> None:
+    await user_helpers.create_user(session=session)
+    user_2 = await user_helpers.create_user(session=session)
+    await user_helpers.create_user(session=session)
+    user_filters = user_models.UserFilters()
+
+    page = await user_services.UserService(session).get_users_page(
+        user_filters, pagination.Pagination(offset=1, limit=1)
+    )
+
+    assert page.items == [user_2]
+    assert page.total == 3
+
+
+@pytest.mark.anyio
+async def test_user_service_get_users_invalid_cursor(
+    session: "conftest.AsyncSession",
+) -> None:
+    with pytest.raises(pagination_exceptions.InvalidCursorError) as exc_info:
+        await user_services.UserService(session).get_users(
+            user_models.UserFilters(),
+            pagination.CursorPagination(cursor="invalid", limit=2),
+        )
+    assert exc_info.value.context == {"cursor": "invalid"}
+
+
+@pytest.mark.anyio
+async def test_user_service_get_users_page_invalid_cursor(
+    session: "conftest.AsyncSession",
+) -> None:
+    with pytest.raises(pagination_exceptions.InvalidCursorError) as exc_info:
+        await user_services.UserService(session).get_users_page(
+            user_models.UserFilters(),
+            pagination.CursorPagination(cursor="invalid", limit=2),
+        )
+    assert exc_info.value.context == {"cursor": "invalid"}
+
+
 @pytest.mark.anyio
 async def test_user_service_get_user(session: "conftest.AsyncSession") -> None:
     user = await user_helpers.create_user(session=session, email="test@email.com")
@@ -96,6 +251,51 @@ async def test_user_service_get_user_not_found(
     assert exc_info.value.context == {"id": user.id, "email": wrong_email}
 
 
+@pytest.mark.anyio
+async def test_user_service_get_cached_user(session: "conftest.AsyncSession") -> None:
+    user = await user_helpers.create_user(session=session)
+
+    retrieved_user = await user_services.UserService(session).get_cached_user(user.id)
+
+    assert retrieved_user == user
+    cached_user = await user_services.user_cache.get(str(user.id))
+    assert cached_user == user.dict(include=user_services.CACHED_USER_FIELDS)
+    assert "password" not in cached_user
+
+
+@pytest.mark.anyio
+async def test_user_service_get_cached_user_from_cache(
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_user(session=session)
+    user_id = user.id
+    await user_services.user_cache.set(
+        str(user_id), user.dict(include=user_services.CACHED_USER_FIELDS)
+    )
+    session.expunge(user)
+
+    with mock.patch("app.services.user.UserService.get_user") as mock_get_user:
+        retrieved_user = await user_services.UserService(session).get_cached_user(
+            user_id
+        )
+
+    assert retrieved_user.id == user_id
+    assert retrieved_user in session
+    assert "created_at" in sqlalchemy.inspect(retrieved_user).unloaded
+    mock_get_user.assert_not_called()
+
+
+@pytest.mark.anyio
+async def test_user_service_get_cached_user_not_found(
+    session: "conftest.AsyncSession",
+) -> None:
+    user_id = converters.to_uuid("1dd53909-fcda-4c72-afcd-1bf4886389f8")
+
+    with pytest.raises(user_exceptions.UserNotFoundError):
+        await user_services.UserService(session).get_cached_user(user_id)
+    assert await user_services.user_cache.get(str(user_id)) is None
+
+
 @pytest.mark.anyio
 async def test_user_service_get_active_user(session: "conftest.AsyncSession") -> None:
     user = await user_helpers.create_active_user(
@@ -127,6 +327,8 @@ async def test_user_service_update_user(session: "conftest.AsyncSession") -> Non
     user = await user_helpers.create_user(session=session, name="Test User")
     user_update = user_models.UserUpdate(name="Updated Name", confirmed_email=True)
 
+    await user_services.user_cache.set(str(user.id), user.dict())
+
     updated_user = await user_services.UserService(session).update_user(
         user, user_update
     )
@@ -134,6 +336,7 @@ async def test_user_service_update_user(session: "conftest.AsyncSession") -> Non
     assert updated_user.name == user_update.name
     assert updated_user.confirmed_email is True
     assert updated_user.password == user.password
+    assert await user_services.user_cache.get(str(user.id)) is None
 
 
 @pytest.mark.anyio
@@ -156,9 +359,13 @@ async def test_user_service_update_user_password(
 @pytest.mark.anyio
 async def test_user_service_delete_user(session: "conftest.AsyncSession") -> None:
     user = await user_helpers.create_user(session=session)
+    user_id = user.id
+    await user_services.user_cache.set(str(user_id), user.dict())
 
     await user_services.UserService(session).delete_user(user)
 
+    assert await user_services.user_cache.get(str(user_id)) is None
+
 
 @pytest.mark.anyio
 async def test_user_service_count_users(
@@ -186,12 +393,37 @@ async def test_user_service_change_password(
     user = await user_helpers.create_user(session=session, password=old_hashed_password)
     user_id = user.id
     new_password = "new_password"
+    await user_services.user_cache.set(str(user_id), user.dict())
 
     await user_service.change_password(user, "plain_password", new_password)
 
     user_db = await user_service.get_user(user_models.UserFilters(id=user_id))
     assert user_db.password != old_hashed_password
     assert user_db.password != new_password
+    assert await user_services.user_cache.get(str(user_id)) is None
+
+
+@pytest.mark.anyio
+async def test_user_service_change_password_cached_user(
+    session: "conftest.AsyncSession",
+) -> None:
+    user_service = user_services.UserService(session)
+    old_hashed_password = (
+        "$argon2id$v=19$m=65536,t=3,p=4$AoDw3nvPea/VGiNkzPn/Pw$grh02g7mdXN47S8kSt2P"
+        "Vmv52AAt7wisY63TPS80qMo"
+    )
+    user = await user_helpers.create_user(session=session, password=old_hashed_password)
+    user_id = user.id
+    await user_services.user_cache.set(
+        str(user_id), user.dict(include=user_services.CACHED_USER_FIELDS)
+    )
+    session.expunge(user)
+    cached_user = await user_service.get_cached_user(user_id)
+
+    await user_service.change_password(cached_user, "plain_password", "new_password")
+
+    user_db = await user_service.get_user(user_models.UserFilters(id=user_id))
+    assert user_db.password != old_hashed_password
 
 
 @pytest.mark.anyio
@@ -217,11 +449,13 @@ async def test_user_service_confirm_email(session: "conftest.AsyncSession") -> N
     user_service = user_services.UserService(session)
     user = await user_helpers.create_user(session=session)
     user_id = user.id
+    await user_services.user_cache.set(str(user_id), user.dict())
 
     await user_service.confirm_email(user)
 
     user_db = await user_service.get_user(user_models.UserFilters(id=user_id))
     assert user_db.confirmed_email is True
+    assert await user_services.user_cache.get(str(user_id)) is None
 
 
 @pytest.mark.anyio
@@ -274,6 +508,26 @@ async def test_user_service_reset_password(
     mock_send_email.assert_called_once_with(user.email, token.id)
 
 
+@pytest.mark.anyio
+@mock.patch("app.services.user.settings.EMAIL_BATCH_ENABLED", new=True)
+@mock.patch("app.services.reset_password.ResetPasswordService.create_token")
+@mock.patch("app.services.user.reset_password_buffer.add")
+async def test_user_service_reset_password_batched_email(
+    mock_add: mock.MagicMock,
+    mock_create_token: mock.AsyncMock,
+    session: "conftest.AsyncSession",
+) -> None:
+    user = await user_helpers.create_active_user(session=session)
+    token = await reset_password_helpers.create_reset_password_token(
+        session=session, user_id=user.id
+    )
+    mock_create_token.return_value = token
+
+    await user_services.UserService(session).reset_password(user)
+
+    mock_add.assert_called_once_with((user.email, str(token.id)))
+
+
 @pytest.mark.anyio
 @mock.patch("app.services.reset_password.ResetPasswordService.get_valid_token")
 @mock.patch("app.services.reset_password.ResetPasswordService.force_to_expire")
@@ -318,3 +572,35 @@ async def test_user_service_set_password_inactive_user(
             token.id, "plain_password"
         )
     assert exc_info.value.context == {"id": user.id}
+
+
+@pytest.mark.anyio
+async def test_user_service_purge_unconfirmed_users(
+    session: "conftest.AsyncSession",
+) -> None:
+    user_service = user_services.UserService(session)
+    created_at = datetime.datetime(2023, 7, 1, 12, 0, 0)
+    stale_user = await user_helpers.create_user(session, created_at=created_at)
+    await reset_password_helpers.create_reset_password_token(
+        session, user_id=stale_user.id
+    )
+    confirmed_user = await user_helpers.create_active_user(
+        session, created_at=created_at
+    )
+    recent_user = await user_helpers.create_user(
+        session, created_at=datetime.datetime(2023, 7, 15, 12, 0, 0)
+    )
+    kept_ids = [confirmed_user.id, recent_user.id]
+
+    purged = await user_service.purge_unconfirmed_users(
+        datetime.datetime(2023, 7, 10, 12, 0, 0), batch_size=10
+    )
+
+    assert purged == 1
+    users = await user_service.get_users(
+        user_models.UserFilters(), pagination.Pagination()
+    )
+    assert sorted(user.id for user in users) == sorted(kept_ids)
+    assert not await user_service.reset_password_service.crud.count(
+        reset_password_models.ResetPasswordTokenFilters()
+    )
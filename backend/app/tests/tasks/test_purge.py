@@ -0,0 +1,64 @@
+from unittest import mock
+
+from app.tasks import purge
+from app.utils import metrics
+
+BATCH_SIZE = purge.settings.PURGE_BATCH_SIZE
+
+
+@mock.patch("app.tasks.purge.db.get_task_session")
+@mock.patch(
+    "app.services.reset_password.ResetPasswordService.purge_expired_tokens",
+    new_callable=mock.AsyncMock,
+    side_effect=[BATCH_SIZE, 3],
+)
+def test_purge_expired_reset_password_tokens(
+    mock_purge_expired_tokens: mock.AsyncMock, _: mock.MagicMock
+) -> None:
+    purged_before = metrics.counter("purged_reset_password_tokens").value
+
+    task = purge.purge_expired_reset_password_tokens.apply()
+
+    assert task.status == "SUCCESS"
+    assert task.result == BATCH_SIZE + 3
+    assert mock_purge_expired_tokens.await_count == 2
+    assert (
+        metrics.counter("purged_reset_password_tokens").value
+        == purged_before + BATCH_SIZE + 3
+    )
+    assert metrics.gauge("purged_reset_password_tokens_last_run").value == (
+        BATCH_SIZE + 3
+    )
+
+
+@mock.patch("app.tasks.purge.db.get_task_session")
+@mock.patch(
+    "app.services.user.UserService.purge_unconfirmed_users",
+    new_callable=mock.AsyncMock,
+    return_value=0,
+)
+def test_purge_unconfirmed_users(
+    mock_purge_unconfirmed_users: mock.AsyncMock, _: mock.MagicMock
+) -> None:
+    task = purge.purge_unconfirmed_users.apply()
+
+    assert task.status == "SUCCESS"
+    assert task.result == 0
+    mock_purge_unconfirmed_users.assert_awaited_once()
+    assert metrics.gauge("purged_unconfirmed_users_last_run").value == 0
+
+
+@mock.patch("app.tasks.purge.db.get_task_session")
+@mock.patch("app.tasks.purge.settings.PURGE_MAX_BATCHES", 2)
+@mock.patch(
+    "app.services.user.UserService.purge_unconfirmed_users",
+    new_callable=mock.AsyncMock,
+    return_value=BATCH_SIZE,
+)
+def test_purge_unconfirmed_users_max_batches(
+    mock_purge_unconfirmed_users: mock.AsyncMock, _: mock.MagicMock
+) -> None:
+    task = purge.purge_unconfirmed_users.apply()
+
+    assert task.result == 2 * BATCH_SIZE
+    assert mock_purge_unconfirmed_users.await_count == 2
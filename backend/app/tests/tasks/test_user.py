@@ -46,3 +46,81 @@ def test_send_email_to_reset_password(
 
     assert task.status == "SUCCESS"
     mock_send_email.assert_called_once_with("Message", email_str)
+
+
+@mock.patch("app.services.email.load_template", return_value="<html>Message</html>")
+@mock.patch("app.services.email.build_message")
+@mock.patch("app.services.email.send_emails")
+def test_send_emails_to_confirm_email(
+    mock_send_emails: mock.MagicMock,
+    mock_build_message: mock.MagicMock,
+    _: mock.MagicMock,
+) -> None:
+    recipients = [
+        ("test_1@email.com", "1dd53909-fcda-4c72-afcd-1bf4886389f8"),
+        ("test_2@email.com", "6a6f6e3c-3f2b-4a8f-9d3c-2b1f6e0e8a11"),
+    ]
+    mock_build_message.return_value = "Message"
+    mock_send_emails.return_value = {"test_2@email.com": "Error"}
+
+    task = user.send_emails_to_confirm_email.apply(kwargs={"recipients": recipients})
+
+    assert task.status == "SUCCESS"
+    assert task.result == {"test_2@email.com": "Error"}
+    mock_send_emails.assert_called_once_with(
+        [("Message", "test_1@email.com"), ("Message", "test_2@email.com")]
+    )
+
+
+@mock.patch("app.services.email.load_template", return_value="<html>Message</html>")
+@mock.patch("app.services.email.build_message")
+@mock.patch("app.services.email.send_emails", return_value={})
+def test_send_emails_to_reset_password(
+    mock_send_emails: mock.MagicMock,
+    mock_build_message: mock.MagicMock,
+    _: mock.MagicMock,
+) -> None:
+    recipients = [
+        ("test_1@email.com", "1dd53909-fcda-4c72-afcd-1bf4886389f8"),
+        ("test_2@email.com", "6a6f6e3c-3f2b-4a8f-9d3c-2b1f6e0e8a11"),
+    ]
+    mock_build_message.return_value = "Message"
+
+    task = user.send_emails_to_reset_password.apply(kwargs={"recipients": recipients})
+
+    assert task.status == "SUCCESS"
+    assert task.result == {}
+    mock_send_emails.assert_called_once_with(
+        [("Message", "test_1@email.com"), ("Message", "test_2@email.com")]
+    )
+
+
+@mock.patch("app.services.email.smtp_pool.close")
+def test_close_smtp_pool(mock_close: mock.MagicMock) -> None:
+    user.close_smtp_pool()
+
+    mock_close.assert_called_once()
+
+
+@mock.patch("app.utils.jinja.precompile_templates")
+def test_precompile_email_templates(mock_precompile: mock.MagicMock) -> None:
+    user.precompile_email_templates()
+
+    mock_precompile.assert_called_once()
+
+
+@mock.patch("app.tasks.user.settings.EMAIL_BACKEND", new="async")
+@mock.patch("app.services.email.load_template", return_value="<html>Message</html>")
+@mock.patch("app.services.email.build_message", return_value="Message")
+@mock.patch("app.services.email.send_emails_in_new_loop", return_value={})
+def test_send_emails_to_confirm_email_async_backend(
+    mock_send_emails_in_new_loop: mock.MagicMock, *_: mock.MagicMock
+) -> None:
+    recipients = [("test_1@email.com", "1dd53909-fcda-4c72-afcd-1bf4886389f8")]
+
+    task = user.send_emails_to_confirm_email.apply(kwargs={"recipients": recipients})
+
+    assert task.status == "SUCCESS"
+    mock_send_emails_in_new_loop.assert_called_once_with(
+        [("Message", "test_1@email.com")]
+    )
@@ -0,0 +1,44 @@
+from unittest import mock
+
+import pytest
+
+from app import main
+
+
+@pytest.mark.anyio
+@mock.patch("app.main.auth_config.revoked_token_filter.start")
+async def test_start_revoked_token_filter(mock_start: mock.MagicMock) -> None:
+    await main.start_revoked_token_filter()
+
+    mock_start.assert_called_once()
+
+
+@pytest.mark.anyio
+@mock.patch("app.main.settings.DENYLIST_FILTER_ENABLED", new=False)
+@mock.patch("app.main.auth_config.revoked_token_filter.start")
+async def test_start_revoked_token_filter_disabled(mock_start: mock.MagicMock) -> None:
+    await main.start_revoked_token_filter()
+
+    mock_start.assert_not_called()
+
+
+@pytest.mark.anyio
+@mock.patch(
+    "app.main.auth_config.revoked_token_filter.stop", new_callable=mock.AsyncMock
+)
+async def test_stop_revoked_token_filter(mock_stop: mock.AsyncMock) -> None:
+    await main.stop_revoked_token_filter()
+
+    mock_stop.assert_called_once()
+
+
+@pytest.mark.anyio
+@mock.patch("app.main.user_services.reset_password_buffer.flush")
+@mock.patch("app.main.user_services.confirm_email_buffer.flush")
+async def test_flush_email_buffers(
+    mock_confirm_email_flush: mock.MagicMock, mock_reset_password_flush: mock.MagicMock
+) -> None:
+    await main.flush_email_buffers()
+
+    mock_confirm_email_flush.assert_called_once()
+    mock_reset_password_flush.assert_called_once()
@@ -1,42 +1,126 @@
+from concurrent import futures
+from unittest import mock
+
 import fastapi_paseto_auth as paseto_auth
+import pyseto
 import pytest
 
 from app.exceptions.app import auth as auth_exceptions
-from app.utils import auth
+from app.utils import auth, metrics
 
 
-def test_hash_password() -> None:
+@pytest.mark.anyio
+async def test_hash_password() -> None:
     password = "plain_password"
 
-    hashed_password = auth.hash_password(password)
+    hashed_password = await auth.hash_password(password)
 
     assert hashed_password != password
 
 
-def test_verify_password() -> None:
+@pytest.mark.anyio
+async def test_verify_password() -> None:
     password = "plain_password"
     hashed_password = (
         "$argon2id$v=19$m=65536,t=3,p=4$AoDw3nvPea/VGiNkzPn/Pw$grh02g7mdXN47S8kSt2P"
         "Vmv52AAt7wisY63TPS80qMo"
     )
 
-    verified_password = auth.verify_password(password, hashed_password)
+    verified_password = await auth.verify_password(password, hashed_password)
 
     assert verified_password is True
 
 
-def test_verify_password_wrong_password() -> None:
+@pytest.mark.anyio
+async def test_verify_password_wrong_password() -> None:
     password = "plain_password"
     hashed_password = (
         "$argon2id$v=19$m=65536,t=3,p=4$sDZmjFEq5byXUsq5FwJgjA$ZrdX+g7VI+EYyTWlgrvNiD30"
         "VeOvQYJIcJAz04MbVe0"
     )
 
-    verified_password = auth.verify_password(password, hashed_password)
+    verified_password = await auth.verify_password(password, hashed_password)
 
     assert verified_password is False
 
 
+@pytest.mark.anyio
+async def test_password_hasher_metrics() -> None:
+    hasher = auth.PasswordHasher(futures.ThreadPoolExecutor(max_workers=1), 1)
+
+    await hasher.hash("plain_password")
+
+    collected = metrics.collect()
+    assert collected["password_hashing_in_flight"] == 0
+    assert collected["password_hashing_queue_depth"] == 0
+    duration = collected["password_hashing_duration_seconds"]
+    assert isinstance(duration, dict)
+    assert duration["count"] >= 1
+
+
+@mock.patch("app.utils.auth.settings.PASSWORD_HASHING_EXECUTOR", new="thread")
+def test_get_password_hasher_thread_executor() -> None:
+    auth.get_password_hasher.cache_clear()
+
+    hasher = auth.get_password_hasher()
+
+    assert isinstance(
+        hasher._executor,  # pylint: disable=protected-access
+        futures.ThreadPoolExecutor,
+    )
+    auth.get_password_hasher.cache_clear()
+
+
+@mock.patch("app.utils.auth.settings.PASSWORD_HASHING_EXECUTOR", new="process")
+def test_get_password_hasher_process_executor() -> None:
+    auth.get_password_hasher.cache_clear()
+
+    hasher = auth.get_password_hasher()
+
+    assert isinstance(
+        hasher._executor,  # pylint: disable=protected-access
+        futures.ProcessPoolExecutor,
+    )
+    auth.get_password_hasher.cache_clear()
+
+
+def test_key_registry_get_key_cached() -> None:
+    registry = auth.KeyRegistry({auth.PRIMARY_KEY_ID: "secret"})
+
+    key = registry.get_key(4, auth.TokenPurpose.LOCAL)
+
+    assert registry.get_key(4, auth.TokenPurpose.LOCAL) is key
+
+
+def test_key_registry_get_decoding_keys() -> None:
+    registry = auth.KeyRegistry(
+        {auth.PRIMARY_KEY_ID: "secret", "previous": "previous_secret"}
+    )
+
+    keys = registry.get_decoding_keys(4, auth.TokenPurpose.LOCAL)
+
+    assert keys == [
+        registry.get_key(4, auth.TokenPurpose.LOCAL),
+        registry.get_key(4, auth.TokenPurpose.LOCAL, "previous"),
+    ]
+
+
+@mock.patch(
+    "app.utils.auth.settings.AUTHPASETO_PREVIOUS_SECRET_KEYS",
+    new={"previous": "previous_secret"},
+)
+def test_decode_token_previous_key() -> None:
+    auth.get_key_registry.cache_clear()
+    previous_key = pyseto.Key.new(version=4, purpose="local", key="previous_secret")
+    token = pyseto.encode(previous_key, {"sub": "test-subject"}).decode()
+
+    decoded_token = auth.decode_token(token)
+
+    assert isinstance(decoded_token.payload, dict)
+    assert decoded_token.payload["sub"] == "test-subject"
+    auth.get_key_registry.cache_clear()
+
+
 def test_decode_token() -> None:
     subject = "test-subject"
     token = paseto_auth.AuthPASETO().create_access_token(subject)
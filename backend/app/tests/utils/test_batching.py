@@ -0,0 +1,53 @@
+import asyncio
+from unittest import mock
+
+import pytest
+
+from app.utils import batching
+
+
+@pytest.mark.anyio
+async def test_task_buffer_flush_max_size() -> None:
+    task = mock.MagicMock()
+    buffer = batching.TaskBuffer("test", task, max_size=2, window=60.0)
+
+    buffer.add("item_1")
+    buffer.add("item_2")
+
+    task.delay.assert_called_once_with(["item_1", "item_2"])
+
+
+@pytest.mark.anyio
+async def test_task_buffer_flush_window() -> None:
+    task = mock.MagicMock()
+    buffer = batching.TaskBuffer("test", task, max_size=10, window=0.01)
+
+    buffer.add("item_1")
+    buffer.add("item_2")
+    task.delay.assert_not_called()
+    await asyncio.sleep(0.05)
+
+    task.delay.assert_called_once_with(["item_1", "item_2"])
+
+
+@pytest.mark.anyio
+async def test_task_buffer_flush() -> None:
+    task = mock.MagicMock()
+    buffer = batching.TaskBuffer("test", task, max_size=10, window=60.0)
+    buffer.add("item_1")
+
+    buffer.flush()
+    await asyncio.sleep(0)
+    buffer.add("item_2")
+    buffer.flush()
+
+    assert task.delay.call_args_list == [mock.call(["item_1"]), mock.call(["item_2"])]
+
+
+def test_task_buffer_flush_empty() -> None:
+    task = mock.MagicMock()
+    buffer = batching.TaskBuffer("test", task, max_size=10, window=60.0)
+
+    buffer.flush()
+
+    task.delay.assert_not_called()
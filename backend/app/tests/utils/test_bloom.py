@@ -0,0 +1,35 @@
+from app.utils import bloom
+
+
+def test_bloom_filter_contains_added_item() -> None:
+    bloom_filter = bloom.BloomFilter(capacity=100, false_positive_rate=0.01)
+
+    bloom_filter.add("item")
+
+    assert "item" in bloom_filter
+    assert bloom_filter.count == 1
+
+
+def test_bloom_filter_not_contains_missing_item() -> None:
+    bloom_filter = bloom.BloomFilter(capacity=100, false_positive_rate=0.01)
+
+    assert "item" not in bloom_filter
+
+
+def test_bloom_filter_size() -> None:
+    bloom_filter = bloom.BloomFilter(capacity=1000, false_positive_rate=0.01)
+
+    assert bloom_filter.size == 9586
+    assert bloom_filter.hash_count == 7
+    assert bloom_filter.size_bytes == 1199
+
+
+def test_bloom_filter_false_positive_rate() -> None:
+    bloom_filter = bloom.BloomFilter(capacity=1000, false_positive_rate=0.01)
+    for i in range(1000):
+        bloom_filter.add(f"added-{i}")
+
+    false_positives = sum(f"missing-{i}" in bloom_filter for i in range(10000))
+
+    assert all(f"added-{i}" in bloom_filter for i in range(1000))
+    assert false_positives / 10000 < 0.02
@@ -0,0 +1,148 @@
+import datetime
+from unittest import mock
+
+import freezegun
+import pytest
+
+from app.utils import cache, metrics
+
+
+def test_lru_cache_get() -> None:
+    lru_cache = cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+    lru_cache.set("key", {"value": 1})
+
+    assert lru_cache.get("key") == {"value": 1}
+
+
+def test_lru_cache_get_missing() -> None:
+    lru_cache = cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+
+    assert lru_cache.get("key") is None
+
+
+def test_lru_cache_get_expired() -> None:
+    lru_cache = cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+    with freezegun.freeze_time("2023-01-01 10:00:00"):
+        lru_cache.set("key", {"value": 1})
+
+    with freezegun.freeze_time("2023-01-01 10:00:31"):
+        assert lru_cache.get("key") is None
+
+
+def test_lru_cache_evicts_least_recently_used() -> None:
+    lru_cache = cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+    lru_cache.set("key_1", {"value": 1})
+    lru_cache.set("key_2", {"value": 2})
+    lru_cache.get("key_1")
+
+    lru_cache.set("key_3", {"value": 3})
+
+    assert lru_cache.get("key_1") == {"value": 1}
+    assert lru_cache.get("key_2") is None
+    assert lru_cache.get("key_3") == {"value": 3}
+
+
+def test_lru_cache_delete() -> None:
+    lru_cache = cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+    lru_cache.set("key", {"value": 1})
+
+    lru_cache.delete("key")
+    lru_cache.delete("missing_key")
+
+    assert lru_cache.get("key") is None
+
+
+def test_lru_cache_clear() -> None:
+    lru_cache = cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+    lru_cache.set("key", {"value": 1})
+
+    lru_cache.clear()
+
+    assert lru_cache.get("key") is None
+
+
+@pytest.mark.anyio
+async def test_tiered_cache_local() -> None:
+    tiered_cache = cache.TieredCache(
+        "test", cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+    )
+
+    await tiered_cache.set("key", {"value": 1})
+
+    assert await tiered_cache.get("key") == {"value": 1}
+    await tiered_cache.delete("key")
+    assert await tiered_cache.get("key") is None
+
+
+@pytest.mark.anyio
+async def test_tiered_cache_redis() -> None:
+    redis_db = mock.AsyncMock()
+    redis_db.get.return_value = b'{"value":1}'
+    local = cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30))
+    tiered_cache = cache.TieredCache("test", local, redis_db)
+
+    await tiered_cache.set("key", {"value": 1})
+    local.clear()
+
+    assert await tiered_cache.get("key") == {"value": 1}
+    assert local.get("key") == {"value": 1}
+    redis_db.set.assert_called_once_with("test:key", b'{"value":1}', px=30000)
+    redis_db.get.assert_called_once_with("test:key")
+
+
+@pytest.mark.anyio
+async def test_tiered_cache_redis_missing() -> None:
+    redis_db = mock.AsyncMock()
+    redis_db.get.return_value = None
+    tiered_cache = cache.TieredCache(
+        "test", cache.LRUCache(max_size=2, ttl=datetime.timedelta(seconds=30)), redis_db
+    )
+
+    assert await tiered_cache.get("key") is None
+
+    await tiered_cache.delete("key")
+    redis_db.delete.assert_called_once_with("test:key")
+
+
+def test_build_cache_builds_on_miss() -> None:
+    build_cache: cache.BuildCache[str] = cache.BuildCache("test_build", max_size=2)
+    build = mock.MagicMock(return_value="value")
+
+    first = build_cache.get_or_build("key", build)
+    second = build_cache.get_or_build("key", build)
+
+    assert first == second == "value"
+    build.assert_called_once()
+
+
+def test_build_cache_evicts_least_recently_used() -> None:
+    build_cache: cache.BuildCache[str] = cache.BuildCache("test_build", max_size=2)
+    build_cache.get_or_build("key_1", lambda: "value_1")
+    build_cache.get_or_build("key_2", lambda: "value_2")
+    build_cache.get_or_build("key_1", lambda: "new_value_1")
+
+    build_cache.get_or_build("key_3", lambda: "value_3")
+
+    assert build_cache.get_or_build("key_1", lambda: "new_value_1") == "value_1"
+    assert build_cache.get_or_build("key_2", lambda: "new_value_2") == "new_value_2"
+
+
+def test_build_cache_counts_hits_and_misses() -> None:
+    build_cache: cache.BuildCache[str] = cache.BuildCache("test_count", max_size=2)
+    hits = metrics.counter("test_count_cache_hits").value
+    misses = metrics.counter("test_count_cache_misses").value
+
+    build_cache.get_or_build("key", lambda: "value")
+    build_cache.get_or_build("key", lambda: "value")
+
+    assert metrics.counter("test_count_cache_hits").value == hits + 1
+    assert metrics.counter("test_count_cache_misses").value == misses + 1
+
+
+def test_build_cache_clear() -> None:
+    build_cache: cache.BuildCache[str] = cache.BuildCache("test_build", max_size=2)
+    build_cache.get_or_build("key", lambda: "value")
+
+    build_cache.clear()
+
+    assert build_cache.get_or_build("key", lambda: "new_value") == "new_value"
@@ -0,0 +1,94 @@
+from unittest import mock
+
+import pytest
+from sqlalchemy import exc
+from sqlalchemy.util import greenlet_spawn
+
+from app.utils import db_pool
+
+
+def create_pool() -> db_pool.InstrumentedAsyncQueuePool:
+    return db_pool.InstrumentedAsyncQueuePool(
+        mock.MagicMock, pool_size=1, max_overflow=0, timeout=0.01
+    )
+
+
+@pytest.mark.anyio
+async def test_instrumented_async_queue_pool_reports_checked_out() -> None:
+    pool = create_pool()
+    checked_out = db_pool.checked_out_connections.value
+    observations = db_pool.checkout_wait.count
+
+    def check_out_and_return() -> None:
+        connection = pool.connect()
+        assert db_pool.checked_out_connections.value == checked_out + 1
+        connection.close()
+
+    await greenlet_spawn(check_out_and_return)
+
+    assert db_pool.checked_out_connections.value == checked_out
+    assert db_pool.checkout_wait.count == observations + 1
+
+
+@pytest.mark.anyio
+async def test_instrumented_async_queue_pool_reports_checked_out_of_all_pools() -> (
+    None
+):
+    pools = [create_pool(), create_pool()]
+    checked_out = db_pool.checked_out_connections.value
+
+    def check_out_from_both() -> None:
+        connection_1 = pools[0].connect()
+        connection_2 = pools[1].connect()
+        assert db_pool.checked_out_connections.value == checked_out + 2
+        connection_2.close()
+        assert db_pool.checked_out_connections.value == checked_out + 1
+        connection_1.close()
+
+    await greenlet_spawn(check_out_from_both)
+
+    assert db_pool.checked_out_connections.value == checked_out
+
+
+@pytest.mark.anyio
+async def test_instrumented_async_queue_pool_reports_checkout_timeout() -> None:
+    pool = create_pool()
+    timeouts = db_pool.checkout_timeouts.value
+    observations = db_pool.checkout_wait.count
+
+    def check_out_twice() -> None:
+        connection = pool.connect()
+        try:
+            with pytest.raises(exc.TimeoutError):
+                pool.connect()
+        finally:
+            connection.close()
+
+    await greenlet_spawn(check_out_twice)
+
+    assert db_pool.checkout_timeouts.value == timeouts + 1
+    assert db_pool.checkout_wait.count == observations + 2
+
+
+def test_pgbouncer_connection_unique_statement_names() -> None:
+    connection = mock.MagicMock()
+
+    # pylint: disable-next=protected-access
+    name_1 = db_pool.PgBouncerConnection._get_unique_id(connection, "stmt")
+    # pylint: disable-next=protected-access
+    name_2 = db_pool.PgBouncerConnection._get_unique_id(connection, "stmt")
+
+    assert name_1.startswith("__asyncpg_stmt_")
+    assert name_1 != name_2
+
+
+def test_get_connect_args() -> None:
+    assert not db_pool.get_connect_args(pgbouncer=False)
+
+
+def test_get_connect_args_pgbouncer() -> None:
+    assert db_pool.get_connect_args(pgbouncer=True) == {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "connection_class": db_pool.PgBouncerConnection,
+    }
@@ -0,0 +1,13 @@
+from unittest import mock
+
+from app.utils import jinja
+
+
+@mock.patch("app.utils.jinja.env.get_template")
+def test_precompile_templates(mock_get_template: mock.MagicMock) -> None:
+    jinja.precompile_templates()
+
+    assert sorted(call.args[0] for call in mock_get_template.call_args_list) == [
+        "confirm_email.html.jinja",
+        "reset_password_email.html.jinja",
+    ]
@@ -0,0 +1,47 @@
+import pytest
+
+from app.utils import metrics
+
+
+def test_counter() -> None:
+    counter = metrics.counter("test_counter")
+
+    counter.inc()
+    counter.inc(2)
+
+    assert metrics.collect()["test_counter"] == 3
+
+
+def test_gauge() -> None:
+    gauge = metrics.gauge("test_gauge")
+
+    gauge.set(5)
+    gauge.inc(2)
+    gauge.dec()
+
+    assert metrics.collect()["test_gauge"] == 6
+
+
+def test_histogram() -> None:
+    histogram = metrics.histogram("test_histogram", buckets=(0.1, 1.0))
+
+    histogram.observe(0.05)
+    histogram.observe(0.5)
+    histogram.observe(5)
+
+    assert metrics.collect()["test_histogram"] == {
+        "buckets": {"0.1": 1, "1.0": 2, "+Inf": 3},
+        "sum": 5.55,
+        "count": 3,
+    }
+
+
+def test_metric_registered_once() -> None:
+    assert metrics.counter("test_same_counter") is metrics.counter("test_same_counter")
+
+
+def test_metric_registered_with_another_type() -> None:
+    metrics.counter("test_conflicting_metric")
+
+    with pytest.raises(TypeError):
+        metrics.gauge("test_conflicting_metric")
@@ -0,0 +1,27 @@
+from app.models import user as user_models
+from app.utils import converters, responses
+
+
+def test_dump_entries_uses_aliases() -> None:
+    page = user_models.UsersPage(
+        items=[], total=0, total_estimated=False, next_cursor=None
+    )
+
+    dumped_pages = responses.dump_entries(user_models.UsersPage, [page])
+
+    assert dumped_pages == [
+        {"total": 0, "items": [], "totalEstimated": False, "nextCursor": None}
+    ]
+
+
+def test_dump_entries() -> None:
+    user = user_models.User(
+        id=converters.to_uuid("1dd53909-fcda-4c72-afcd-1bf4886389f8"),
+        email="test@email.com",
+        password="hashed_password",
+        name="Test User",
+    )
+
+    dumped_users = responses.dump_entries(user_models.UserRead, [user])
+
+    assert dumped_users == [{"id": user.id, "email": user.email, "name": user.name}]
@@ -0,0 +1,279 @@
+import asyncio
+import smtplib
+from unittest import mock
+
+import aiosmtplib
+import pytest
+
+from app.utils import smtp
+
+
+def create_pool(
+    servers: list[mock.MagicMock],
+    max_size: int = 2,
+    max_messages: int = 10,
+    keepalive_interval: float = 30.0,
+) -> smtp.SMTPConnectionPool:
+    return smtp.SMTPConnectionPool(
+        connection_factory=mock.MagicMock(side_effect=servers),
+        max_size=max_size,
+        max_messages=max_messages,
+        keepalive_interval=keepalive_interval,
+    )
+
+
+def test_smtp_connection_pool_reuses_connection() -> None:
+    server = mock.MagicMock()
+    pool = create_pool([server])
+
+    with pool.connection() as server_1:
+        pass
+    with pool.connection() as server_2:
+        pass
+
+    assert server_1 is server_2 is server
+
+
+def test_smtp_connection_pool_connection_failed_use() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    pool = create_pool(servers)
+
+    with pytest.raises(smtplib.SMTPServerDisconnected):
+        with pool.connection():
+            raise smtplib.SMTPServerDisconnected()
+    with pool.connection() as server:
+        pass
+
+    servers[0].quit.assert_called_once()
+    assert server is servers[1]
+
+
+def test_smtp_connection_pool_max_messages() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    pool = create_pool(servers, max_messages=2)
+
+    used_servers = []
+    for _ in range(3):
+        with pool.connection() as server:
+            used_servers.append(server)
+
+    assert used_servers == [servers[0], servers[0], servers[1]]
+    servers[0].quit.assert_called_once()
+
+
+def test_smtp_connection_pool_session() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    pool = create_pool(servers, max_messages=2)
+
+    with pool.session() as connection:
+        connection.messages += 2
+    with pool.connection() as server:
+        pass
+
+    servers[0].quit.assert_called_once()
+    assert server is servers[1]
+
+
+def test_smtp_connection_pool_max_size() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    pool = create_pool(servers, max_size=1)
+
+    with pool.connection():
+        with pool.connection():
+            pass
+
+    servers[0].quit.assert_called_once()
+    servers[1].quit.assert_not_called()
+
+
+@mock.patch("time.monotonic", side_effect=[0.0, 0.0, 60.0, 60.0])
+def test_smtp_connection_pool_keepalive(_: mock.MagicMock) -> None:
+    server = mock.MagicMock()
+    server.noop.return_value = (250, b"OK")
+    pool = create_pool([server], keepalive_interval=30.0)
+
+    with pool.connection():
+        pass
+    with pool.connection() as reused_server:
+        pass
+
+    server.noop.assert_called_once()
+    assert reused_server is server
+
+
+@mock.patch("time.monotonic", side_effect=[0.0, 0.0, 60.0, 60.0, 60.0])
+def test_smtp_connection_pool_keepalive_dead_connection(_: mock.MagicMock) -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    servers[0].noop.side_effect = smtplib.SMTPServerDisconnected()
+    servers[0].quit.side_effect = smtplib.SMTPServerDisconnected()
+    pool = create_pool(servers, keepalive_interval=30.0)
+
+    with pool.connection():
+        pass
+    with pool.connection() as server:
+        pass
+
+    assert server is servers[1]
+    servers[0].close.assert_called_once()
+
+
+def test_smtp_connection_pool_after_fork() -> None:
+    servers = [mock.MagicMock(), mock.MagicMock()]
+    pool = create_pool(servers)
+    with pool.connection():
+        pass
+
+    with mock.patch("os.getpid", return_value=-1):
+        with pool.connection() as server:
+            pass
+
+    assert server is servers[1]
+    servers[0].quit.assert_not_called()
+
+
+def test_smtp_connection_pool_close() -> None:
+    server = mock.MagicMock()
+    pool = create_pool([server])
+    with pool.connection():
+        pass
+
+    pool.close()
+
+    server.quit.assert_called_once()
+
+
+def create_async_pool(
+    servers: list[mock.AsyncMock],
+    max_size: int = 2,
+    max_messages: int = 10,
+    keepalive_interval: float = 30.0,
+) -> smtp.AsyncSMTPConnectionPool:
+    return smtp.AsyncSMTPConnectionPool(
+        connection_factory=mock.AsyncMock(side_effect=servers),
+        max_size=max_size,
+        max_messages=max_messages,
+        keepalive_interval=keepalive_interval,
+    )
+
+
+@pytest.mark.anyio
+async def test_async_smtp_connection_pool_reuses_connection() -> None:
+    server = mock.AsyncMock()
+    pool = create_async_pool([server])
+
+    async with pool.connection() as server_1:
+        pass
+    async with pool.connection() as server_2:
+        pass
+
+    assert server_1 is server_2 is server
+
+
+@pytest.mark.anyio
+async def test_async_smtp_connection_pool_max_size() -> None:
+    servers = [mock.AsyncMock(), mock.AsyncMock()]
+    pool = create_async_pool(servers, max_size=1)
+    entered = asyncio.Event()
+
+    async def use_connection() -> None:
+        async with pool.connection():
+            entered.set()
+            await asyncio.sleep(0.01)
+
+    task = asyncio.create_task(use_connection())
+    await entered.wait()
+    async with pool.connection() as server:
+        assert task.done()
+    await task
+
+    assert server is servers[0]
+
+
+@pytest.mark.anyio
+async def test_async_smtp_connection_pool_connection_failed_use() -> None:
+    servers = [mock.AsyncMock(), mock.AsyncMock()]
+    pool = create_async_pool(servers)
+
+    with pytest.raises(aiosmtplib.SMTPServerDisconnected):
+        async with pool.connection():
+            raise aiosmtplib.SMTPServerDisconnected("Error")
+    async with pool.connection() as server:
+        pass
+
+    servers[0].quit.assert_awaited_once()
+    assert server is servers[1]
+
+
+@pytest.mark.anyio
+async def test_async_smtp_connection_pool_max_messages() -> None:
+    servers = [mock.AsyncMock(), mock.AsyncMock()]
+    pool = create_async_pool(servers, max_messages=1)
+
+    async with pool.connection():
+        pass
+    async with pool.connection() as server:
+        pass
+
+    servers[0].quit.assert_awaited_once()
+    assert server is servers[1]
+
+
+@pytest.mark.anyio
+@mock.patch("time.monotonic", side_effect=[0.0, 0.0, 60.0, 60.0])
+async def test_async_smtp_connection_pool_keepalive(_: mock.MagicMock) -> None:
+    server = mock.AsyncMock()
+    server.noop.return_value = mock.MagicMock(code=250)
+    pool = create_async_pool([server], keepalive_interval=30.0)
+
+    async with pool.connection():
+        pass
+    async with pool.connection() as reused_server:
+        pass
+
+    server.noop.assert_awaited_once()
+    assert reused_server is server
+
+
+@pytest.mark.anyio
+@mock.patch("time.monotonic", side_effect=[0.0, 0.0, 60.0, 60.0, 60.0])
+async def test_async_smtp_connection_pool_keepalive_dead_connection(
+    _: mock.MagicMock,
+) -> None:
+    servers = [mock.AsyncMock(), mock.AsyncMock()]
+    servers[0].close = mock.MagicMock()
+    servers[0].noop.side_effect = aiosmtplib.SMTPServerDisconnected("Error")
+    servers[0].quit.side_effect = aiosmtplib.SMTPServerDisconnected("Error")
+    pool = create_async_pool(servers, keepalive_interval=30.0)
+
+    async with pool.connection():
+        pass
+    async with pool.connection() as server:
+        pass
+
+    assert server is servers[1]
+    servers[0].close.assert_called_once()
+
+
+def test_async_smtp_connection_pool_another_loop() -> None:
+    servers = [mock.AsyncMock(), mock.AsyncMock()]
+    pool = create_async_pool(servers)
+
+    async def get_server() -> aiosmtplib.SMTP:
+        async with pool.connection() as server:
+            return server
+
+    assert asyncio.run(get_server()) is servers[0]
+    assert asyncio.run(get_server()) is servers[1]
+    servers[0].quit.assert_not_awaited()
+
+
+@pytest.mark.anyio
+async def test_async_smtp_connection_pool_close() -> None:
+    server = mock.AsyncMock()
+    pool = create_async_pool([server])
+    async with pool.connection():
+        pass
+
+    await pool.close()
+
+    server.quit.assert_awaited_once()
@@ -1,6 +1,9 @@
+import asyncio
 import enum
+import functools
 import json
 import typing
+from concurrent import futures
 
 import pyseto
 from fastapi import exceptions, security, status
@@ -11,6 +14,7 @@ from starlette import requests as starlette_requests
 
 from app.config import general
 from app.exceptions.app import auth as auth_exceptions
+from app.utils import metrics
 
 settings = general.get_settings()
 
@@ -59,27 +63,132 @@ oauth2_scheme = OAuth2PasswordBearer(
 pwd_context = context.CryptContext(schemes=["argon2"], deprecated="auto")
 
 
-def hash_password(password: str) -> str:
+def _hash_password(password: str) -> str:
     return pwd_context.hash(password)
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
+def _verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHasher:
+    """
+    Run password hashing in a bounded worker pool.
+
+    Argon2 is deliberately CPU and memory expensive, so calling it directly from
+    the async code would block the event loop for the whole hashing time. The number
+    of workers is the concurrency limit, and the calls above it wait in the executor
+    queue.
+    """
+
+    def __init__(self, executor: futures.Executor, max_workers: int):
+        self._executor = executor
+        self.max_workers = max_workers
+        self._in_flight = metrics.gauge("password_hashing_in_flight")
+        self._queue_depth = metrics.gauge("password_hashing_queue_depth")
+        self._duration = metrics.histogram("password_hashing_duration_seconds")
+
+    async def hash(self, password: str) -> str:
+        return await self._run(_hash_password, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(_verify_password, plain_password, hashed_password)
+
+    async def _run(
+        self, func: typing.Callable[..., typing.Any], *args: typing.Any
+    ) -> typing.Any:
+        loop = asyncio.get_running_loop()
+        self._in_flight.inc()
+        self._update_queue_depth()
+        start = loop.time()
+        try:
+            return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            self._duration.observe(loop.time() - start)
+            self._in_flight.dec()
+            self._update_queue_depth()
+
+    def _update_queue_depth(self) -> None:
+        self._queue_depth.set(max(0, self._in_flight.value - self.max_workers))
+
+
+@functools.lru_cache
+def get_password_hasher() -> PasswordHasher:
+    max_workers = settings.PASSWORD_HASHING_MAX_WORKERS
+    executor: futures.Executor
+    if settings.PASSWORD_HASHING_EXECUTOR == "process":
+        executor = futures.ProcessPoolExecutor(max_workers=max_workers)
+    else:
+        executor = futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="password-hashing"
+        )
+    return PasswordHasher(executor, max_workers)
+
+
+async def hash_password(password: str) -> str:
+    return await get_password_hasher().hash(password)
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await get_password_hasher().verify(plain_password, hashed_password)
+
+
 class TokenPurpose(enum.Enum):
     LOCAL = "local"
     PUBLIC = "public"
 
 
+PRIMARY_KEY_ID = general.PASETO_PRIMARY_KEY_ID
+
+KeyID: typing.TypeAlias = str
+
+
+class KeyRegistry:
+    """
+    Build every PASETO key once and reuse it for the process lifetime.
+
+    Besides the primary key, the registry keeps the previous keys, so tokens created
+    before a secret rotation are still accepted until they expire.
+    """
+
+    def __init__(self, secrets: dict[KeyID, str]):
+        self._secrets = secrets
+        self._keys: dict[tuple[int, str, KeyID], pyseto.KeyInterface] = {}
+
+    def get_key(
+        self, version: int, purpose: TokenPurpose, key_id: KeyID = PRIMARY_KEY_ID
+    ) -> pyseto.KeyInterface:
+        cache_key = (version, purpose.value, key_id)
+        if not (key := self._keys.get(cache_key)):
+            key = pyseto.Key.new(
+                version=version, purpose=purpose.value, key=self._secrets[key_id]
+            )
+            self._keys[cache_key] = key
+        return key
+
+    def get_decoding_keys(
+        self, version: int, purpose: TokenPurpose
+    ) -> list[pyseto.KeyInterface]:
+        # The primary key goes first as it decodes the vast majority of tokens
+        return [self.get_key(version, purpose, key_id) for key_id in self._secrets]
+
+
+@functools.lru_cache
+def get_key_registry() -> KeyRegistry:
+    return KeyRegistry(
+        {
+            PRIMARY_KEY_ID: settings.AUTHPASETO_SECRET_KEY,
+            **settings.AUTHPASETO_PREVIOUS_SECRET_KEYS,
+        }
+    )
+
+
 def decode_token(
     token: str, version: int = 4, purpose: TokenPurpose = TokenPurpose.LOCAL
 ) -> pyseto.Token:
-    decoding_key = pyseto.Key.new(
-        version=version, purpose=purpose.value, key=settings.AUTHPASETO_SECRET_KEY
-    )
+    decoding_keys = get_key_registry().get_decoding_keys(version, purpose)
     try:
-        return pyseto.decode(keys=decoding_key, token=token, deserializer=json)
+        return pyseto.decode(keys=decoding_keys, token=token, deserializer=json)
     except (pyseto.VerifyError, pyseto.DecryptError, pyseto.SignError, ValueError) as e:
         raise auth_exceptions.TokenDecodingError from e
 
@@ -0,0 +1,45 @@
+import asyncio
+import typing
+
+from app.utils import metrics
+
+if typing.TYPE_CHECKING:
+    import celery
+
+
+class TaskBuffer:
+    """
+    Buffer the items in the process and enqueue them to the task in batches.
+
+    A batch is enqueued as a single message once it has max_size items or the
+    window has passed since its first item, so an item waits at most the window.
+    The buffered items are lost if the process is killed, so flush the buffer on
+    shutdown.
+    """
+
+    def __init__(self, name: str, task: "celery.Task", max_size: int, window: float):
+        self.task = task
+        self.max_size = max_size
+        self.window = window
+        self._items: list[typing.Any] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._batches = metrics.counter(f"{name}_batches")
+        self._batch_items = metrics.counter(f"{name}_batch_items")
+
+    def add(self, item: typing.Any) -> None:
+        self._items.append(item)
+        if len(self._items) >= self.max_size:
+            self.flush()
+        elif not self._timer:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self.flush)
+
+    def flush(self) -> None:
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        if not self._items:
+            return
+        items, self._items = self._items, []
+        self.task.delay(items)
+        self._batches.inc()
+        self._batch_items.inc(len(items))
@@ -0,0 +1,46 @@
+import hashlib
+import math
+
+
+class BloomFilter:
+    """
+    Probabilistic set that can tell that an item is definitely not in it.
+
+    The size is fixed up front from the expected number of items and the target
+    false-positive rate. Adding more items than the capacity does not grow the
+    memory, but the false-positive rate goes up.
+    """
+
+    def __init__(self, capacity: int, false_positive_rate: float):
+        self.capacity = capacity
+        self.false_positive_rate = false_positive_rate
+        self.size = max(
+            8, math.ceil(-capacity * math.log(false_positive_rate) / math.log(2) ** 2)
+        )
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.count = 0
+        self._bits = bytearray(math.ceil(self.size / 8))
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self._bits)
+
+    def add(self, item: str) -> None:
+        for position in self._get_positions(item):
+            self._bits[position // 8] |= 1 << (position % 8)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(
+            self._bits[position // 8] & (1 << (position % 8))
+            for position in self._get_positions(item)
+        )
+
+    def _get_positions(self, item: str) -> list[int]:
+        # Kirsch-Mitzenmacher double hashing derives all positions from two hashes
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first_hash = int.from_bytes(digest[:8], "little")
+        second_hash = int.from_bytes(digest[8:], "little") | 1
+        return [
+            (first_hash + i * second_hash) % self.size for i in range(self.hash_count)
+        ]
@@ -0,0 +1,129 @@
+import collections
+import datetime
+import time
+import typing
+
+import orjson
+
+from app.utils import converters, metrics
+
+if typing.TYPE_CHECKING:
+    from redis import asyncio as redis_asyncio
+
+CacheValue: typing.TypeAlias = dict[str, typing.Any]
+T = typing.TypeVar("T")
+
+
+class LRUCache:
+    """In-process LRU cache with the time-based expiration of entries."""
+
+    def __init__(self, max_size: int, ttl: datetime.timedelta):
+        self.max_size = max_size
+        self.ttl = ttl.total_seconds()
+        self._entries: collections.OrderedDict[
+            str, tuple[float, CacheValue]
+        ] = collections.OrderedDict()
+
+    def get(self, key: str) -> CacheValue | None:
+        if not (entry := self._entries.get(key)):
+            return None
+        expire_at, value = entry
+        if expire_at < time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: CacheValue) -> None:
+        self._entries[key] = (time.monotonic() + self.ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class BuildCache(typing.Generic[T]):
+    """
+    In-process LRU cache of the objects built on a miss, which never expire.
+
+    Meant for the objects derived from the code rather than the data, e.g. the SQL
+    statements of a given shape, so the number of keys is bounded by the code.
+    """
+
+    def __init__(self, name: str, max_size: int):
+        self.max_size = max_size
+        self._entries: collections.OrderedDict[
+            typing.Hashable, T
+        ] = collections.OrderedDict()
+        self._hits = metrics.counter(f"{name}_cache_hits")
+        self._misses = metrics.counter(f"{name}_cache_misses")
+
+    def get_or_build(self, key: typing.Hashable, build: typing.Callable[[], T]) -> T:
+        if (value := self._entries.get(key)) is not None:
+            self._entries.move_to_end(key)
+            self._hits.inc()
+            return value
+        self._misses.inc()
+        value = self._entries[key] = build()
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class TieredCache:
+    """
+    Two-level cache with the in-process LRU in front of the optional Redis.
+
+    The local level is per process, so the invalidation only reaches the Redis
+    level and the current process. The other processes can serve a stale entry
+    until its TTL passes, so keep the TTL short.
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        local: LRUCache,
+        redis_db: "redis_asyncio.Redis[bytes] | None" = None,
+    ):
+        self.namespace = namespace
+        self.local = local
+        self.redis_db = redis_db
+        self._hits = metrics.counter(f"{namespace}_cache_hits")
+        self._misses = metrics.counter(f"{namespace}_cache_misses")
+
+    async def get(self, key: str) -> CacheValue | None:
+        if (value := self.local.get(key)) is not None:
+            self._hits.inc()
+            return value
+        if self.redis_db and (raw := await self.redis_db.get(self._redis_key(key))):
+            value = orjson.loads(raw)
+            self.local.set(key, value)
+            self._hits.inc()
+            return value
+        self._misses.inc()
+        return None
+
+    async def set(self, key: str, value: CacheValue) -> None:
+        self.local.set(key, value)
+        if self.redis_db:
+            await self.redis_db.set(
+                self._redis_key(key),
+                converters.orjson_dumps(value),
+                px=int(self.local.ttl * 1000),
+            )
+
+    async def delete(self, key: str) -> None:
+        self.local.delete(key)
+        if self.redis_db:
+            await self.redis_db.delete(self._redis_key(key))
+
+    def _redis_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
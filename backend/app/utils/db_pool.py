@@ -0,0 +1,69 @@
+import time
+import typing
+import uuid
+
+import asyncpg
+from sqlalchemy import exc, pool
+
+from app.utils import metrics
+
+checked_out_connections = metrics.gauge("db_pool_checked_out")
+checkout_wait = metrics.histogram("db_pool_checkout_wait_seconds")
+checkout_timeouts = metrics.counter("db_pool_checkout_timeouts")
+
+
+class InstrumentedAsyncQueuePool(pool.AsyncAdaptedQueuePool):
+    """
+    Queue pool of the async engine which reports its usage in the metrics.
+
+    The checkout wait covers waiting for a free connection, opening a new one and
+    the pre-ping, i.e. all the time a request spends before it can run a query.
+    The checked out connections are counted across the pools of the primary and
+    the replicas, so each pool adds and removes its own instead of setting them.
+    """
+
+    def connect(self) -> typing.Any:
+        started = time.perf_counter()
+        try:
+            connection = super().connect()  # type: ignore[no-untyped-call]
+        except exc.TimeoutError:
+            checkout_timeouts.inc()
+            raise
+        finally:
+            checkout_wait.observe(time.perf_counter() - started)
+        checked_out_connections.inc()
+        return connection
+
+    def _do_return_conn(self, conn: typing.Any) -> None:
+        super()._do_return_conn(conn)  # type: ignore[misc]
+        checked_out_connections.dec()
+
+
+class PgBouncerConnection(asyncpg.Connection):
+    """
+    Connection of asyncpg working through PgBouncer in the transaction mode.
+
+    The server connections are shared by the clients, so the prepared statements
+    get unique names instead of the numbered ones, which collide with the ones left
+    on the server connection by the other clients.
+    """
+
+    def _get_unique_id(self, prefix: str) -> str:
+        return f"__asyncpg_{prefix}_{uuid.uuid4()}__"
+
+
+def get_connect_args(pgbouncer: bool) -> dict[str, typing.Any]:
+    """
+    Return the connect arguments of the asyncpg engines.
+
+    In the PgBouncer mode, the caches of the prepared statements, both the one of
+    asyncpg and the one of SQLAlchemy, are disabled, as a statement prepared in one
+    transaction may not exist on the server connection of the next one.
+    """
+    if not pgbouncer:
+        return {}
+    return {
+        "statement_cache_size": 0,
+        "prepared_statement_cache_size": 0,
+        "connection_class": PgBouncerConnection,
+    }
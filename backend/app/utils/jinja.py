@@ -1,12 +1,31 @@
 import jinja2
 
+from app.config import general
 from app.utils import translation
 
+settings = general.get_settings()
+
+TEMPLATE_EXTENSIONS = ["jinja"]
+
 env = jinja2.Environment(  # nosec
     loader=jinja2.PackageLoader("app", "templates"),
     autoescape=jinja2.select_autoescape(["html", "htm", "xml", "html.jinja"]),
     extensions=["jinja2.ext.i18n"],
+    # Without the reload, the loaded templates are served without checking the files
+    auto_reload=settings.DEV_MODE,
+    bytecode_cache=jinja2.FileSystemBytecodeCache(settings.TEMPLATES_CACHE_DIR),
 )
 env.install_gettext_translations(  # type: ignore # pylint: disable=no-member
     translation.translations,
 )
+
+
+def precompile_templates() -> None:
+    """
+    Load all the templates, so they aren't compiled on the first render.
+
+    The translations are looked up when a template is rendered, so the compiled
+    templates serve all the locales.
+    """
+    for template_name in env.list_templates(extensions=TEMPLATE_EXTENSIONS):
+        env.get_template(template_name)
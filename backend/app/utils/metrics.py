@@ -0,0 +1,96 @@
+import bisect
+import typing
+
+MetricValue: typing.TypeAlias = int | float | dict[str, typing.Any]
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Counter:
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self, amount: int = 1) -> None:
+        self.value += amount
+
+    def collect(self) -> MetricValue:
+        return self.value
+
+
+class Gauge:
+    def __init__(self) -> None:
+        self.value: int | float = 0
+
+    def inc(self, amount: int | float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: int | float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: int | float) -> None:
+        self.value = value
+
+    def collect(self) -> MetricValue:
+        return self.value
+
+
+class Histogram:
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        # The last slot counts observations above the highest bucket
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def collect(self) -> MetricValue:
+        bounds = [str(bucket) for bucket in self.buckets] + ["+Inf"]
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(bounds, self.counts, strict=True):
+            cumulative += count
+            buckets[bound] = cumulative
+        return {"buckets": buckets, "sum": self.sum, "count": self.count}
+
+
+Metric: typing.TypeAlias = Counter | Gauge | Histogram
+MetricType = typing.TypeVar("MetricType", Counter, Gauge, Histogram)
+
+_registry: dict[str, Metric] = {}
+
+
+def _get_or_create(
+    name: str, metric_type: type[MetricType], factory: typing.Callable[[], MetricType]
+) -> MetricType:
+    metric = _registry.setdefault(name, factory())
+    if not isinstance(metric, metric_type):
+        raise TypeError(f"Metric {name!r} is already registered with another type")
+    return metric
+
+
+def counter(name: str) -> Counter:
+    return _get_or_create(name, Counter, Counter)
+
+
+def gauge(name: str) -> Gauge:
+    return _get_or_create(name, Gauge, Gauge)
+
+
+def histogram(
+    name: str, buckets: typing.Sequence[float] = DEFAULT_BUCKETS
+) -> Histogram:
+    return _get_or_create(name, Histogram, lambda: Histogram(buckets))
+
+
+def collect() -> dict[str, MetricValue]:
+    """
+    Return a snapshot of all metrics registered in the current process.
+
+    Metrics are kept in-process, so every gunicorn worker and Celery worker process
+    reports only its own values.
+    """
+    return {name: metric.collect() for name, metric in sorted(_registry.items())}
@@ -1,5 +1,6 @@
 import typing
 
+import pydantic
 from fastapi import responses as fastapi_responses
 
 from app.utils import converters
@@ -10,3 +11,19 @@ class ORJSONResponse(fastapi_responses.JSONResponse):
 
     def render(self, content: typing.Any) -> bytes:
         return converters.orjson_dumps(content)
+
+
+def dump_entries(
+    model: type[pydantic.BaseModel], entries: typing.Iterable[typing.Any]
+) -> list[dict[str, typing.Any]]:
+    """
+    Dump the entries to the dicts shaped as the response model.
+
+    The values are taken from the entries without validating them with the model,
+    which saves the per-entry overhead on long lists of rows already read from the
+    database.
+    """
+    fields = [(field.alias, name) for name, field in model.__fields__.items()]
+    return [
+        {alias: getattr(entry, name) for alias, name in fields} for entry in entries
+    ]
@@ -0,0 +1,229 @@
+import asyncio
+import collections
+import contextlib
+import os
+import smtplib
+import threading
+import time
+import typing
+
+import aiosmtplib
+
+from app.utils import metrics
+
+ServerType = typing.TypeVar("ServerType", smtplib.SMTP, aiosmtplib.SMTP)
+ConnectionFactory: typing.TypeAlias = typing.Callable[[], smtplib.SMTP]
+AsyncConnectionFactory: typing.TypeAlias = typing.Callable[
+    [], typing.Awaitable[aiosmtplib.SMTP]
+]
+
+NOOP_OK_CODE = 250
+
+opened_connections = metrics.counter("smtp_connections_opened")
+reused_connections = metrics.counter("smtp_connections_reused")
+
+
+class PooledConnection(typing.Generic[ServerType]):
+    def __init__(self, server: ServerType):
+        self.server: ServerType = server
+        self.messages = 0
+        self.last_used = time.monotonic()
+
+
+class SMTPConnectionPool:
+    """
+    Pool of the SMTP connections reused across the sent emails.
+
+    The connection factory returns a connection ready to send, i.e. logged in.
+    The pool belongs to a single process, so the connections inherited from the
+    parent after a fork are dropped instead of being shared. A connection idle for
+    longer than the keepalive interval is checked with NOOP before it's reused, and
+    a connection which sent max_messages emails is closed, as the providers limit
+    the messages per session.
+    """
+
+    def __init__(
+        self,
+        connection_factory: ConnectionFactory,
+        max_size: int,
+        max_messages: int,
+        keepalive_interval: float,
+    ):
+        self.connection_factory = connection_factory
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.keepalive_interval = keepalive_interval
+        self._idle: collections.deque[
+            PooledConnection[smtplib.SMTP]
+        ] = collections.deque()
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+
+    @contextlib.contextmanager
+    def connection(self) -> typing.Iterator[smtplib.SMTP]:
+        """Lend a connection to send a single message."""
+        with self.session() as connection:
+            yield connection.server
+            connection.messages += 1
+
+    @contextlib.contextmanager
+    def session(self) -> typing.Iterator[PooledConnection[smtplib.SMTP]]:
+        """
+        Lend a connection to send many messages, counted by the caller.
+
+        The caller stops sending once the connection reaches max_messages, so it's
+        closed on the return and the rest goes over a new one. The connection is
+        closed instead of returned if the use fails.
+        """
+        connection = self._acquire()
+        try:
+            yield connection
+        except BaseException:
+            _close(connection)
+            raise
+        self._release(connection)
+
+    def close(self) -> None:
+        with self._lock:
+            connections = list(self._idle)
+            self._idle.clear()
+        for connection in connections:
+            _close(connection)
+
+    def _acquire(self) -> PooledConnection[smtplib.SMTP]:
+        while connection := self._pop_idle():
+            if self._is_alive(connection):
+                reused_connections.inc()
+                return connection
+            _close(connection)
+        return self._connect()
+
+    def _pop_idle(self) -> PooledConnection[smtplib.SMTP] | None:
+        with self._lock:
+            if self._pid != os.getpid():
+                # The sockets belong to the parent process, so don't close them
+                self._idle.clear()
+                self._pid = os.getpid()
+            return self._idle.pop() if self._idle else None
+
+    def _is_alive(self, connection: PooledConnection[smtplib.SMTP]) -> bool:
+        if time.monotonic() - connection.last_used < self.keepalive_interval:
+            return True
+        try:
+            code, _ = connection.server.noop()
+        except (smtplib.SMTPException, OSError):
+            return False
+        return code == NOOP_OK_CODE
+
+    def _connect(self) -> PooledConnection[smtplib.SMTP]:
+        server = self.connection_factory()
+        opened_connections.inc()
+        return PooledConnection(server)
+
+    def _release(self, connection: PooledConnection[smtplib.SMTP]) -> None:
+        connection.last_used = time.monotonic()
+        if connection.messages >= self.max_messages:
+            _close(connection)
+            return
+        with self._lock:
+            if len(self._idle) < self.max_size:
+                self._idle.append(connection)
+                return
+        _close(connection)
+
+
+def _close(connection: PooledConnection[smtplib.SMTP]) -> None:
+    try:
+        connection.server.quit()
+    except (smtplib.SMTPException, OSError):
+        connection.server.close()
+
+
+class AsyncSMTPConnectionPool:
+    """
+    Asyncio counterpart of SMTPConnectionPool.
+
+    At most max_size connections are lent at once, so it bounds the sends in flight
+    and the callers above the limit wait for a connection. The connections belong
+    to the event loop which opened them, so the ones left by another loop are
+    dropped, like the ones inherited after a fork.
+    """
+
+    def __init__(
+        self,
+        connection_factory: AsyncConnectionFactory,
+        max_size: int,
+        max_messages: int,
+        keepalive_interval: float,
+    ):
+        self.connection_factory = connection_factory
+        self.max_size = max_size
+        self.max_messages = max_messages
+        self.keepalive_interval = keepalive_interval
+        self._idle: collections.deque[
+            PooledConnection[aiosmtplib.SMTP]
+        ] = collections.deque()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._semaphore = asyncio.Semaphore(max_size)
+
+    @contextlib.asynccontextmanager
+    async def connection(self) -> typing.AsyncIterator[aiosmtplib.SMTP]:
+        """Lend a connection, which is closed instead of returned if the use fails."""
+        self._bind_loop()
+        async with self._semaphore:
+            connection = await self._acquire()
+            try:
+                yield connection.server
+            except BaseException:
+                await _close_async(connection)
+                raise
+            connection.messages += 1
+            await self._release(connection)
+
+    async def close(self) -> None:
+        connections = list(self._idle)
+        self._idle.clear()
+        for connection in connections:
+            await _close_async(connection)
+
+    def _bind_loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # The connections of a closed loop can't be used nor closed anymore
+            self._idle.clear()
+            self._semaphore = asyncio.Semaphore(self.max_size)
+            self._loop = loop
+
+    async def _acquire(self) -> PooledConnection[aiosmtplib.SMTP]:
+        while self._idle:
+            connection = self._idle.pop()
+            if await self._is_alive(connection):
+                reused_connections.inc()
+                return connection
+            await _close_async(connection)
+        server = await self.connection_factory()
+        opened_connections.inc()
+        return PooledConnection(server)
+
+    async def _is_alive(self, connection: PooledConnection[aiosmtplib.SMTP]) -> bool:
+        if time.monotonic() - connection.last_used < self.keepalive_interval:
+            return True
+        try:
+            response = await connection.server.noop()
+        except (aiosmtplib.SMTPException, OSError):
+            return False
+        return response.code == NOOP_OK_CODE
+
+    async def _release(self, connection: PooledConnection[aiosmtplib.SMTP]) -> None:
+        connection.last_used = time.monotonic()
+        if connection.messages < self.max_messages and len(self._idle) < self.max_size:
+            self._idle.append(connection)
+            return
+        await _close_async(connection)
+
+
+async def _close_async(connection: PooledConnection[aiosmtplib.SMTP]) -> None:
+    try:
+        await connection.server.quit()
+    except (aiosmtplib.SMTPException, OSError):
+        connection.server.close()
@@ -0,0 +1,80 @@
+"""
+Time AppCRUD.read_one by ID and by email with and without the statement cache.
+
+Needs a migrated database. Without the cache, the statement is built again for
+every query, like before the cache was added. The created user is deleted at the
+end.
+
+    python -m benchmarks.crud_read_one --repeat 5000
+"""
+import argparse
+import asyncio
+import logging
+import time
+import typing
+import uuid
+
+from app.config import db
+from app.models import user as user_models
+from app.services import base
+from app.utils import metrics
+
+log = logging.getLogger(__name__)
+
+
+async def _measure(
+    name: str,
+    func: typing.Callable[[], typing.Awaitable[typing.Any]],
+    repeat: int,
+    cached: bool,
+) -> None:
+    hits = metrics.counter("crud_statement_cache_hits").value
+    started = time.perf_counter()
+    for _ in range(repeat):
+        if not cached:
+            base.statement_cache.clear()
+        await func()
+    elapsed = time.perf_counter() - started
+    log.info(
+        "%s %s: %.1f us per query, %d cache hits",
+        name,
+        "cached" if cached else "uncached",
+        elapsed / repeat * 1_000_000,
+        metrics.counter("crud_statement_cache_hits").value - hits,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    async with db.session_factory() as session:
+        crud = base.AppCRUD(user_models.User, session)
+        user = await crud.create(
+            user_models.UserCreate(
+                email=f"benchmark-{uuid.uuid4()}@example.com",
+                password="benchmark_password",
+                name="Benchmark User",
+            )
+        )
+
+        async def read_by_id() -> None:
+            await crud.read_one(user_models.UserFilters(id=user.id))
+
+        async def read_by_email() -> None:
+            await crud.read_one(user_models.UserFilters(email=user.email))
+
+        # Warm up the connection and the compiled cache of SQLAlchemy
+        await read_by_id()
+        await read_by_email()
+        for cached in (False, True):
+            await _measure("read_one by id", read_by_id, args.repeat, cached)
+            await _measure("read_one by email", read_by_email, args.repeat, cached)
+        await crud.delete(user)
+    await db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,82 @@
+"""
+Measure the query throughput of the database pool against its size.
+
+Needs the database from the settings. Every query holds its connection for
+--query-time milliseconds to emulate the work of a request, and --concurrency
+queries are in flight at once, like the requests of a busy gunicorn worker.
+
+    python -m benchmarks.db_pool --pool-sizes 1 5 10 20 --queries 2000
+"""
+import argparse
+import asyncio
+import logging
+import time
+
+import sqlalchemy
+from sqlalchemy.ext import asyncio as sqlalchemy_asyncio
+
+from app.config import general
+from app.utils import db_pool
+
+log = logging.getLogger(__name__)
+
+settings = general.get_settings()
+
+
+async def _run(
+    pool_size: int, queries: int, concurrency: int, query_time: float
+) -> None:
+    engine = sqlalchemy_asyncio.create_async_engine(
+        settings.DATABASE_URL,
+        poolclass=db_pool.InstrumentedAsyncQueuePool,
+        pool_size=pool_size,
+        max_overflow=0,
+        pool_timeout=settings.DATABASE_POOL_TIMEOUT,
+        connect_args=db_pool.get_connect_args(settings.DATABASE_PGBOUNCER),
+    )
+    statement = sqlalchemy.select(sqlalchemy.func.pg_sleep(query_time))
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def query() -> None:
+        async with semaphore, engine.connect() as connection:
+            await connection.execute(statement)
+
+    # Open the connections before measuring
+    await asyncio.gather(*(query() for _ in range(pool_size)))
+    wait_sum = db_pool.checkout_wait.sum
+    wait_count = db_pool.checkout_wait.count
+    started = time.perf_counter()
+    await asyncio.gather(*(query() for _ in range(queries)))
+    elapsed = time.perf_counter() - started
+    await engine.dispose()
+
+    log.info(
+        "pool size %d: %.0f queries/s, %.2f ms average checkout wait",
+        pool_size,
+        queries / elapsed,
+        (db_pool.checkout_wait.sum - wait_sum)
+        / (db_pool.checkout_wait.count - wait_count)
+        * 1000,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pool-sizes", type=int, nargs="+", default=[1, 5, 10, 20])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument(
+        "--query-time",
+        type=float,
+        default=5.0,
+        help="Milliseconds every query holds its connection",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    for pool_size in args.pool_sizes:
+        await _run(pool_size, args.queries, args.concurrency, args.query_time / 1000)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
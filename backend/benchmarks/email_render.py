@@ -0,0 +1,78 @@
+"""
+Measure the throughput of rendering the emails sent by the Celery tasks.
+
+Compares loading the template with the file checks of auto-reload against the
+precompiled one, and measures building the MIME message. No services are needed.
+
+    python -m benchmarks.email_render --emails 5000
+"""
+import argparse
+import logging
+import time
+import typing
+
+from app.services import email as email_services
+from app.utils import jinja
+
+log = logging.getLogger(__name__)
+
+TEMPLATE_NAME = "confirm_email.html.jinja"
+LINK = "https://example.com/confirm-email/1dd53909-fcda-4c72-afcd-1bf4886389f8"
+
+
+def _build_message(message_html: str) -> str:
+    return email_services.build_message(
+        message_html=message_html,
+        message_text=f"Click the link to confirm your email: {LINK}",
+        subject="Confirm email",
+        receiver="receiver@example.com",
+    )
+
+
+def _measure(name: str, func: typing.Callable[[], typing.Any], emails: int) -> None:
+    started = time.perf_counter()
+    for _ in range(emails):
+        func()
+    elapsed = time.perf_counter() - started
+    log.info("%s: %.0f emails/s", name, emails / elapsed)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=5000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    reloading_env = jinja.env.overlay(auto_reload=True)
+    jinja.precompile_templates()
+    message_html = jinja.env.get_template(TEMPLATE_NAME).render(link=LINK)
+
+    _measure(
+        "render with auto-reload",
+        lambda: reloading_env.get_template(TEMPLATE_NAME).render(link=LINK),
+        args.emails,
+    )
+    _measure(
+        "render precompiled",
+        lambda: jinja.env.get_template(TEMPLATE_NAME).render(link=LINK),
+        args.emails,
+    )
+    _measure(
+        "compile without cache",
+        lambda: jinja.env.overlay(bytecode_cache=None, cache_size=0)
+        .get_template(TEMPLATE_NAME)
+        .render(link=LINK),
+        args.emails // 10,
+    )
+    _measure(
+        "compile with bytecode cache",
+        lambda: jinja.env.overlay(cache_size=0)
+        .get_template(TEMPLATE_NAME)
+        .render(link=LINK),
+        args.emails // 10,
+    )
+    _measure("build_message", lambda: _build_message(message_html), args.emails)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Compare the event loop lag of the synchronous and asynchronous denylist lookups.
+
+A ticker coroutine measures how late it wakes up while a number of concurrent
+lookups run against Redis. Requires a running Redis from the settings.
+
+    python -m benchmarks.event_loop_lag --concurrency 100 --rounds 20
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import typing
+import uuid
+
+import redis
+
+from app.config import auth, general
+
+log = logging.getLogger(__name__)
+
+settings = general.get_settings()
+
+TICK_INTERVAL = 0.001
+
+
+async def _measure_lag(stop: asyncio.Event, lags: list[float]) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(TICK_INTERVAL)
+        lags.append(time.perf_counter() - started - TICK_INTERVAL)
+
+
+async def _sync_lookup(client: "redis.Redis[str]", jti: str) -> None:
+    client.get(jti)
+
+
+async def _async_lookup(_: "redis.Redis[str]", jti: str) -> None:
+    await auth.check_if_token_in_denylist({"jti": jti})
+
+
+async def _run(
+    lookup: "typing.Callable[[redis.Redis[str], str], typing.Awaitable[None]]",
+    client: "redis.Redis[str]",
+    concurrency: int,
+    rounds: int,
+) -> list[float]:
+    lags: list[float] = []
+    stop = asyncio.Event()
+    ticker = asyncio.create_task(_measure_lag(stop, lags))
+    for _ in range(rounds):
+        await asyncio.gather(
+            *(lookup(client, str(uuid.uuid4())) for _ in range(concurrency))
+        )
+    stop.set()
+    await ticker
+    return lags
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    # The same database as the one of the asynchronous lookup
+    client = redis.Redis.from_url(
+        settings.AUTHPASETO_DATABASE_URL, decode_responses=True
+    )
+    benchmarks = {"sync redis": _sync_lookup, "redis.asyncio": _async_lookup}
+    for name, lookup in benchmarks.items():
+        lags = await _run(lookup, client, args.concurrency, args.rounds)
+        lags.sort()
+        log.info(
+            "%s: loop lag p50 %.2f ms, p99 %.2f ms, max %.2f ms",
+            name,
+            statistics.median(lags) * 1000,
+            lags[int(len(lags) * 0.99)] * 1000,
+            lags[-1] * 1000,
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
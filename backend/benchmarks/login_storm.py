@@ -0,0 +1,89 @@
+"""
+Measure the `/users/me` latency while a storm of logins is running.
+
+Every login verifies an argon2 hash, so if the hashing blocks the event loop, the
+latency of unrelated requests served by the same worker goes up. The script needs
+a running backend and an active user:
+
+    python -m benchmarks.login_storm --email user@email.com --password password
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+
+import httpx
+
+log = logging.getLogger(__name__)
+
+
+async def _login(client: httpx.AsyncClient, email: str, password: str) -> str:
+    response = await client.post(
+        "/token/", data={"username": email, "password": password}
+    )
+    response.raise_for_status()
+    return str(response.json()["access_token"])
+
+
+async def _storm(
+    client: httpx.AsyncClient, email: str, password: str, logins: int, concurrency: int
+) -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def login() -> None:
+        async with semaphore:
+            await _login(client, email, password)
+
+    await asyncio.gather(*(login() for _ in range(logins)))
+
+
+async def _probe(
+    client: httpx.AsyncClient, token: str, stop: asyncio.Event
+) -> list[float]:
+    latencies = []
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        start = time.perf_counter()
+        response = await client.get("/users/me", headers=headers)
+        response.raise_for_status()
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def _percentile(values: list[float], percentile: int) -> float:
+    return statistics.quantiles(values, n=100)[percentile - 1] * 1000
+
+
+async def run(args: argparse.Namespace) -> None:
+    async with httpx.AsyncClient(base_url=args.url, timeout=60) as client:
+        token = await _login(client, args.email, args.password)
+        stop = asyncio.Event()
+        probe = asyncio.create_task(_probe(client, token, stop))
+        start = time.perf_counter()
+        await _storm(client, args.email, args.password, args.logins, args.concurrency)
+        elapsed = time.perf_counter() - start
+        stop.set()
+        latencies = await probe
+    log.info("Logins: %d in %.2fs", args.logins, elapsed)
+    log.info(
+        "/users/me during the storm: samples=%d p50=%.1fms p99=%.1fms",
+        len(latencies),
+        _percentile(latencies, 50),
+        _percentile(latencies, 99),
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--email", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+"""
+Compare the offset and the cursor pagination of users at growing page depths.
+
+Seeds the database with the missing benchmark users first, so it needs a migrated
+database from the settings. With `--walk`, it also pages through all users with
+both modes.
+
+    python -m benchmarks.pagination --users 1000000 --page-size 100
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import typing
+
+import sqlalchemy
+
+from app.config import db
+from app.models import pagination as pagination_models
+from app.models import sorting as sorting_models
+from app.models import user as user_models
+from app.services import user as user_services
+
+log = logging.getLogger(__name__)
+
+SORTING = sorting_models.Sorting(
+    column=user_models.User.created_at, way=sorting_models.SortingWay.DESC
+)
+FILTERS = user_models.UserFilters()
+
+SEED_STATEMENT = sqlalchemy.text(
+    """
+    INSERT INTO "user" (
+        email, password, name, id, confirmed_email, email_confirmation_token,
+        created_at, updated_at
+    )
+    SELECT
+        'benchmark' || i || '@example.com', 'hash', 'benchmark' || i,
+        gen_random_uuid(), true, gen_random_uuid(),
+        now() - i * interval '1 second', now()
+    FROM generate_series(:start, :stop) AS i
+    """
+)
+
+
+async def _seed(session: db.AsyncSession, users: int) -> None:
+    existing = await user_services.UserService(session).count_users(FILTERS)
+    if existing >= users:
+        return
+    log.info("Seeding %d users", users - existing)
+    await session.execute(SEED_STATEMENT, {"start": existing + 1, "stop": users})
+    await session.execute(sqlalchemy.text('ANALYZE "user"'))
+    await session.commit()
+
+
+async def _time(
+    func: typing.Callable[[], typing.Awaitable[typing.Any]], repeat: int
+) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+async def _compare_depth(
+    service: user_services.UserService, depth: int, page_size: int, repeat: int
+) -> None:
+    offset_pagination = pagination_models.Pagination(offset=depth, limit=page_size)
+    cursor = None
+    if depth:
+        # The cursor of the row just before the depth, as returned by the previous page
+        previous_users = await service.get_users(
+            FILTERS, pagination_models.Pagination(offset=depth - 1, limit=1), SORTING
+        )
+        cursor = service.get_next_users_cursor(
+            previous_users, SORTING, pagination_models.CursorPagination(limit=1)
+        )
+    cursor_pagination = pagination_models.CursorPagination(
+        cursor=cursor, limit=page_size
+    )
+    offset_time = await _time(
+        lambda: service.get_users(FILTERS, offset_pagination, SORTING), repeat
+    )
+    cursor_time = await _time(
+        lambda: service.get_users(FILTERS, cursor_pagination, SORTING), repeat
+    )
+    log.info(
+        "depth %d: offset %.2f ms, cursor %.2f ms",
+        depth,
+        offset_time * 1000,
+        cursor_time * 1000,
+    )
+
+
+async def _walk(service: user_services.UserService, page_size: int) -> None:
+    started = time.perf_counter()
+    offset = 0
+    while users := await service.get_users(
+        FILTERS, pagination_models.Pagination(offset=offset, limit=page_size), SORTING
+    ):
+        offset += len(users)
+        service.crud.session.expunge_all()
+    log.info("offset walk: %.1f s", time.perf_counter() - started)
+
+    started = time.perf_counter()
+    pagination = pagination_models.CursorPagination(limit=page_size)
+    while users := await service.get_users(FILTERS, pagination, SORTING):
+        cursor = service.get_next_users_cursor(users, SORTING, pagination)
+        service.crud.session.expunge_all()
+        if not cursor:
+            break
+        pagination = pagination_models.CursorPagination(cursor=cursor, limit=page_size)
+    log.info("cursor walk: %.1f s", time.perf_counter() - started)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000000)
+    parser.add_argument("--page-size", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument(
+        "--depths", type=int, nargs="+", default=[0, 10000, 100000, 500000, 990000]
+    )
+    parser.add_argument("--walk", action="store_true")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    async with db.session_factory() as session:
+        await _seed(session, args.users)
+        service = user_services.UserService(session)
+        for depth in args.depths:
+            await _compare_depth(service, depth, args.page_size, args.repeat)
+        if args.walk:
+            await _walk(service, args.page_size)
+    await db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,158 @@
+"""
+Compare sending emails with new SMTP connections, the pool and the async pool.
+
+A local aiosmtpd server stands in for the provider. It speaks plain SMTP, so the
+TLS handshake saved by the pool isn't measured and the real gain is higher. Use
+--connect-delay to emulate the network round trips of connecting and logging in,
+and --send-delay for the time the provider takes to accept a message.
+
+    python -m benchmarks.smtp_pool --emails 500 --connect-delay 20 --send-delay 5
+"""
+import argparse
+import asyncio
+import logging
+import smtplib
+import time
+import typing
+
+import aiosmtplib
+from aiosmtpd import controller, smtp
+
+from app.utils import smtp as smtp_utils
+
+log = logging.getLogger(__name__)
+
+HOST = "127.0.0.1"
+SENDER = "sender@example.com"
+RECEIVER = "receiver@example.com"
+MESSAGE = "Subject: Benchmark\r\n\r\nBenchmark message"
+
+
+class Handler:
+    def __init__(self, send_delay: float):
+        self.send_delay = send_delay
+
+    async def handle_DATA(self, *_: typing.Any) -> str:  # pylint: disable=invalid-name
+        await asyncio.sleep(self.send_delay)
+        return "250 Message accepted for delivery"
+
+
+def _authenticate(*_: typing.Any) -> smtp.AuthResult:
+    return smtp.AuthResult(success=True)
+
+
+def _send_with_new_connections(
+    connect: typing.Callable[[], smtplib.SMTP], emails: int
+) -> None:
+    for _ in range(emails):
+        server = connect()
+        server.sendmail(SENDER, RECEIVER, MESSAGE)
+        server.quit()
+
+
+def _send_with_pool(connect: typing.Callable[[], smtplib.SMTP], emails: int) -> None:
+    pool = smtp_utils.SMTPConnectionPool(
+        connection_factory=connect,
+        max_size=1,
+        max_messages=100,
+        keepalive_interval=30.0,
+    )
+    for _ in range(emails):
+        with pool.connection() as server:
+            server.sendmail(SENDER, RECEIVER, MESSAGE)
+    pool.close()
+
+
+async def _send_with_async_pool(
+    connect: typing.Callable[[], typing.Awaitable[aiosmtplib.SMTP]],
+    emails: int,
+    concurrency: int,
+) -> None:
+    pool = smtp_utils.AsyncSMTPConnectionPool(
+        connection_factory=connect,
+        max_size=concurrency,
+        max_messages=100,
+        keepalive_interval=30.0,
+    )
+
+    async def send() -> None:
+        async with pool.connection() as server:
+            await server.sendmail(SENDER, RECEIVER, MESSAGE)
+
+    await asyncio.gather(*(send() for _ in range(emails)))
+    await pool.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--emails", type=int, default=500)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument(
+        "--connect-delay",
+        type=float,
+        default=0.0,
+        help="Milliseconds added to every new connection",
+    )
+    parser.add_argument(
+        "--send-delay",
+        type=float,
+        default=0.0,
+        help="Milliseconds the server takes to accept every message",
+    )
+    parser.add_argument("--concurrency", type=int, default=100)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    # aiosmtpd logs every SMTP command
+    logging.getLogger("mail.log").setLevel(logging.WARNING)
+
+    def connect() -> smtplib.SMTP:
+        time.sleep(args.connect_delay / 1000)
+        server = smtplib.SMTP(HOST, args.port)
+        server.login("user", "password")
+        return server
+
+    async def connect_async() -> aiosmtplib.SMTP:
+        await asyncio.sleep(args.connect_delay / 1000)
+        server = aiosmtplib.SMTP(hostname=HOST, port=args.port)
+        await server.connect()
+        await server.login("user", "password")
+        return server
+
+    server = controller.Controller(
+        Handler(args.send_delay / 1000),
+        hostname=HOST,
+        port=args.port,
+        authenticator=_authenticate,
+        auth_require_tls=False,
+    )
+    server.start()
+    try:
+        senders: list[tuple[str, typing.Callable[[], typing.Any]]] = [
+            (
+                "new connection per email",
+                lambda: _send_with_new_connections(connect, args.emails),
+            ),
+            ("connection pool", lambda: _send_with_pool(connect, args.emails)),
+            (
+                f"async connection pool, {args.concurrency} in flight",
+                lambda: asyncio.run(
+                    _send_with_async_pool(connect_async, args.emails, args.concurrency)
+                ),
+            ),
+        ]
+        for name, send in senders:
+            started = time.perf_counter()
+            send()
+            elapsed = time.perf_counter() - started
+            log.info(
+                "%s: %.2f s, %.2f ms per email",
+                name,
+                elapsed,
+                elapsed / args.emails * 1000,
+            )
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Count the SQL statements and time the write paths of the user service.
+
+Needs a migrated database and the Celery broker from the settings. The created
+user is deleted at the end.
+
+    python -m benchmarks.statement_count --repeat 20
+"""
+import argparse
+import asyncio
+import logging
+import statistics
+import time
+import typing
+import uuid
+
+from sqlalchemy import event
+
+from app.config import db
+from app.models import user as user_models
+from app.services import auth as auth_services
+from app.services import user as user_services
+
+log = logging.getLogger(__name__)
+
+PASSWORD = "benchmark_password"
+
+
+class StatementCounter:
+    def __init__(self) -> None:
+        self.count = 0
+
+    def __call__(self, *_: typing.Any) -> None:
+        self.count += 1
+
+
+async def _measure(
+    name: str,
+    func: typing.Callable[[], typing.Awaitable[typing.Any]],
+    counter: StatementCounter,
+    repeat: int,
+) -> None:
+    timings = []
+    counts = []
+    for _ in range(repeat):
+        counter.count = 0
+        started = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - started)
+        counts.append(counter.count)
+    log.info(
+        "%s: %d statements, %.2f ms",
+        name,
+        max(counts),
+        statistics.median(timings) * 1000,
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    counter = StatementCounter()
+    event.listen(db.engine.sync_engine, "before_cursor_execute", counter)
+    async with db.session_factory() as session:
+        user_service = user_services.UserService(session)
+        users: list[user_models.User] = []
+
+        async def create_user() -> None:
+            user_create = user_models.UserCreate(
+                email=f"benchmark-{uuid.uuid4()}@example.com",
+                password=PASSWORD,
+                name="Benchmark User",
+            )
+            users.append(await user_service.create_user(user_create))
+
+        async def update_user() -> None:
+            await user_service.update_user(
+                users[0], user_models.UserUpdate(name=f"Benchmark {uuid.uuid4()}")
+            )
+
+        async def obtain_tokens() -> None:
+            await auth_services.AuthService(session).obtain_tokens(
+                users[0].email, PASSWORD
+            )
+
+        await _measure("create_user", create_user, counter, args.repeat)
+        await user_service.update_user(
+            users[0], user_models.UserUpdate(confirmed_email=True)
+        )
+        await _measure("update_user", update_user, counter, args.repeat)
+        await _measure("obtain_tokens", obtain_tokens, counter, args.repeat)
+        for user in users:
+            await user_service.delete_user(user)
+    await db.engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
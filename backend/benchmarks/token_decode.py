@@ -0,0 +1,44 @@
+"""
+Compare the PASETO decode throughput with and without the key registry.
+
+    python -m benchmarks.token_decode --iterations 10000
+"""
+import argparse
+import json
+import logging
+import timeit
+
+import pyseto
+
+from app.config import general
+from app.utils import auth
+
+log = logging.getLogger(__name__)
+
+settings = general.get_settings()
+
+
+def _decode_with_new_key(token: str) -> None:
+    key = pyseto.Key.new(version=4, purpose="local", key=settings.AUTHPASETO_SECRET_KEY)
+    pyseto.decode(keys=key, token=token, deserializer=json)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=10000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    key = pyseto.Key.new(version=4, purpose="local", key=settings.AUTHPASETO_SECRET_KEY)
+    token = pyseto.encode(key, {"sub": "subject", "fresh": True}).decode()
+    benchmarks = {
+        "new key per decode": lambda: _decode_with_new_key(token),
+        "key registry": lambda: auth.decode_token(token),
+    }
+    for name, func in benchmarks.items():
+        elapsed = timeit.timeit(func, number=args.iterations)
+        log.info("%s: %.0f decodes/s", name, args.iterations / elapsed)
+
+
+if __name__ == "__main__":
+    main()